@@ -0,0 +1,89 @@
+# <---------- Fake providers ---------->
+# 실제 OpenAI/Gemini 대신 꽂는 provider. 지연 시간과 출력 크기를 조절할 수 있고 네트워크를 쓰지 않는다.
+import time
+import asyncio
+import random
+from typing import Any, Iterator, List
+
+from schemas.ai_response import ChatResponse, MessageItem, SummaryResponse
+
+class FakeProvider:
+    """send/stream/summary 를 같은 지연 분포로 흉내 낸다.
+    Args:
+        latency (float): 응답까지의 평균 지연(초)
+        jitter (float): 지연의 ±비율 (0.2 면 ±20%)
+        messages (int): 응답 conversation 의 MessageItem 개수
+        said_chars (int): MessageItem.said 길이
+        chunk_chars (int): 스트리밍 청크 크기
+    """
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.2,
+        messages: int = 3,
+        said_chars: int = 200,
+        chunk_chars: int = 32,
+    ) -> None:
+        self.latency = latency
+        self.jitter = jitter
+        self.chunk_chars = chunk_chars
+        self.response = ChatResponse(
+            conversation=[MessageItem(said="가" * said_chars, context="상황 " * 10) for _ in range(messages)],
+            image_selected="default",
+            summary="요약 " * 20,
+        )
+        self.response_json = self.response.model_dump_json()
+        self.summary = SummaryResponse(result="노트 " * 50)
+        self.calls = 0
+
+    def _delay(self) -> float:
+        if self.latency <= 0:
+            return 0.0
+        return max(0.0, self.latency * (1 + random.uniform(-self.jitter, self.jitter)))
+
+    # send_func(client, message_input, prompt_input, prompt_prefix=...) 와 같은 시그니처
+    def send(self, client: Any, message_input: List[dict], prompt_input: str, **kwargs: Any) -> ChatResponse:
+        self.calls += 1
+        time.sleep(self._delay())
+        return self.response
+
+    async def send_async(self, client: Any, message_input: List[dict], prompt_input: str, **kwargs: Any) -> ChatResponse:
+        self.calls += 1
+        await asyncio.sleep(self._delay())
+        return self.response
+
+    def stream(self, client: Any, message_input: List[dict], prompt_input: str, **kwargs: Any) -> Iterator[str]:
+        self.calls += 1
+        text = self.response_json
+        n = max(1, len(text) // self.chunk_chars)
+        per_chunk = self._delay() / n
+        for i in range(0, len(text), self.chunk_chars):
+            if per_chunk:
+                time.sleep(per_chunk)
+            yield text[i:i + self.chunk_chars]
+
+    def summary_note(self, client: Any, message_input: List[dict], prompt_input: str, **kwargs: Any) -> SummaryResponse:
+        self.calls += 1
+        time.sleep(self._delay())
+        return self.summary
+
+def install_fake_providers(provider: FakeProvider) -> None:
+    """클라이언트 레지스트리와 핸들러 레지스트리를 가짜 provider 로 채운다."""
+    from server.services import scheduler
+    from server.routes import chat_service, note_services, async_services
+
+    with scheduler._clients_lock:
+        for name in scheduler.CLIENT_REFRESH_HANDLERS:
+            scheduler._clients[name] = object()
+
+    for model in list(chat_service.AI__FUNC_HANDLERS):
+        getter, _ = chat_service.AI__FUNC_HANDLERS[model]
+        chat_service.AI__FUNC_HANDLERS[model] = (getter, provider.send)
+    for model in list(chat_service.AI__STREAM_HANDLERS):
+        getter, _ = chat_service.AI__STREAM_HANDLERS[model]
+        chat_service.AI__STREAM_HANDLERS[model] = (getter, provider.stream)
+    for model in list(async_services.AI__ASYNC_FUNC_HANDLERS):
+        getter, _ = async_services.AI__ASYNC_FUNC_HANDLERS[model]
+        async_services.AI__ASYNC_FUNC_HANDLERS[model] = (getter, provider.send_async)
+
+    note_services.gpt_5_mini_summary_note = provider.summary_note
@@ -0,0 +1,90 @@
+# <---------- JSON extraction benchmark ---------->
+# 사용법: python -m bench.json_extract [--repeat N]
+# 기존 방식(DOTALL 정규식 + find/rfind + json.loads + model_validate)과
+# 단일 패스 스캐너 + model_validate_json 을 크고/깨진 LLM 출력에서 비교한다.
+import re
+import sys
+import json
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from schemas.ai_response import ChatResponse as ChatRespModel
+from server.services.json_parser import parse_chat_response
+
+_JSON_BLOCK = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
+
+def legacy_parse(text: str) -> ChatRespModel:
+    m = _JSON_BLOCK.search(text)
+    if m:
+        j = m.group(1).strip()
+    else:
+        s, e = text.find("{"), text.rfind("}")
+        j = text[s:e + 1].strip() if s != -1 and e != -1 and e > s else text.strip()
+    return ChatRespModel.model_validate(json.loads(j))
+
+def _response(n_messages: int) -> str:
+    return json.dumps({
+        "conversation": [
+            {"said": f"대사 {i} {{중괄호}} \"따옴표\"", "context": "상황 설명 " * 20}
+            for i in range(n_messages)
+        ],
+        "image_selected": "smile",
+        "summary": "요약 " * 50,
+    }, ensure_ascii=False)
+
+def build_cases() -> Dict[str, str]:
+    small = _response(3)
+    large = _response(400)
+    return {
+        "small_plain": small,
+        "small_fenced": f"```json\n{small}\n```",
+        "large_plain": large,
+        "large_fenced": f"여기 답변입니다.\n```json\n{large}\n```\n끝.",
+        "large_prose_braces": "예시 형식은 {said, context} 입니다.\n" + large + "\n참고: {끝}",
+        # 설명문의 '{' 가 닫히지 않아도 뒤따르는 오브젝트를 찾아야 한다
+        "unclosed_prose_brace": "Use the shape { conversation: [...] like this:\n```json\n" + large + "\n```",
+        "truncated": large[: len(large) * 2 // 3],
+        "garbage": "모델이 JSON 없이 답했습니다. " * 2000,
+        # 닫히지 않은 코드블록이 반복되면 DOTALL 비탐욕 정규식은 위치마다 끝까지 다시 훑는다
+        "unclosed_fences": "```json {\"said\": \"...\"\n" * 3000,
+    }
+
+def run_case(fn: Callable[[str], ChatRespModel], text: str, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        try:
+            fn(text)
+        except Exception:
+            pass
+        samples.append(time.perf_counter() - t0)
+    return samples
+
+def _ok(fn: Callable[[str], ChatRespModel], text: str) -> str:
+    try:
+        fn(text)
+        return "ok"
+    except Exception:
+        return "error"
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'case':<20}{'bytes':>10}{'legacy us':>12}{'scanner us':>12}{'speedup':>11}  result(legacy/scanner)")
+    for name, text in build_cases().items():
+        legacy = statistics.median(run_case(legacy_parse, text, args.repeat)) * 1e6
+        scanner = statistics.median(run_case(parse_chat_response, text, args.repeat)) * 1e6
+        print(
+            f"{name:<20}{len(text.encode('utf-8')):>10}{legacy:>12.1f}{scanner:>12.1f}{legacy / scanner:>10.2f}x"
+            f"  {_ok(legacy_parse, text)}/{_ok(parse_chat_response, text)}"
+        )
+
+if __name__ == "__main__":
+    main()
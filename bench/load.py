@@ -0,0 +1,283 @@
+# <---------- Load generator ---------->
+# 외부 API/MySQL 없이 핸들러 처리량을 잰다.
+#   python -m bench.load --endpoint chat --requests 2000 --concurrency 32 --latency 0.05
+#   python -m bench.load --endpoint summary --mode async --concurrency 256
+# 엔드포인트별 p50/p95/p99 지연과 초당 요청 수, flow 별 누적/백분위 지연을 출력한다.
+import sys
+import time
+import asyncio
+import inspect
+import argparse
+import functools
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bench.local_db import configure_env, setup_database, install_async_shims, user_id
+
+# <---------- Stats ---------->
+def percentile(sorted_samples: List[float], q: float) -> float:
+    if not sorted_samples:
+        return 0.0
+    k = (len(sorted_samples) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(sorted_samples) - 1)
+    return sorted_samples[lo] + (sorted_samples[hi] - sorted_samples[lo]) * (k - lo)
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    s = sorted(samples)
+    return {
+        "count": len(s),
+        "p50": percentile(s, 0.50) * 1000,
+        "p95": percentile(s, 0.95) * 1000,
+        "p99": percentile(s, 0.99) * 1000,
+        "total": sum(s),
+    }
+
+# <---------- Flow timer ---------->
+FLOW_PREFIXES = ("_chat_", "_summary_", "_upload_", "_evaluation_")
+
+class FlowTimer:
+    """route 모듈의 flow 함수를 감싸 호출마다 걸린 시간을 기록한다. 핸들은 모듈 전역 이름으로 flow 를 부르므로 교체가 그대로 반영된다."""
+
+    def __init__(self) -> None:
+        self.samples: Dict[str, List[float]] = defaultdict(list)
+        self._lock = threading.Lock()
+
+    def _record(self, name: str, elapsed: float) -> None:
+        with self._lock:
+            self.samples[name].append(elapsed)
+
+    def _wrap(self, name: str, fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self._record(name, time.perf_counter() - started)
+            async_wrapper._bench_timed = True
+            return async_wrapper
+
+        if inspect.isgeneratorfunction(fn):
+            # 스트림 flow 는 끝까지 소비하는 데 걸린 시간을 잰다
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    yield from fn(*args, **kwargs)
+                finally:
+                    self._record(name, time.perf_counter() - started)
+            gen_wrapper._bench_timed = True
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                self._record(name, time.perf_counter() - started)
+        wrapper._bench_timed = True
+        return wrapper
+
+    def instrument(self, module: ModuleType) -> None:
+        for attr, value in list(vars(module).items()):
+            if attr.startswith(FLOW_PREFIXES) and inspect.isfunction(value) and not getattr(value, "_bench_timed", False):
+                setattr(module, attr, self._wrap(attr, value))
+
+# <---------- Payloads ---------->
+def chat_payload(i: int, users: int, history: int) -> Dict[str, Any]:
+    return {
+        "user": {
+            "user_id": user_id(i % users),
+            "model": "gpt" if i % 2 else "gemini",
+            "message": f"벤치마크 메시지 {i}",
+            "note": "유저 노트 " * 10,
+            "previous": [
+                {"role": "user" if j % 2 == 0 else "assistant", "content": "이전 대화 " * 20}
+                for j in range(history)
+            ],
+            "max_credit": 10,
+        },
+        "character": {
+            "prompt": "캐릭터 프롬프트 " * 50,
+            "public_prompt": "PP_A",
+            "img_default": "default",
+            "img_list": [{"key": f"img{k}", "url": f"https://example.com/{k}.png"} for k in range(8)],
+        },
+        "chatInfo": {},
+    }
+
+def summary_payload(i: int, users: int, history: int) -> Dict[str, Any]:
+    # 쿨다운을 피하도록 요청마다 다른 유저를 쓴다
+    return {
+        "user_id": f"bench-summary-{i}",
+        "user_name": "bench",
+        "prevSummaryItem": ["요약 항목"] * 5,
+        "prevUserNote": "이전 노트",
+        "prevConversation": [{"user": "안녕", "system": "반가워"}] * min(history, 50),
+    }
+
+def upload_payload(i: int, users: int, history: int) -> Dict[str, Any]:
+    return {"user_id": f"bench-upload-{i}", "new_note": "새 노트 " * 50}
+
+def evaluation_payload(i: int, users: int, history: int) -> Dict[str, Any]:
+    return {
+        "is_good": i % 3 != 0,
+        "reasone": i % 5,
+        "user": f"bench-evaluation-{i}",
+        "request": "벤치마크 요청 " * 10,
+        "response": "벤치마크 응답 " * 30,
+        "image": {"key": "default", "url": "https://example.com/default.png"},
+        "model": ("gpt", "gemini")[i % 2],
+        "public_prompt": ("PP_A", "PP_B", "PP_C")[i % 3],
+    }
+
+PAYLOADS: Dict[str, Callable[[int, int, int], Dict[str, Any]]] = {
+    "chat": chat_payload,
+    "chat_stream": chat_payload,
+    "summary": summary_payload,
+    "upload": upload_payload,
+    "evaluation": evaluation_payload,
+}
+
+def _sync_handles() -> Dict[str, Callable]:
+    from server.routes.chat_service import chat_handle, chat_stream_handle, evaluation_handle
+    from server.routes.note_services import summary_handle, upload_handle
+
+    def stream_and_drain(req):
+        ok, code, body = chat_stream_handle(req)
+        if ok:
+            for _ in body:
+                pass
+        return ok, code, None
+
+    return {"chat": chat_handle, "chat_stream": stream_and_drain, "summary": summary_handle, "upload": upload_handle, "evaluation": evaluation_handle}
+
+def _async_handles() -> Dict[str, Callable]:
+    from server.routes.async_services import chat_handle_async, summary_handle_async, upload_handle_async
+    return {"chat": chat_handle_async, "summary": summary_handle_async, "upload": upload_handle_async}
+
+# <---------- Runners ---------->
+Result = Tuple[float, int]
+
+def run_sync(handle: Callable, payloads: List[Dict[str, Any]], concurrency: int) -> Tuple[List[Result], float]:
+    def one(payload):
+        started = time.perf_counter()
+        _, code, _ = handle(payload)
+        return time.perf_counter() - started, code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(one, payloads))
+    return results, time.perf_counter() - started
+
+def run_async(handle: Callable, payloads: List[Dict[str, Any]], concurrency: int) -> Tuple[List[Result], float]:
+    async def main():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def one(payload):
+            async with sem:
+                started = time.perf_counter()
+                _, code, _ = await handle(payload)
+                return time.perf_counter() - started, code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(one(p) for p in payloads))
+        return list(results), time.perf_counter() - started
+
+    return asyncio.run(main())
+
+# <---------- Report ---------->
+def print_report(endpoint: str, mode: str, results: List[Result], wall: float, timer: FlowTimer) -> None:
+    latencies = [lat for lat, _ in results]
+    codes: Dict[int, int] = defaultdict(int)
+    for _, code in results:
+        codes[code] += 1
+    s = summarize(latencies)
+
+    print(f"\n== {endpoint} ({mode}) ==")
+    print(f"requests {s['count']}  wall {wall:.2f}s  rps {s['count'] / wall:.1f}  status {dict(sorted(codes.items()))}")
+    print(f"latency ms  p50 {s['p50']:.2f}  p95 {s['p95']:.2f}  p99 {s['p99']:.2f}")
+
+    if timer.samples:
+        print(f"\n{'flow':<40}{'calls':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'share':>8}")
+        total = sum(sum(v) for v in timer.samples.values()) or 1.0
+        for name, samples in sorted(timer.samples.items(), key=lambda kv: -sum(kv[1])):
+            f = summarize(samples)
+            print(f"{name:<40}{f['count']:>8}{f['p50']:>10.3f}{f['p95']:>10.3f}{f['p99']:>10.3f}{f['total'] / total:>7.0%}")
+
+    from server.services.db import pool_stats
+    print(f"\ndb pool {pool_stats()}")
+
+def drain_jobs(queue: Any, timeout: float = 300.0) -> float:
+    """작업 큐가 빌 때까지 기다린 시간(초). /onSummary 는 큐에 넣고 바로 응답하므로 처리량은 이것으로 본다."""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        stats = queue.stats()
+        if not stats["queued"] and not stats["running"]:
+            break
+        time.sleep(0.01)
+    return time.perf_counter() - started
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test with fake providers and SQLite")
+    parser.add_argument("--endpoint", choices=sorted(PAYLOADS), default="chat")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--history", type=int, default=20, help="previous/prevConversation 길이")
+    parser.add_argument("--latency", type=float, default=0.05, help="가짜 provider 평균 지연(초)")
+    parser.add_argument("--messages", type=int, default=3, help="응답 MessageItem 개수")
+    parser.add_argument("--said-chars", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--db", default=None, help="SQLite 파일 경로 (기본: 임시 디렉터리)")
+    parser.add_argument("--no-flows", action="store_true", help="flow 별 계측을 끈다")
+    args = parser.parse_args()
+
+    configure_env(args.db)
+    setup_database(args.users)
+
+    from bench.fakes import FakeProvider, install_fake_providers
+    from server.routes import chat_service, note_services, async_services
+
+    install_fake_providers(FakeProvider(latency=args.latency, messages=args.messages, said_chars=args.said_chars))
+
+    if args.mode == "async":
+        if args.endpoint != "summary" and not install_async_shims():
+            sys.exit("async mode needs aiosqlite for the local DB (pip install aiosqlite)")
+        handles = _async_handles()
+        runner = run_async
+    else:
+        handles = _sync_handles()
+        runner = run_sync
+    if args.endpoint not in handles:
+        sys.exit(f"{args.endpoint} has no {args.mode} handle")
+
+    build = PAYLOADS[args.endpoint]
+    handle = handles[args.endpoint]
+    if args.warmup:
+        runner(handle, [build(args.requests + i, args.users, args.history) for i in range(args.warmup)], args.concurrency)
+
+    timer = FlowTimer()
+    if not args.no_flows:
+        for module in (chat_service, note_services, async_services):
+            timer.instrument(module)
+
+    payloads = [build(i, args.users, args.history) for i in range(args.requests)]
+    results, wall = runner(handle, payloads, args.concurrency)
+    print_report(args.endpoint, args.mode, results, wall, timer)
+    if args.endpoint == "summary":
+        drained = drain_jobs(note_services.summary_jobs)
+        print(f"summary jobs drained {drained:.2f}s after the last request  {note_services.summary_jobs.stats()}")
+
+if __name__ == "__main__":
+    main()
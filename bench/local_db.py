@@ -0,0 +1,99 @@
+# <---------- Local DB ---------->
+# MySQL 없이 users / user_notes 쿼리를 돌리기 위한 SQLite 백엔드.
+# server 모듈이 import 되기 전에 configure_env() 를 불러 DB_URL 을 바꿔 둬야 한다 (엔진은 import 시 만들어진다).
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Optional
+
+SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        email TEXT,
+        phone TEXT,
+        password TEXT,
+        credit INTEGER NOT NULL DEFAULT 0,
+        last_evalutaion_req_time REAL,
+        last_summary_req_time REAL,
+        last_upload_req_time REAL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS revoked_tokens (
+        jti TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL,
+        expires_at REAL NOT NULL
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS user_notes (
+        user_id TEXT PRIMARY KEY,
+        note TEXT
+    )
+    """,
+)
+
+def configure_env(path: Optional[str] = None) -> Path:
+    """벤치마크용 SQLite 파일 경로를 DB_URL/DB_ASYNC_URL 로 설정한다."""
+    db_path = Path(path) if path else Path(tempfile.gettempdir()) / "dive_chat_bench.db"
+    os.environ["DB_URL"] = f"sqlite:///{db_path}"
+    os.environ["DB_ASYNC_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ.setdefault("FEEDBACK_DIR", str(Path(tempfile.gettempdir()) / "dive_chat_feedback"))
+    os.environ.setdefault("AUTH_REQUIRED", "0")  # 핸들러 처리량만 잰다. 토큰 검증 비용은 bench 에 넣지 않는다
+    os.environ.setdefault("FEEDBACK_ANALYTICS_DIR", str(Path(tempfile.gettempdir()) / "dive_chat_feedback_analytics"))
+    return db_path
+
+# MySQL 전용 upsert 구문을 SQLite 의 ON CONFLICT 로 바꾼다. 바인드 파라미터 수는 그대로다.
+_UPSERT = re.compile(r"ON DUPLICATE KEY UPDATE", re.IGNORECASE)
+_UPSERT_VALUES = re.compile(r"VALUES\((\w+)\)(?=[^()]*$)")
+_UPSERT_KEY = re.compile(r"INSERT INTO \w+\s*\(\s*(\w+)", re.IGNORECASE)  # 첫 컬럼을 충돌 키로 쓴다
+
+def _install_dialect_shims(engine) -> None:
+    from sqlalchemy import event
+
+    @event.listens_for(engine, "connect")
+    def _pragmas(dbapi_conn, _record):
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA journal_mode=WAL")
+        cur.execute("PRAGMA synchronous=NORMAL")
+        cur.execute("PRAGMA busy_timeout=5000")
+        cur.close()
+
+    @event.listens_for(engine, "before_cursor_execute", retval=True)
+    def _translate(conn, cursor, statement, parameters, context, executemany):
+        if "ON DUPLICATE KEY UPDATE" in statement:
+            key = _UPSERT_KEY.search(statement)
+            statement = _UPSERT.sub(f"ON CONFLICT({key.group(1) if key else 'user_id'}) DO UPDATE SET", statement)
+            # 다중 행 upsert 의 VALUES(col) 는 SQLite 의 excluded.col
+            statement = _UPSERT_VALUES.sub(r"excluded.\1", statement)
+        return statement, parameters
+
+def setup_database(users: int, credit: int = 10 ** 9) -> None:
+    """스키마를 만들고 bench-<n> 유저를 채운다. 이미 있으면 크레딧만 다시 채운다."""
+    from sqlalchemy import text
+    from server.services.db import engine
+
+    _install_dialect_shims(engine)
+    with engine.begin() as conn:
+        for ddl in SCHEMA:
+            conn.execute(text(ddl))
+        conn.execute(text("DELETE FROM user_notes"))
+        conn.execute(
+            text("INSERT OR REPLACE INTO users (id, credit) VALUES (:id, :credit)"),
+            [{"id": user_id(i), "credit": credit} for i in range(users)],
+        )
+
+def install_async_shims() -> bool:
+    """비동기 엔진에도 같은 shim 을 건다. aiosqlite 가 없으면 False."""
+    try:
+        import aiosqlite  # noqa: F401
+    except ImportError:
+        return False
+    from server.services.db import get_async_engine
+    _install_dialect_shims(get_async_engine().sync_engine)
+    return True
+
+def user_id(i: int) -> str:
+    return f"bench-{i}"
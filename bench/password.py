@@ -0,0 +1,82 @@
+# <---------- Password hashing benchmark ---------->
+# 사용법: python -m bench.password [--workers 0,1,2,4] [--requests 64] [--concurrency 16] [--rounds 12]
+# 로그인 경로의 bcrypt 검증을 풀 크기별로 돌려 초당 처리 수와 지연을 잰다. workers 0 은 요청 스레드에서 바로 계산하는 기존 방식이다.
+# 같은 프로세스에서 10ms 마다 짧은 파이썬 작업을 하는 probe 스레드를 함께 돌려,
+# 해시 계산이 다른 요청(채팅 등)을 얼마나 멈추게 하는지 probe 지연으로 보여 준다.
+import os
+import sys
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+
+from bench.load import summarize
+
+PASSWORD = "Bench!Passw0rd"
+
+def probe(stop: threading.Event, samples: List[float], interval: float = 0.01) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        sum(i * i for i in range(2000))
+        samples.append(time.perf_counter() - started)
+        time.sleep(interval)
+
+def run(workers: int, hashed: str, requests: int, concurrency: int, start_method: str) -> Dict[str, float]:
+    from server.security.password_service import PasswordService
+
+    service = PasswordService(workers, requests, 60.0, start_method)
+    # 풀 기동(spawn)은 재지 않는다
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as warmup:
+        list(warmup.map(lambda _: service.verify(hashed, PASSWORD), range(max(1, workers))))
+
+    stop = threading.Event()
+    probe_samples: List[float] = []
+    prober = threading.Thread(target=probe, args=(stop, probe_samples), daemon=True)
+    prober.start()
+
+    def one(_):
+        started = time.perf_counter()
+        assert service.verify(hashed, PASSWORD)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    stop.set()
+    prober.join()
+    service.shutdown()
+
+    s = summarize(latencies)
+    p = summarize(probe_samples)
+    return {"rps": requests / wall, "p50": s["p50"], "p95": s["p95"], "probe_p50": p["p50"], "probe_p99": p["p99"]}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Sign-in password verification throughput by pool size")
+    parser.add_argument("--workers", default=f"0,1,2,{os.cpu_count() or 1}", help="쉼표로 구분한 풀 크기 목록")
+    parser.add_argument("--requests", type=int, default=64)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt 비용")
+    parser.add_argument("--start-method", default="spawn")
+    args = parser.parse_args()
+
+    # 풀 프로세스도 같은 비용을 쓰도록 서버 모듈을 읽기 전에 정한다
+    os.environ["PASSWORD_BCRYPT_ROUNDS"] = str(args.rounds)
+    from server.security.security import hash_password
+
+    hashed = hash_password(PASSWORD)
+    sizes = sorted({int(w) for w in args.workers.split(",") if w.strip()})
+
+    print(f"bcrypt rounds {args.rounds}  requests {args.requests}  concurrency {args.concurrency}  cpus {os.cpu_count()}")
+    print(f"\n{'workers':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'probe p50 ms':>14}{'probe p99 ms':>14}")
+    for workers in sizes:
+        r = run(workers, hashed, args.requests, args.concurrency, args.start_method)
+        label = "inline" if workers == 0 else str(workers)
+        print(f"{label:>8}{r['rps']:>10.1f}{r['p50']:>10.1f}{r['p95']:>10.1f}{r['probe_p50']:>14.3f}{r['probe_p99']:>14.3f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,3 @@
+from .load_prompt import prompt_store, get_public_prompt, get_summary_prompt
+
+__all__ = ['prompt_store', 'get_public_prompt', 'get_summary_prompt']
\ No newline at end of file
@@ -0,0 +1,96 @@
+# <---------- Prompt store ---------->
+# 프롬프트는 templates/ 아래의 <이름>.txt 파일에서 읽는다.
+#   - PP_*.txt      : 공용 프롬프트 (Character.public_prompt 값이 파일명)
+#   - SUMMARY_PROMPT.txt : 유저 노트 요약 프롬프트
+# 파일을 추가/수정하면 워커 재시작 없이 mtime 확인으로 다시 읽는다.
+import os
+import time
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROMPT_DIR = Path(os.getenv("PROMPT_DIR", Path(__file__).parent / "templates"))
+PROMPT_RELOAD_INTERVAL = float(os.getenv("PROMPT_RELOAD_INTERVAL", "5"))  # 초 단위, 0 이면 매 조회마다 확인
+
+PUBLIC_PROMPT_PREFIX = "PP_"
+SUMMARY_PROMPT_NAME = "SUMMARY_PROMPT"
+
+def _normalize(raw: str) -> str:
+    """조회 시점에 다시 가공하지 않도록 읽을 때 한 번만 정리한다."""
+    lines = [line.rstrip() for line in raw.replace("\r\n", "\n").split("\n")]
+    return "\n".join(lines).strip()
+
+class PromptStore:
+    """파일 기반 프롬프트 저장소. 조회는 dict lookup 한 번이고, 변경 확인은 check_interval 마다 한 번만 한다.
+    Args:
+        directory (Path): 프롬프트 파일 디렉터리
+        check_interval (float): mtime 확인 주기(초)
+    """
+    def __init__(self, directory: Path, check_interval: float = PROMPT_RELOAD_INTERVAL) -> None:
+        self._directory = Path(directory)
+        self._check_interval = check_interval
+        self._prompts: Dict[str, str] = {}
+        self._mtimes: Dict[str, Tuple[int, int]] = {}
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self.reload()
+
+    def reload(self) -> None:
+        """변경된 파일만 다시 읽고, 지워진 파일은 제거한다. 교체는 dict 참조 대입 한 번이다."""
+        with self._lock:
+            self._reload_locked()
+
+    def _reload_locked(self) -> None:
+        try:
+            entries = {
+                e.name[:-4]: e for e in os.scandir(self._directory)
+                if e.is_file() and e.name.endswith(".txt")
+            }
+        except FileNotFoundError:
+            logger.error(f"Prompt directory not found: {self._directory}")
+            entries = {}
+
+        prompts: Dict[str, str] = {}
+        mtimes: Dict[str, Tuple[int, int]] = {}
+        for name, entry in entries.items():
+            try:
+                st = entry.stat()
+                stamp = (st.st_mtime_ns, st.st_size)
+                if self._mtimes.get(name) == stamp and name in self._prompts:
+                    prompts[name] = self._prompts[name]
+                else:
+                    prompts[name] = _normalize(Path(entry.path).read_text(encoding="utf-8"))
+                    logger.info(f"Loaded prompt {name}")
+                mtimes[name] = stamp
+            except OSError as e:
+                # 쓰는 도중이거나 방금 지워진 파일은 다음 확인 때 다시 읽는다
+                logger.warning(f"Failed to read prompt {name}, {e}")
+                if name in self._prompts:
+                    prompts[name] = self._prompts[name]
+
+        self._prompts = prompts
+        self._mtimes = mtimes
+        self._next_check = time.monotonic() + self._check_interval
+
+    def get(self, name: str) -> Optional[str]:
+        # 다른 스레드가 이미 확인 중이면 기다리지 않고 현재 값을 쓴다
+        if time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._reload_locked()
+            finally:
+                self._lock.release()
+        return self._prompts.get(name)
+
+prompt_store = PromptStore(PROMPT_DIR)
+
+def get_public_prompt(key: str) -> Optional[str]:
+    """공용 프롬프트를 반환한다. 존재하지 않는 키면 None."""
+    if not key.startswith(PUBLIC_PROMPT_PREFIX):
+        return None
+    return prompt_store.get(key)
+
+def get_summary_prompt() -> str:
+    return prompt_store.get(SUMMARY_PROMPT_NAME) or ""
@@ -1,6 +1,6 @@
-from .ai_response import SummaryResponse, ChatResponse
+from .ai_response import SummaryResponse, SummaryJobResponse, ChatResponse, ChatSendResponse
 from .chat import PrevItem, User, ImgItem, Character, ChatPayload, EvaluationChatPayload
-from .user_system import SigninPayload, RegisterPayload
+from .user_system import SigninPayload, RegisterPayload, SigninResponse
 from .note import PrevConversation, SummaryPayload, UploadPayload
 
-__all__ = ['SummaryResponse', 'ChatResponse', 'EvaluationChatPayload', 'PrevItem', 'User', 'ImgItem', 'Character', 'ChatPayload', 'SigninPayload', 'RegisterPayload', 'PrevConversation', 'SummaryPayload', 'UploadPayload']
\ No newline at end of file
+__all__ = ['SummaryResponse', 'SummaryJobResponse', 'ChatResponse', 'ChatSendResponse', 'EvaluationChatPayload', 'PrevItem', 'User', 'ImgItem', 'Character', 'ChatPayload', 'SigninPayload', 'RegisterPayload', 'SigninResponse', 'PrevConversation', 'SummaryPayload', 'UploadPayload']
\ No newline at end of file
@@ -1,6 +1,6 @@
 # <---------- Schemas ---------->
 from pydantic import BaseModel, HttpUrl
-from typing import List
+from typing import List, Optional
 
 class MessageItem(BaseModel):
     said: str
@@ -11,5 +11,15 @@ class ChatResponse(BaseModel):
     image_selected: str
     summary: str
 
+class ChatSendResponse(ChatResponse):
+    uuid: str
+    history_hash: Optional[str] = None
+
 class SummaryResponse(BaseModel):
-    result: str
\ No newline at end of file
+    result: str
+
+class SummaryJobResponse(BaseModel):
+    job_id: str
+    status: str  # queued | running | done | failed
+    result: Optional[SummaryResponse] = None
+    error: Optional[str] = None
\ No newline at end of file
@@ -11,7 +11,7 @@ class User(BaseModel):
     model: str
     message: Optional[str] = " "
     note: Optional[str] = " "
-    previous: List[PrevItem]
+    previous: List[PrevItem] = []  # chatInfo.history_hash 를 보내면 비워 둔다
     max_credit: int
 
 class ImgItem(BaseModel):
@@ -26,10 +26,12 @@ class Character(BaseModel):
 
 class ChatInfo(BaseModel):
     uuid: Optional[str] = " "
+    summary: Optional[str] = None  # 예산을 넘어 잘린 이전 대화의 누적 요약
+    history_hash: Optional[str] = None  # 서버 저장본 기준으로 새 메시지만 보낼 때의 대화 해시
 
 class ChatPayload(BaseModel):
     user: User
-    character: Character
+    character: Optional[Character] = None  # history_hash 로 이어가는 대화면 생략 가능
     chatInfo: ChatInfo
 
 class EvaluationChatPayload(BaseModel):
@@ -38,4 +40,6 @@ class EvaluationChatPayload(BaseModel):
     user: str
     request: str
     response: str
-    image: ImgItem
\ No newline at end of file
+    image: ImgItem
+    model: Optional[str] = None  # 응답한 모델 (분석용)
+    public_prompt: Optional[str] = None  # 공용 프롬프트 이름, 예: PP_A (분석용)
\ No newline at end of file
@@ -11,4 +11,10 @@ class RegisterPayload(BaseModel):
 
 class SigninPayload(BaseModel):
     imail: str
-    password: str
\ No newline at end of file
+    password: str
+
+class SigninResponse(BaseModel):
+    user_id: str
+    token: str
+    token_type: str = "Bearer"
+    expires_at: int  # unix 초
@@ -0,0 +1,143 @@
+# <---------- ASGI app ---------->
+# Flask(WSGI) 경로와 별도로 chat/summary/upload 를 비동기로 처리하는 ASGI 앱.
+# 업스트림 대기 동안 워커를 점유하지 않으므로 프로세스 하나가 수천 개의 요청을 동시에 들고 있을 수 있다.
+#   uvicorn server.asgi:create_asgi_app --factory --port 5051
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .services.http_json import encode_body, loads, negotiate_encoding, compress
+from .services.metrics import render_prometheus
+from .services.session_token import bearer_token
+
+logger = logging.getLogger(__name__)
+
+AsyncHandle = Callable[[Any], Awaitable[Tuple[bool, int, Any]]]
+
+# Idempotency-Key 헤더를 handle 에 넘기는 경로
+_IDEMPOTENT_ROUTES = {("POST", "/onSend")}
+
+# GET /onSummary/<job_id> 요약 작업 조회
+_SUMMARY_STATUS_PREFIX = "/onSummary/"
+
+def _build_routes() -> Dict[Tuple[str, str], AsyncHandle]:
+    from .routes.async_services import chat_handle_async, summary_handle_async, upload_handle_async
+    return {
+        ("POST", "/onSend"): chat_handle_async,
+        ("POST", "/onSummary"): summary_handle_async,
+        ("POST", "/onUpload"): upload_handle_async,
+    }
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body", False):
+            return b"".join(chunks)
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for k, v in scope.get("headers", ()):
+        if k == name:
+            return v.decode("latin-1")
+    return None
+
+async def _send_json(send, code: int, body: Any, accept_encoding: Optional[str] = None) -> None:
+    raw, encoding = compress(encode_body(body), negotiate_encoding(accept_encoding))
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(raw)).encode()),
+        (b"vary", b"Accept-Encoding"),
+    ]
+    if encoding is not None:
+        headers.append((b"content-encoding", encoding.encode()))
+    await send({
+        "type": "http.response.start",
+        "status": code,
+        "headers": headers,
+    })
+    await send({"type": "http.response.body", "body": raw})
+
+async def _send_metrics(send) -> None:
+    raw = render_prometheus().encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/plain; version=0.0.4"),
+            (b"content-length", str(len(raw)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": raw})
+
+async def _lifespan(receive, send) -> None:
+    from .services.scheduler import refresh_all_clients, start_scheduler, bind_event_loop
+    from .services.session_token import validate_session_config, start_revocation_sync
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            try:
+                validate_session_config()
+            except RuntimeError as e:
+                await send({"type": "lifespan.startup.failed", "message": str(e)})
+                return
+            try:
+                # 폐기 집합을 읽는 DB 조회가 이벤트 루프를 막지 않도록 스레드에서 수행한다
+                await asyncio.to_thread(start_revocation_sync)
+            except Exception as e:
+                logger.error(f"Failed to start token revocation sync, {e}")
+            bind_event_loop(asyncio.get_running_loop())
+            try:
+                # 클라이언트 생성/warm-up 은 블로킹이므로 스레드에서 수행한다
+                await asyncio.to_thread(refresh_all_clients)
+                start_scheduler()
+            except Exception as e:
+                logger.error(f"Failed to caching client, {e}")
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+def create_asgi_app():
+    routes = _build_routes()
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await _lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        if scope["method"] == "GET" and scope["path"] == "/metrics":
+            await _send_metrics(send)
+            return
+
+        if scope["method"] == "GET" and scope["path"].startswith(_SUMMARY_STATUS_PREFIX):
+            from .routes.note_services import summary_status_handle
+            ok, code, body = summary_status_handle(
+                scope["path"][len(_SUMMARY_STATUS_PREFIX):],
+                auth_token=bearer_token(_header(scope, b"authorization")),
+            )
+            await _send_json(send, code, body, _header(scope, b"accept-encoding"))
+            return
+
+        route = (scope["method"], scope["path"])
+        handle = routes.get(route)
+        if handle is None:
+            await _send_json(send, 404, {"error": "Not found", "code": "ERR_NOT_FOUND"})
+            return
+
+        try:
+            payload = loads(await _read_body(receive) or b"null")
+        except ValueError:
+            await _send_json(send, 400, {"error": "Invalid JSON body", "code": "ERR_BAD_REQUEST"})
+            return
+
+        auth_token = bearer_token(_header(scope, b"authorization"))
+        if route in _IDEMPOTENT_ROUTES:
+            ok, code, body = await handle(payload, _header(scope, b"idempotency-key"), auth_token=auth_token)
+        else:
+            ok, code, body = await handle(payload, auth_token=auth_token)
+        await _send_json(send, code, body, _header(scope, b"accept-encoding"))
+
+    return app
@@ -9,21 +9,26 @@ def create_app():
     except Exception as e:
         logger.error(f"Failed to create Flask app")
 
-    # try:
-    #     from .services.scheduler import cache, start_scheduler
-
-    #     app.config.update(
-    #         CACHE_TYPE="SimpleCache",
-    #         CACHE_DEFAULT_TIMEOUT=300
-    #     )
-    #     cache.init_app(app)
-    #     with app.app_context():
-    #         from .services.scheduler import refresh_gpt_client, refresh_gemini_client
-    #         refresh_gpt_client()
-    #         refresh_gemini_client()
-    #     start_scheduler()
-    # except Exception as e:
-    #     logger.error(f"Failed to caching client, {e}")
+    try:
+        from .services.http_json import install_json_provider
+        install_json_provider(app)
+    except Exception as e:
+        logger.error(f"Failed to install json provider, {e}")
+
+    # 토큰 설정이 잘못되면 모든 요청이 401 이 되므로 앱을 띄우지 않는다
+    from .services.session_token import validate_session_config, start_revocation_sync
+    validate_session_config()
+    try:
+        start_revocation_sync()
+    except Exception as e:
+        logger.error(f"Failed to start token revocation sync, {e}")
+
+    try:
+        from .services.scheduler import refresh_all_clients, start_scheduler
+        refresh_all_clients()
+        start_scheduler()
+    except Exception as e:
+        logger.error(f"Failed to caching client, {e}")
 
     try:
         from .routes.chat_bp import chat_bp
@@ -31,5 +36,33 @@ def create_app():
         logger.info(f"Success to register chat_bp!")
     except Exception as e:
         logger.error(f"Failed to register chat_bp, {e}")
+
+    try:
+        from .routes.user_bp import user_bp
+        app.register_blueprint(user_bp)
+        logger.info(f"Success to register user_bp!")
+    except Exception as e:
+        logger.error(f"Failed to register user_bp, {e}")
+
+    try:
+        from .routes.note_bp import note_bp
+        app.register_blueprint(note_bp)
+        logger.info(f"Success to register note_bp!")
+    except Exception as e:
+        logger.error(f"Failed to register note_bp, {e}")
+
+    try:
+        from .routes.metrics_bp import metrics_bp
+        app.register_blueprint(metrics_bp)
+        logger.info(f"Success to register metrics_bp!")
+    except Exception as e:
+        logger.error(f"Failed to register metrics_bp, {e}")
+
+    try:
+        from .routes.admin_bp import admin_bp
+        app.register_blueprint(admin_bp)
+        logger.info(f"Success to register admin_bp!")
+    except Exception as e:
+        logger.error(f"Failed to register admin_bp, {e}")
     
     return app
\ No newline at end of file
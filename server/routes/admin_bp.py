@@ -0,0 +1,15 @@
+# <---------- Route ---------->
+from flask import Blueprint, request
+
+from .admin_services import feedback_analytics_handle
+from ..services.http_json import json_response
+
+admin_bp = Blueprint('admin_bp', __name__)
+@admin_bp.route('/admin/feedback', methods = ['GET'])
+def feedbackAnalytics():
+    ok, code, body = feedback_analytics_handle(
+        request.headers.get("X-Admin-Token"),
+        request.args.get("group_by"),
+        request.args.get("since"),
+    )
+    return json_response(body, code)
@@ -0,0 +1,73 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _log_exc(msg: str, user_id: str | None, exc: Exception) -> None:
+    suffix = f" | user_id: {user_id}" if user_id else ""
+    logger.error(f"{msg}{suffix}", exc_info=exc)
+
+# <---------- Def exceptions ---------->
+from ..config.exceptions import AppError, ClientError
+
+# <---------- Flows ---------->
+import hmac
+from typing import Optional
+
+from ..config.config import ADMIN_TOKEN
+from ..services.metrics import timed_flow, timed_handle
+from ..services.feedback_analytics import DIMENSIONS, get_feedback_analytics
+
+@timed_flow
+def _admin_auth_flow(token: Optional[str]) -> None:
+    """X-Admin-Token 을 확인한다. ADMIN_TOKEN 이 없으면 엔드포인트가 없는 것처럼 굴어 404.
+    Raises:
+        ClientError: 토큰이 없거나 틀린 경우
+    """
+    if not ADMIN_TOKEN:
+        raise ClientError("Not found", 404, "ERR_NOT_FOUND")
+    if not token or not hmac.compare_digest(token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")):
+        raise ClientError("Unauthorized", 401, "ERR_UNAUTHORIZED")
+
+@timed_flow
+def _feedback_query_args_flow(group_by: Optional[str], since: Optional[str]) -> tuple[str, Optional[float]]:
+    """group_by 와 since(unix 초) 쿼리 인자를 검증한다.
+    Raises:
+        ClientError: 알 수 없는 group_by 이거나 since 가 숫자가 아닌 경우
+    """
+    group_by = group_by or "model"
+    if group_by not in DIMENSIONS:
+        raise ClientError("Bad request", 400, "ERR_BAD_GROUP_BY", {"allowed": list(DIMENSIONS)})
+    if since is None or since == "":
+        return group_by, None
+    try:
+        return group_by, float(since)
+    except ValueError as e:
+        raise ClientError("Bad request", 400, "ERR_BAD_SINCE") from e
+
+@timed_flow
+def _feedback_analytics_flow(group_by: str, since: Optional[float]) -> dict:
+    """그룹별 긍정 비율과 부정 사유 히스토그램.
+    Raises:
+        AppError: numpy 가 없는 경우
+    """
+    try:
+        analytics = get_feedback_analytics()
+    except RuntimeError as e:
+        raise AppError("Feedback analytics is unavailable", 501, "ERR_ANALYTICS_UNAVAILABLE") from e
+    return analytics.query(group_by, since)
+
+# <---------- Handles ---------->
+@timed_handle
+def feedback_analytics_handle(token: Optional[str], group_by: Optional[str], since: Optional[str]) -> tuple[bool, int, dict]:
+    try:
+        _admin_auth_flow(token)
+        group_by, since_ts = _feedback_query_args_flow(group_by, since)
+        return True, 200, _feedback_analytics_flow(group_by, since_ts)
+    except ClientError as e:
+        return False, e.http_status, e.to_dict()
+    except AppError as e:
+        return False, e.http_status, e.to_dict()
+    except Exception as e:
+        _log_exc("Unexpected error while read feedback analytics", None, e)
+        return False, 500, {"error": "something went wrong while read feedback analytics"}
@@ -0,0 +1,228 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _log_exc(msg: str, user_id: str | None, exc: Exception) -> None:
+    suffix = f" | user_id: {user_id}" if user_id else ""
+    logger.error(f"{msg}{suffix}", exc_info=exc)
+
+# <---------- MySQL (async) ---------->
+from sqlalchemy import text
+from ..services.db import get_async_conn as _get_async_conn
+
+# <---------- Def exceptions ---------->
+from ..config.exceptions import AppError, ClientError
+from pydantic import ValidationError
+from ..services.user_state import UserNotFound, InvalidUserData, DatabaseError
+
+# <---------- Build helpers ---------->
+from typing import Awaitable, Callable, List, Optional
+from schemas import ChatPayload, PrevItem, ChatResponse, ChatSendResponse, SummaryPayload, UploadPayload, SummaryJobResponse
+from ..services.user_state import AsyncUserState
+from ..services.credit_ledger import Reservation, InsufficientCredit, reserve_credit_async, release_credit
+
+async def _upload_userNote_new_async(user_id: str, new_note: str) -> None:
+    try:
+        async with _get_async_conn() as conn:
+            async with conn.begin():
+                await conn.execute(
+                    text("""
+                        INSERT INTO user_notes (user_id, note)
+                        VALUES (:user_id, :note)
+                        ON DUPLICATE KEY UPDATE note = :note
+                    """),
+                    {"user_id": user_id, "note": new_note}
+                )
+    except Exception as e:
+        _log_exc("Failed to upload user note", user_id, e)
+        raise DatabaseError("Could not upload user note") from e
+
+# <---------- Def handlers ---------->
+import math
+
+from ..services import get_gpt_async_client, get_gemini_client, CacheMissError
+from ..services.gpt_service import gpt_5_mini_send_message_async
+from ..services.gemini_service import gemini_send_message_async
+from ..services.metrics import timed_flow, timed_handle, timed_upstream
+from ..services.upstream_router import route_send_async
+from ..services.bulkhead import Overloaded
+
+AI__ASYNC_FUNC_HANDLERS = {
+    "gpt": (get_gpt_async_client, timed_upstream("gpt", gpt_5_mini_send_message_async)),
+    "gemini": (get_gemini_client, timed_upstream("gemini", gemini_send_message_async)),
+}
+
+# <---------- Flows ---------->
+from ..services.note_buffer import buffer_note
+from ..services.idempotency import async_idempotency_store, IdempotencyKeyReused, IdempotencyInProgress
+from ..config.config import NOTE_WRITE_BEHIND
+
+# DB/업스트림을 건드리지 않는 flow 는 동기 경로의 것을 그대로 재사용한다 (rate limit 포함)
+from .chat_service import (
+    _chat_payload_system_flow,
+    _chat_uuid_flow,
+    _chat_conversation_resolve_flow,
+    _chat_conversation_commit_flow,
+    _chat_send_response,
+    _chat_check_credit,
+    CHAT_STATE_COLUMNS,
+    _chat_build_prompt_flow,
+    _chat_build_message_flow,
+    _chat_credit_settle_flow,
+    _chat_idempotency_scope,
+    _chat_idempotency_error,
+    _chat_request_user_id,
+    _chat_auth_flow,
+    _wrong_payload,
+)
+from .note_services import (
+    _summary_payload_system_flow,
+    _summary_format_summary_input_flow,
+    _upload_payload_system_flow,
+    _summary_enqueue_flow,
+    _upload_check_cooldown_flow,
+)
+
+@timed_flow
+async def _chat_idempotency_flow_async(req: dict, idempotency_key: str, run: Callable[[], Awaitable[tuple]]) -> tuple[bool, int, dict | ChatSendResponse]:
+    """_chat_idempotency_flow 의 비동기 버전."""
+    key, fingerprint = _chat_idempotency_scope(req, idempotency_key)
+    try:
+        return await async_idempotency_store.run(key, fingerprint, run)
+    except (IdempotencyKeyReused, IdempotencyInProgress) as e:
+        logger.warning(f"Idempotent request rejected, {e}")
+        raise _chat_idempotency_error(e) from e
+
+@timed_flow
+async def _chat_credit_system_flow_async(user_id: str, max_credit: int) -> Reservation:
+    """_chat_credit_system_flow 의 비동기 버전."""
+    try:
+        _chat_check_credit(user_id, max_credit)
+        return await reserve_credit_async(user_id, max_credit)
+    except InsufficientCredit as e:
+        try:
+            await AsyncUserState(user_id, CHAT_STATE_COLUMNS, _get_async_conn).get("credit")
+        except UserNotFound:
+            raise ClientError("Credit system error | User not found", 404) from e
+        except InvalidUserData:
+            raise ClientError("Credit system error | Invalid user data", 500) from e
+        raise ClientError("Out of credit", 403) from e
+    except DatabaseError as e:
+        _log_exc("Database error | Cannot reserve user_credit", user_id, e)
+        raise AppError("Database error", 500) from e
+
+@timed_flow
+async def _chat_send_message_flow_async(
+    model: str,
+    message_input: List[PrevItem],
+    prompt_input: str,
+    prompt_prefix: Optional[str],
+    reservation: Reservation
+) -> ChatResponse:
+    """_chat_send_message_flow 의 비동기 버전."""
+    try:
+        if model not in AI__ASYNC_FUNC_HANDLERS:
+            raise ClientError("Wrong AI model", 400)
+
+        return await route_send_async(model, AI__ASYNC_FUNC_HANDLERS, message_input, prompt_input, prompt_prefix=prompt_prefix)
+    except ClientError:
+        release_credit(reservation)
+        raise
+    except Overloaded as e:
+        release_credit(reservation)
+        logger.warning(f"Chat request shed, {e}")
+        raise AppError(f"{model} is busy", 503, "ERR_UPSTREAM_BUSY", {"retry_after": math.ceil(e.retry_after)}) from e
+    except CacheMissError as e:
+        release_credit(reservation)
+        _log_exc("Cache is missing | Client not found", None, e)
+        raise AppError(f"{model} client not initialized", 502) from e
+    except Exception as e:
+        release_credit(reservation)
+        _log_exc("Upstream model error | Cannot get response", None, e)
+        raise AppError(f"Could not get response from {model}", 502) from e
+
+@timed_flow
+async def _upload_userNote_new_flow_async(user_id: str, new_note: str) -> None:
+    """_upload_userNote_new_flow 의 비동기 버전."""
+    try:
+        if NOTE_WRITE_BEHIND:
+            buffer_note(user_id, new_note)
+            return
+        await _upload_userNote_new_async(user_id, new_note)
+    except DatabaseError as e:
+        _log_exc("Database error while upload user note cool down", None, e)
+        raise AppError("Database error while upload user note cool down", 500) from e
+    except Exception as e:
+        _log_exc("Unexpected error while upload user note cool down", None, e)
+        raise AppError("Unexpected error while upload user note cool down", 500) from e
+
+# <---------- Handles ---------->
+@timed_handle
+async def chat_handle_async(req: ChatPayload, idempotency_key: Optional[str] = None, auth_token: Optional[str] = None) -> tuple[bool, int, dict | ChatSendResponse]:
+    try:
+        _chat_auth_flow(auth_token, _chat_request_user_id(req))
+        if idempotency_key is None:
+            return await _chat_handle_async(req)
+        return await _chat_idempotency_flow_async(req, idempotency_key, lambda: _chat_handle_async(req))
+    except ClientError as e:
+        return False, e.http_status, e.to_dict()
+
+async def _chat_handle_async(req: ChatPayload) -> tuple[bool, int, dict | ChatSendResponse]:
+    try:
+        request = ChatPayload(**req)
+        user_id, model, message, note, max_credit, previous, prompt, public_prompt, img_list, uuid, summary, history_hash = _chat_payload_system_flow(request)
+        uuid = _chat_uuid_flow(uuid)
+        turn, prompt, public_prompt, img_list = _chat_conversation_resolve_flow(user_id, uuid, history_hash, previous, message, prompt, public_prompt, img_list)
+        prompt_input, prompt_prefix = _chat_build_prompt_flow(img_list, public_prompt, prompt, note)
+        message_input = _chat_build_message_flow(model, turn.history, message, summary, prompt_input)
+        reservation = await _chat_credit_system_flow_async(user_id, max_credit)
+        response = await _chat_send_message_flow_async(model, message_input, prompt_input, prompt_prefix, reservation)
+        _chat_credit_settle_flow(reservation, prompt_input, message_input, response)
+        history_hash = _chat_conversation_commit_flow(turn, response)
+        return True, 200, _chat_send_response(response, uuid, history_hash)
+    except ValidationError:
+        e = _wrong_payload()
+        return False, e.http_status, e.to_dict()
+    except ClientError as e:
+        return False, e.http_status, e.to_dict()
+    except AppError as e:
+        return False, e.http_status, e.to_dict()
+    except Exception as e:
+        _log_exc("Unexpected error | Somthing went wrong in async handle", _chat_request_user_id(req), e)
+        return False, 500, {"error": "Unexpected error in handle"}
+
+@timed_handle
+async def summary_handle_async(req: SummaryPayload, auth_token: Optional[str] = None) -> tuple[bool, int, dict | SummaryJobResponse]:
+    try:
+        request = SummaryPayload(**req)
+        user_id, user_name, prevSummaryItem, prevUserNote, prevConversation = _summary_payload_system_flow(request)
+        _chat_auth_flow(auth_token, user_id)
+        format_summary_input = _summary_format_summary_input_flow(prevSummaryItem, prevUserNote, prevConversation, user_name)
+        # 요약은 로컬 작업 큐(작업 스레드)에서 처리한다. 큐에 넣는 것은 블로킹하지 않는다
+        response = _summary_enqueue_flow(user_id, format_summary_input)
+        return True, 202, response
+    except ClientError as e:
+        return False, e.http_status, e.to_dict()
+    except AppError as e:
+        return False, e.http_status, e.to_dict()
+    except Exception as e:
+        _log_exc("Unexpected error while build user note", None, e)
+        return False, 500, {"error": "something went wrong while build user note"}
+
+@timed_handle
+async def upload_handle_async(req: UploadPayload, auth_token: Optional[str] = None) -> tuple[bool, int, dict | None]:
+    try:
+        request = UploadPayload(**req)
+        user_id, new_note = _upload_payload_system_flow(request)
+        _chat_auth_flow(auth_token, user_id)
+        _upload_check_cooldown_flow(user_id)
+        await _upload_userNote_new_flow_async(user_id, new_note)
+        return True, 200, None
+    except ClientError as e:
+        return False, e.http_status, e.to_dict()
+    except AppError as e:
+        return False, e.http_status, e.to_dict()
+    except Exception as e:
+        _log_exc("Unexpected error while build user note", None, e)
+        return False, 500, {"error": "something went wrong while upload user note"}
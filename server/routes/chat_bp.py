@@ -1,10 +1,32 @@
 # <---------- Route ---------->
-from flask import Blueprint, request
+from flask import Blueprint, Response, request, stream_with_context
 
-from .chat_service import chat_handle
+from .chat_service import chat_handle, chat_stream_handle, evaluation_handle
+from ..services.http_json import json_response
+from ..services.session_token import bearer_token
+
+def _auth_token():
+    return bearer_token(request.headers.get("Authorization"))
 
 chat_bp = Blueprint('chat_bp', __name__)
 @chat_bp.route('/onSend', methods = ['POST'])
 def onSend():
-    ok, code, body = chat_handle(request.get_json(force=True))
-    return body, code
\ No newline at end of file
+    ok, code, body = chat_handle(request.get_json(force=True), request.headers.get("Idempotency-Key"), auth_token=_auth_token())
+    return json_response(body, code)
+
+@chat_bp.route('/onEvaluation', methods = ['POST'])
+def onEvaluation():
+    ok, code, body = evaluation_handle(request.get_json(force=True), auth_token=_auth_token())
+    return json_response(body, code)
+
+@chat_bp.route('/onSendStream', methods = ['POST'])
+def onSendStream():
+    ok, code, body = chat_stream_handle(request.get_json(force=True), auth_token=_auth_token())
+    if not ok:
+        return json_response(body, code)
+    return Response(
+        stream_with_context(body),
+        status=code,
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
\ No newline at end of file
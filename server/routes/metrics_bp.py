@@ -0,0 +1,9 @@
+# <---------- Route ---------->
+from flask import Blueprint, Response
+
+from ..services.metrics import render_prometheus
+
+metrics_bp = Blueprint('metrics_bp', __name__)
+@metrics_bp.route('/metrics', methods = ['GET'])
+def metrics():
+    return Response(render_prometheus(), mimetype="text/plain; version=0.0.4")
@@ -1,15 +1,22 @@
 # <---------- Route ---------->
 from flask import Blueprint, jsonify, request
 
-from .note_services import summary_handle, upload_handle
+from .note_services import summary_handle, summary_status_handle, upload_handle
+from ..services.http_json import json_response
+from ..services.session_token import bearer_token
 
 note_bp = Blueprint('note_bp', __name__)
 @note_bp.route('/onSummary', methods = ['POST'])
 def onSend():
-    ok, code, body = summary_handle(request.get_json(force=True))
-    return body, code
+    ok, code, body = summary_handle(request.get_json(force=True), auth_token=bearer_token(request.headers.get("Authorization")))
+    return json_response(body, code)
+
+@note_bp.route('/onSummary/<job_id>', methods = ['GET'])
+def onSummaryStatus(job_id):
+    ok, code, body = summary_status_handle(job_id, auth_token=bearer_token(request.headers.get("Authorization")))
+    return json_response(body, code)
 
 @note_bp.route('/onUpload', methods = ['POST'])
 def onUpload():
-    ok, code, body = upload_handle(request.get_json(force=True))
-    return body, code
\ No newline at end of file
+    ok, code, body = upload_handle(request.get_json(force=True), auth_token=bearer_token(request.headers.get("Authorization")))
+    return json_response(body, code)
\ No newline at end of file
@@ -4,16 +4,23 @@ from schemas import SigninPayload, RegisterPayload
 # <---------- Route ---------->
 from flask import Blueprint, request
 
-from .user_services import registerHandle, signinHandle
+from .user_services import registerHandle, signinHandle, signoutHandle
+from ..services.http_json import json_response
+from ..services.session_token import bearer_token
 
 user_bp = Blueprint('user_bp', __name__)
 
 @user_bp.route('/register', methods = ['POST'])
 def register():
     ok, code, body = registerHandle(request.get_json(force=True))
-    return body, code
+    return json_response(body, code)
 
 @user_bp.route('/signin', methods = ['POST'])
 def signin():
     ok, code, body = signinHandle(request.get_json(force=True))
-    return body, code
\ No newline at end of file
+    return json_response(body, code)
+
+@user_bp.route('/signout', methods = ['POST'])
+def signout():
+    ok, code, body = signoutHandle(bearer_token(request.headers.get("Authorization")))
+    return json_response(body, code)
\ No newline at end of file
@@ -1,3 +1,4 @@
 from .security import hash_password, verify_password, needs_rehash
+from .password_service import PasswordService, PasswordServiceBusy, password_service
 
-__all__ = ['hash_password', 'verify_password', 'needs_rehash']
\ No newline at end of file
+__all__ = ['hash_password', 'verify_password', 'needs_rehash', 'PasswordService', 'PasswordServiceBusy', 'password_service']
\ No newline at end of file
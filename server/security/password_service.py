@@ -0,0 +1,169 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class PasswordServiceBusy(Exception):
+    def __init__(self, pending: int, retry_after: float) -> None:
+        super().__init__(f"Password hashing pool is saturated ({pending} pending), retry after {retry_after:.1f}s")
+        self.pending = pending
+        self.retry_after = retry_after
+
+# <---------- Password service ---------->
+# bcrypt 해시/검증을 워커 프로세스 풀에서 돌린다. 요청 스레드는 결과를 기다리기만 하므로 GIL 을 잡지 않고,
+# 가입이 몰려도 같은 워커의 채팅 요청이 멈추지 않는다.
+# 동시에 맡길 수 있는 작업은 workers + queue_size 개. 그 이상은 wait 초까지 자리를 기다리다 PasswordServiceBusy 로 거절한다.
+# 검증에 성공한 해시가 현재 비용보다 낮으면(needs_rehash) 남는 자리가 있을 때만 백그라운드로 새 해시를 만들어 on_rehash 로 넘긴다.
+import time
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Optional
+
+from .security import hash_password, verify_password, needs_rehash
+from ..config.config import PASSWORD_POOL_WORKERS, PASSWORD_POOL_QUEUE, PASSWORD_POOL_WAIT, PASSWORD_POOL_START_METHOD
+from ..services.metrics import counter, histogram, register_gauge
+
+PASSWORD_OPS = counter("dive_password_ops_total", "Password hashing operations by outcome", ("op", "outcome"))
+PASSWORD_SECONDS = histogram("dive_password_seconds", "Time from submit to result of a password operation", ("op",))
+
+class PasswordService:
+    """bcrypt 작업을 프로세스 풀에 맡기는 서비스.
+    Args:
+        workers (int): 풀 프로세스 수. 0 이면 풀 없이 호출한 스레드에서 계산한다
+        queue_size (int): 풀이 꽉 찼을 때 기다릴 수 있는 작업 수
+        wait (float): 자리를 기다릴 최대 시간(초)
+        start_method (str): 풀 프로세스 시작 방식 (spawn | forkserver | fork)
+    """
+    def __init__(self, workers: int, queue_size: int, wait: float, start_method: str) -> None:
+        self.workers = max(0, workers)
+        self.capacity = self.workers + max(0, queue_size)
+        self.wait = wait
+        self.start_method = start_method
+        self._slots = threading.BoundedSemaphore(max(1, self.capacity))
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    # <---------- Public ---------->
+    def hash(self, raw_password: str) -> str:
+        """새 해시를 만든다.
+        Raises:
+            PasswordServiceBusy: wait 안에 자리가 나지 않은 경우
+        """
+        return self._run("hash", hash_password, raw_password)
+
+    def verify(self, hashed: str, password: str, on_rehash: Optional[Callable[[str], None]] = None) -> bool:
+        """비밀번호를 검증한다. 성공했고 해시 비용이 낮으면 on_rehash(new_hash) 를 백그라운드에서 부른다.
+        Raises:
+            PasswordServiceBusy: wait 안에 자리가 나지 않은 경우
+        """
+        ok = self._run("verify", verify_password, hashed, password)
+        if ok and on_rehash is not None and needs_rehash(hashed):
+            self._rehash(password, on_rehash)
+        return ok
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"workers": self.workers, "capacity": self.capacity, "pending": self._pending}
+
+    def shutdown(self) -> None:
+        self._discard_pool()
+
+    # <---------- Internal ---------->
+    def _discard_pool(self) -> None:
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _ensure_pool(self) -> ProcessPoolExecutor:
+        # 포크 이후 워커 안에서 처음 쓸 때 풀을 띄운다
+        if self._pool is None:
+            with self._lock:
+                if self._pool is None:
+                    ctx = multiprocessing.get_context(self.start_method)
+                    self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        return self._pool
+
+    def _acquire(self, timeout: Optional[float]) -> bool:
+        acquired = self._slots.acquire(timeout=timeout) if timeout else self._slots.acquire(blocking=False)
+        if acquired:
+            with self._lock:
+                self._pending += 1
+        return acquired
+
+    def _release(self, _: Optional[Future] = None) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _submit(self, fn: Callable, *args) -> Future:
+        if self.workers == 0:
+            future: Future = Future()
+            try:
+                future.set_result(fn(*args))
+            except Exception as e:
+                future.set_exception(e)
+            self._release()
+            return future
+        try:
+            future = self._ensure_pool().submit(fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+        return future
+
+    def _run(self, op: str, fn: Callable, *args):
+        started = time.perf_counter()
+        if not self._acquire(self.wait):
+            PASSWORD_OPS.inc(op, "rejected")
+            with self._lock:
+                pending = self._pending
+            raise PasswordServiceBusy(pending, self.wait)
+        try:
+            result = self._submit(fn, *args).result()
+        except BrokenProcessPool:
+            # 풀 프로세스가 죽으면 풀 전체가 못 쓰게 된다. 다음 호출이 새 풀을 띄우게 버린다
+            PASSWORD_OPS.inc(op, "error")
+            self._discard_pool()
+            raise
+        except Exception:
+            PASSWORD_OPS.inc(op, "error")
+            raise
+        PASSWORD_SECONDS.observe(time.perf_counter() - started, op)
+        PASSWORD_OPS.inc(op, "ok")
+        return result
+
+    def _rehash(self, password: str, on_rehash: Callable[[str], None]) -> None:
+        # 로그인 응답을 늦추지 않도록 기다리지 않는다. 자리가 없으면 다음 로그인 때 다시 시도한다
+        if not self._acquire(None):
+            PASSWORD_OPS.inc("rehash", "skipped")
+            return
+
+        def apply(future: Future) -> None:
+            try:
+                on_rehash(future.result())
+                PASSWORD_OPS.inc("rehash", "ok")
+            except Exception as e:
+                PASSWORD_OPS.inc("rehash", "error")
+                logger.error("Failed to upgrade password hash", exc_info=e)
+
+        def done(future: Future) -> None:
+            # 콜백은 풀의 결과 처리 스레드에서 불리므로 DB 쓰기는 따로 띄운 스레드에서 한다
+            threading.Thread(target=apply, args=(future,), name="password-rehash", daemon=True).start()
+
+        try:
+            self._submit(hash_password, password).add_done_callback(done)
+        except Exception as e:
+            PASSWORD_OPS.inc("rehash", "error")
+            logger.error("Failed to submit password rehash", exc_info=e)
+
+password_service = PasswordService(PASSWORD_POOL_WORKERS, PASSWORD_POOL_QUEUE, PASSWORD_POOL_WAIT, PASSWORD_POOL_START_METHOD)
+atexit.register(password_service.shutdown)
+
+register_gauge("dive_password_pending", "Password operations running or waiting in the pool", (), lambda: [((), password_service.stats()["pending"])])
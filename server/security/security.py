@@ -1,9 +1,13 @@
 # <---------- Bycrypt ---------->
+# 요청 스레드에서 직접 부르지 않는다. password_service 의 프로세스 풀 안에서 실행된다.
 from passlib.context import CryptContext
 
+from ..config.config import PASSWORD_BCRYPT_ROUNDS
+
 pwd_ctx = CryptContext(
     schemes=["bcrypt"],
     deprecated="auto",
+    bcrypt__rounds=PASSWORD_BCRYPT_ROUNDS,
 )
 
 def hash_password(raw_password: str) -> str:
@@ -13,4 +17,4 @@ def verify_password(hashed: str, password: str) -> bool:
     return pwd_ctx.verify(password, hashed)
 
 def needs_rehash(hashed: str) -> bool:
-    return pwd_ctx.needs_update(hashed)
\ No newline at end of file
+    return pwd_ctx.needs_update(hashed)
@@ -1,4 +1,6 @@
-from .gpt_service import gpt_5_mini_send_message, gpt_setup_client
-from .gemini_service import gemini_send_message, gemini_setup_client
+from .gpt_service import gpt_5_mini_send_message, gpt_5_mini_stream_message, gpt_setup_client
+from .gemini_service import gemini_send_message, gemini_stream_message, gemini_setup_client
+from .json_parser import ChatResponseStreamParser
+from .scheduler import CacheMissError, get_gpt_client, get_gpt_async_client, get_gemini_client
 
-__all__ = ['gpt_5_mini_send_message', 'gpt_setup_client', 'gemini_send_message', 'gemini_setup_client'] 
\ No newline at end of file
+__all__ = ['gpt_5_mini_send_message', 'gpt_5_mini_stream_message', 'gpt_setup_client', 'gemini_send_message', 'gemini_stream_message', 'gemini_setup_client', 'ChatResponseStreamParser', 'CacheMissError', 'get_gpt_client', 'get_gpt_async_client', 'get_gemini_client']
\ No newline at end of file
@@ -0,0 +1,247 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class Overloaded(Exception):
+    def __init__(self, provider: str, reason: str, retry_after: float) -> None:
+        super().__init__(f"{provider} bulkhead rejected request ({reason}), retry after {retry_after:.1f}s")
+        self.provider = provider
+        self.reason = reason
+        self.retry_after = retry_after
+
+# <---------- Bulkheads ---------->
+# provider 별 동시 호출 상한. 상한을 넘은 요청은 짧은 대기열에서 기다리고,
+# 대기열이 차 있거나 예상 대기 시간이 허용 시간보다 길면 기다리지 않고 바로 거절한다.
+# 한 provider 가 느려져도 워커가 그 provider 호출에만 묶이지 않게 해서 다른 엔드포인트를 살려 둔다.
+import math
+import time
+import asyncio
+import threading
+from typing import Any, Dict, Iterator, Optional
+
+from ..config.config import BULKHEAD_LIMITS, BULKHEAD_QUEUES, BULKHEAD_DEFAULT_LIMIT, BULKHEAD_DEFAULT_QUEUE, BULKHEAD_MAX_WAIT
+from .metrics import counter, histogram, register_gauge
+
+BULKHEAD_REJECTED = counter("dive_bulkhead_rejected_total", "Upstream calls shed by a provider bulkhead", ("provider", "reason"))
+BULKHEAD_WAIT = histogram("dive_bulkhead_wait_seconds", "Time spent queued for a provider slot", ("provider",))
+
+class _BulkheadBase:
+    """동기/비동기 bulkhead 가 공유하는 상태와 admission 판단.
+    Args:
+        name (str): provider 이름
+        limit (int): 동시 호출 상한
+        queue_size (int): 대기열 길이 상한
+        max_wait (float): 대기열에서 기다릴 최대 시간(초)
+    """
+    EWMA_ALPHA = 0.2
+
+    def __init__(self, name: str, limit: int, queue_size: int, max_wait: float) -> None:
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = max(0, queue_size)
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self.waiting = 0
+        self._service_time: Optional[float] = None
+
+    def _reject(self, reason: str, retry_after: float) -> None:
+        BULKHEAD_REJECTED.inc(self.name, reason)
+        raise Overloaded(self.name, reason, retry_after)
+
+    def _expected_wait(self, position: int) -> float:
+        # 앞선 요청들이 limit 개씩 묶여 빠진다고 보고, 한 묶음에 평균 호출 시간이 걸린다고 가정한다
+        if self._service_time is None:
+            return 0.0
+        return self._service_time * math.ceil(position / self.limit)
+
+    def _admit(self, timeout: Optional[float]) -> Optional[float]:
+        """바로 들어갈 수 있으면 None, 기다려야 하면 허용 대기 시간을 돌려준다. 가망이 없으면 Overloaded."""
+        if self.in_flight < self.limit and self.waiting == 0:
+            self.in_flight += 1
+            return None
+        budget = self.max_wait if timeout is None else min(timeout, self.max_wait)
+        if budget <= 0 or self.waiting >= self.queue_size:
+            self._reject("queue_full", self._expected_wait(self.waiting + 1) or budget)
+        expected = self._expected_wait(self.waiting + 1)
+        if expected > budget:
+            self._reject("deadline", expected)
+        return budget
+
+    def _done(self, elapsed: float) -> None:
+        self.in_flight -= 1
+        if self._service_time is None:
+            self._service_time = elapsed
+        else:
+            self._service_time += self.EWMA_ALPHA * (elapsed - self._service_time)
+
+class Bulkhead(_BulkheadBase):
+    """스레드 워커용 bulkhead."""
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> float:
+        """슬롯 하나를 얻는다. 얻은 시각(monotonic)을 돌려주며 release 에 그대로 넘긴다.
+        Args:
+            timeout (float | None): 기다릴 수 있는 최대 시간. None 이면 max_wait, 0 이면 빈 슬롯이 있을 때만 들어간다
+        Raises:
+            Overloaded: 대기열이 차 있거나 허용 시간 안에 슬롯을 얻지 못한 경우
+        """
+        started = time.monotonic()
+        with self._cond:
+            budget = self._admit(timeout)
+            if budget is not None:
+                self.waiting += 1
+                try:
+                    deadline = started + budget
+                    while self.in_flight >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._reject("timeout", self._expected_wait(self.waiting))
+                        self._cond.wait(remaining)
+                    self.in_flight += 1
+                finally:
+                    self.waiting -= 1
+        acquired = time.monotonic()
+        BULKHEAD_WAIT.observe(acquired - started, self.name)
+        return acquired
+
+    def release(self, acquired: float) -> None:
+        with self._cond:
+            self._done(time.monotonic() - acquired)
+            self._cond.notify()
+
+    def slot(self, timeout: Optional[float] = None) -> "_Slot":
+        return _Slot(self, timeout)
+
+    def hold(self, chunks: Iterator[str], timeout: Optional[float] = None) -> "HeldStream":
+        """슬롯을 지금 얻고, 스트림이 끝나거나 닫히면 돌려준다."""
+        return HeldStream(self, self.acquire(timeout), chunks)
+
+class _Slot:
+    def __init__(self, bulkhead: Bulkhead, timeout: Optional[float]) -> None:
+        self._bulkhead = bulkhead
+        self._timeout = timeout
+
+    def __enter__(self) -> None:
+        self._acquired = self._bulkhead.acquire(self._timeout)
+
+    def __exit__(self, *exc: Any) -> None:
+        self._bulkhead.release(self._acquired)
+
+class HeldStream:
+    """슬롯을 쥔 채로 청크를 흘려보내는 이터레이터. 순회를 시작하지 않고 닫혀도 슬롯을 돌려준다."""
+    def __init__(self, bulkhead: Bulkhead, acquired: float, chunks: Iterator[str]) -> None:
+        self._bulkhead = bulkhead
+        self._acquired = acquired
+        self._chunks = chunks
+        self._open = True
+
+    def __iter__(self) -> "HeldStream":
+        return self
+
+    def __next__(self) -> str:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        if self._open:
+            self._open = False
+            close = getattr(self._chunks, "close", None)
+            if close is not None:
+                close()
+            self._bulkhead.release(self._acquired)
+
+    def __del__(self) -> None:
+        self.close()
+
+class AsyncBulkhead(_BulkheadBase):
+    """이벤트 루프용 bulkhead. 한 루프 안에서만 쓴다."""
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._cond = asyncio.Condition()
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """Bulkhead.acquire 의 비동기 버전."""
+        started = time.monotonic()
+        async with self._cond:
+            budget = self._admit(timeout)
+            if budget is not None:
+                self.waiting += 1
+                try:
+                    deadline = started + budget
+                    while self.in_flight >= self.limit:
+                        remaining = deadline - time.monotonic()
+                        if remaining <= 0:
+                            self._reject("timeout", self._expected_wait(self.waiting))
+                        try:
+                            await asyncio.wait_for(self._cond.wait(), remaining)
+                        except asyncio.TimeoutError:
+                            pass
+                    self.in_flight += 1
+                finally:
+                    self.waiting -= 1
+        acquired = time.monotonic()
+        BULKHEAD_WAIT.observe(acquired - started, self.name)
+        return acquired
+
+    async def release(self, acquired: float) -> None:
+        async with self._cond:
+            self._done(time.monotonic() - acquired)
+            self._cond.notify()
+
+    def slot(self, timeout: Optional[float] = None) -> "_AsyncSlot":
+        return _AsyncSlot(self, timeout)
+
+class _AsyncSlot:
+    def __init__(self, bulkhead: AsyncBulkhead, timeout: Optional[float]) -> None:
+        self._bulkhead = bulkhead
+        self._timeout = timeout
+
+    async def __aenter__(self) -> None:
+        self._acquired = await self._bulkhead.acquire(self._timeout)
+
+    async def __aexit__(self, *exc: Any) -> None:
+        await self._bulkhead.release(self._acquired)
+
+# <---------- Registry ---------->
+_bulkheads: Dict[str, Bulkhead] = {}
+_async_bulkheads: Dict[str, AsyncBulkhead] = {}
+_registry_lock = threading.Lock()
+
+def _settings(provider: str) -> tuple:
+    return (
+        BULKHEAD_LIMITS.get(provider, BULKHEAD_DEFAULT_LIMIT),
+        BULKHEAD_QUEUES.get(provider, BULKHEAD_DEFAULT_QUEUE),
+        BULKHEAD_MAX_WAIT,
+    )
+
+def get_bulkhead(provider: str) -> Bulkhead:
+    b = _bulkheads.get(provider)
+    if b is None:
+        with _registry_lock:
+            b = _bulkheads.get(provider)
+            if b is None:
+                b = _bulkheads[provider] = Bulkhead(provider, *_settings(provider))
+    return b
+
+def get_async_bulkhead(provider: str) -> AsyncBulkhead:
+    b = _async_bulkheads.get(provider)
+    if b is None:
+        b = _async_bulkheads[provider] = AsyncBulkhead(provider, *_settings(provider))
+    return b
+
+def _collect(field: str):
+    def collect():
+        for mode, registry in (("sync", _bulkheads), ("async", _async_bulkheads)):
+            for name, b in list(registry.items()):
+                yield (name, mode), getattr(b, field)
+    return collect
+
+register_gauge("dive_bulkhead_in_flight", "Upstream calls currently holding a provider slot", ("provider", "mode"), _collect("in_flight"))
+register_gauge("dive_bulkhead_queued", "Upstream calls waiting for a provider slot", ("provider", "mode"), _collect("waiting"))
@@ -0,0 +1,69 @@
+# <---------- Token estimator ---------->
+# 토크나이저 없이 쓰는 빠른 추정기. 정확도보다 속도가 중요하며, 예산 계산은 보수적으로 잡는다.
+#   - ASCII: 약 4자당 1토큰
+#   - 비 ASCII(한글 등, UTF-8 3바이트): 약 1자당 1토큰
+from typing import List, Optional
+
+MESSAGE_OVERHEAD_TOKENS = 4
+
+def estimate_tokens(text: Optional[str]) -> int:
+    if not text:
+        return 0
+    n = len(text)
+    extra_bytes = len(text.encode("utf-8")) - n
+    non_ascii = extra_bytes // 2
+    ascii_chars = n - non_ascii
+    return ascii_chars // 4 + non_ascii + 1
+
+def estimate_message_tokens(message: dict) -> int:
+    return estimate_tokens(str(message.get("content") or "")) + MESSAGE_OVERHEAD_TOKENS
+
+# <---------- Window ---------->
+SUMMARY_HEADER = "Summary of the earlier conversation:"
+
+def fit_history(
+    previous: List[dict],
+    budget: int,
+    summary: Optional[str] = None,
+    keep_recent: int = 6,
+) -> List[dict]:
+    """이전 대화를 토큰 예산에 맞게 자른다.
+    최근 keep_recent 개는 예산과 무관하게 항상 남기고, 그 앞은 최신 것부터 예산이 허락하는 만큼 남긴다.
+    잘린 앞부분은 summary 가 있으면 요약 메시지 하나로 대체한다.
+    Args:
+        previous (list[dict]): role/content 를 가진 이전 대화 (오래된 것부터)
+        budget (int): 이전 대화에 쓸 수 있는 토큰 수
+        summary (str | None): 잘린 구간을 대신할 누적 요약
+        keep_recent (int): 항상 유지할 최근 메시지 수
+    Returns:
+        list[dict]: 예산에 맞춘 대화
+    """
+    costs = [estimate_message_tokens(m) for m in previous]
+    if sum(costs) <= budget:
+        return previous
+
+    summary_msg = None
+    if summary and summary.strip():
+        summary_msg = {"role": "system", "content": f"{SUMMARY_HEADER}\n{summary.strip()}"}
+        budget -= estimate_message_tokens(summary_msg)
+
+    cut = len(previous)
+    used = 0
+    for i in range(len(previous) - 1, -1, -1):
+        if len(previous) - i > keep_recent and used + costs[i] > budget:
+            break
+        used += costs[i]
+        cut = i
+
+    kept = previous[cut:]
+    return [summary_msg, *kept] if summary_msg is not None else kept
+
+# <---------- Budgets ---------->
+from ..config.config import CONTEXT_BUDGETS, CONTEXT_DEFAULT_BUDGET, CONTEXT_OUTPUT_RESERVE
+
+def history_budget(model: str, prompt_input: str, message: Optional[str]) -> int:
+    """모델 컨텍스트 예산에서 시스템 프롬프트, 새 메시지, 출력 여유분을 뺀 나머지를 반환한다."""
+    total = CONTEXT_BUDGETS.get(model, CONTEXT_DEFAULT_BUDGET)
+    fixed = estimate_tokens(prompt_input) + estimate_tokens(message) + 2 * MESSAGE_OVERHEAD_TOKENS
+    return max(0, total - fixed - CONTEXT_OUTPUT_RESERVE)
+
@@ -0,0 +1,231 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class ConversationOwnerMismatch(Exception):
+    def __init__(self, uuid: str) -> None:
+        super().__init__(f"Conversation {uuid} belongs to another user")
+        self.uuid = uuid
+
+# <---------- History hash ---------->
+# 대화 해시는 메시지마다 이어 붙이는 체인 해시다. 새 턴을 붙일 때 이전 해시와 새 메시지만 보면 된다.
+import hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+EMPTY_HISTORY_HASH = ""
+
+def chain_hash(prev_hash: str, messages: Iterable[dict]) -> str:
+    h = prev_hash
+    for m in messages:
+        digest = hashlib.sha256()
+        digest.update(h.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(str(m.get("role") or "").encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(str(m.get("content") or "").encode("utf-8"))
+        h = digest.hexdigest()[:32]
+    return h
+
+def history_hash(messages: Iterable[dict]) -> str:
+    """클라이언트가 가진 대화 전체의 해시. 서버 저장본과 같은지 비교하는 데 쓴다."""
+    return chain_hash(EMPTY_HISTORY_HASH, messages)
+
+# <---------- Store ---------->
+# (user_id, uuid) 별 append-only 대화 로그. 다른 유저가 같은 uuid 를 보내면 저장본을 읽거나 덮어쓰지 못하고 거절된다.
+#   - hot: 최근 대화. 메시지는 (role, content) 튜플 리스트로 들고 있어 새 턴은 append 한 번이다.
+#   - cold: hot 에서 밀려난 대화. JSON 을 zlib 으로 압축해 보관하고, 다시 조회되면 hot 으로 올린다.
+# 워커 프로세스 메모리에만 있다. 공유 저장소가 아니므로 여러 워커/인스턴스로 띄우면 uuid 기준 sticky routing 이 필요하고,
+# 그렇지 않으면 다른 워커로 간 요청은 저장본이 없어 409 를 받고 클라이언트가 전체 대화를 다시 보낸다.
+import json
+import time
+import zlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from ..config.config import (
+    CONVERSATION_HOT_MAX, CONVERSATION_COLD_MAX,
+    CONVERSATION_TTL, CONVERSATION_MAX_MESSAGES,
+)
+
+Key = Tuple[str, str]  # (user_id, uuid)
+
+@dataclass
+class Conversation:
+    messages: List[Tuple[str, str]]
+    character: Optional[dict]   # {"prompt", "public_prompt", "img_list"}
+    history_hash: str
+    touched_at: float = field(default_factory=time.monotonic)
+
+    def history(self) -> List[dict]:
+        return [{"role": r, "content": c} for r, c in self.messages]
+
+@dataclass
+class PendingTurn:
+    """응답을 받은 뒤 저장소에 반영할 한 턴."""
+    user_id: str
+    uuid: str
+    base_hash: Optional[str]    # 요청이 기준으로 삼은 저장본 해시. 전체 대화를 보낸 경우 None
+    history: List[dict]         # 요청 시점의 과거 대화 (잘라내기 전)
+    message: Optional[str]
+    character: Optional[dict]
+
+def _pack(conv: Conversation) -> bytes:
+    raw = json.dumps(
+        {"m": conv.messages, "c": conv.character, "h": conv.history_hash},
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return zlib.compress(raw.encode("utf-8"), 6)
+
+def _unpack(blob: bytes) -> Conversation:
+    raw = json.loads(zlib.decompress(blob).decode("utf-8"))
+    return Conversation([tuple(m) for m in raw["m"]], raw["c"], raw["h"])
+
+class ConversationStore:
+    """(user_id, uuid) 단위 대화 저장소.
+    Args:
+        hot_max (int): hot 티어에 둘 대화 수
+        cold_max (int): cold 티어에 둘 대화 수. 넘치면 오래된 것부터 버린다
+        ttl (float): 마지막 사용 후 보관 시간(초)
+        max_messages (int): 대화당 보관할 최근 메시지 수. 해시는 잘린 앞부분까지 포함한 값을 유지한다
+    """
+    SWEEP_EVERY = 10000
+
+    def __init__(
+        self,
+        hot_max: int = CONVERSATION_HOT_MAX,
+        cold_max: int = CONVERSATION_COLD_MAX,
+        ttl: float = CONVERSATION_TTL,
+        max_messages: int = CONVERSATION_MAX_MESSAGES,
+    ) -> None:
+        self._hot: "OrderedDict[Key, Conversation]" = OrderedDict()
+        self._cold: "OrderedDict[Key, Tuple[bytes, float]]" = OrderedDict()
+        self._owners: Dict[str, str] = {}  # uuid -> user_id. 저장본이 남아 있는 동안만 들고 있는다
+        self._hot_max = hot_max
+        self._cold_max = cold_max
+        self._ttl = ttl
+        self._max_messages = max_messages
+        self._lock = threading.Lock()
+        self._ops = 0
+
+    def _forget_locked(self, key: Key) -> None:
+        if self._owners.get(key[1]) == key[0]:
+            del self._owners[key[1]]
+
+    def _check_owner_locked(self, user_id: str, uuid: str) -> None:
+        owner = self._owners.get(uuid)
+        if owner is not None and owner != user_id:
+            raise ConversationOwnerMismatch(uuid)
+
+    def _get_locked(self, key: Key, now: float) -> Optional[Conversation]:
+        conv = self._hot.get(key)
+        if conv is not None:
+            if now - conv.touched_at > self._ttl:
+                del self._hot[key]
+                self._forget_locked(key)
+                return None
+            self._hot.move_to_end(key)
+            conv.touched_at = now
+            return conv
+
+        cold = self._cold.pop(key, None)
+        if cold is None:
+            return None
+        blob, touched_at = cold
+        if now - touched_at > self._ttl:
+            self._forget_locked(key)
+            return None
+        conv = _unpack(blob)
+        conv.touched_at = now
+        self._put_locked(key, conv)
+        return conv
+
+    def _put_locked(self, key: Key, conv: Conversation) -> None:
+        self._hot[key] = conv
+        self._hot.move_to_end(key)
+        self._owners[key[1]] = key[0]
+        while len(self._hot) > self._hot_max:
+            old_key, old = self._hot.popitem(last=False)
+            self._cold[old_key] = (_pack(old), old.touched_at)
+        while len(self._cold) > self._cold_max:
+            old_key, _ = self._cold.popitem(last=False)
+            self._forget_locked(old_key)
+
+    def check_owner(self, user_id: str, uuid: str) -> None:
+        """다른 유저의 저장본이 있는 uuid 인지 확인한다.
+        Raises:
+            ConversationOwnerMismatch: 다른 유저가 쓰고 있는 uuid 인 경우
+        """
+        with self._lock:
+            self._check_owner_locked(user_id, uuid)
+
+    def resolve(self, user_id: str, uuid: str, base_hash: str) -> Optional[Tuple[List[dict], Optional[dict]]]:
+        """저장본의 해시가 base_hash 와 같으면 (과거 대화, 캐릭터) 를 반환한다. 없거나 다르면 None.
+        Raises:
+            ConversationOwnerMismatch: 다른 유저가 쓰고 있는 uuid 인 경우
+        """
+        with self._lock:
+            self._check_owner_locked(user_id, uuid)
+            conv = self._get_locked((user_id, uuid), time.monotonic())
+            if conv is None or conv.history_hash != base_hash:
+                return None
+            return conv.history(), conv.character
+
+    def commit(self, turn: PendingTurn, reply: str) -> str:
+        """요청 메시지와 응답을 대화에 붙이고 새 해시를 반환한다.
+        저장본이 요청의 기준과 다르면(동시 요청, 전체 대화 재전송) 요청 기준의 대화로 교체한다.
+        Raises:
+            ConversationOwnerMismatch: 다른 유저가 쓰고 있는 uuid 인 경우 (저장본은 바뀌지 않는다)
+        """
+        new_messages = []
+        if turn.message:
+            new_messages.append(("user", turn.message))
+        new_messages.append(("assistant", reply))
+        new_dicts = [{"role": r, "content": c} for r, c in new_messages]
+
+        key = (turn.user_id, turn.uuid)
+        with self._lock:
+            self._check_owner_locked(turn.user_id, turn.uuid)
+            now = time.monotonic()
+            conv = self._get_locked(key, now)
+            if conv is not None and turn.base_hash is not None and conv.history_hash == turn.base_hash:
+                conv.messages.extend(new_messages)
+                conv.history_hash = chain_hash(conv.history_hash, new_dicts)
+            else:
+                base = [(str(m.get("role")), str(m.get("content") or "")) for m in turn.history]
+                character = turn.character if turn.character is not None else (conv.character if conv else None)
+                conv = Conversation(base + new_messages, character, history_hash(turn.history + new_dicts), now)
+                self._put_locked(key, conv)
+
+            if len(conv.messages) > self._max_messages:
+                del conv.messages[:len(conv.messages) - self._max_messages]
+
+            self._ops += 1
+            if self._ops >= self.SWEEP_EVERY:
+                self._sweep_locked(now)
+            return conv.history_hash
+
+    def _sweep_locked(self, now: float) -> int:
+        # 만료된 대화가 조회되지 않은 채 메모리에 남는 것을 막는다
+        self._ops = 0
+        hot = [k for k, c in self._hot.items() if now - c.touched_at > self._ttl]
+        cold = [k for k, (_, t) in self._cold.items() if now - t > self._ttl]
+        for k in hot:
+            del self._hot[k]
+            self._forget_locked(k)
+        for k in cold:
+            del self._cold[k]
+            self._forget_locked(k)
+        return len(hot) + len(cold)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "hot": len(self._hot),
+                "cold": len(self._cold),
+                "cold_bytes": sum(len(b) for b, _ in self._cold.values()),
+            }
+
+conversation_store = ConversationStore()
@@ -0,0 +1,142 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class InsufficientCredit(Exception): ...
+
+# <---------- Reservation ---------->
+# 업스트림 호출 전에 max_credit 을 원자적으로 선차감(reserve)하고,
+# 호출 후 실제 비용과의 차액만 메모리에 모아 주기적으로 한 번에 환불(settle)한다.
+# 환불이 반영되기 전까지 잔액은 실제보다 낮게 보이므로 동시 요청이 있어도 과다 제공은 일어나지 않는다.
+import atexit
+import math
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .db import get_conn, get_async_conn
+from .user_state import DatabaseError
+from ..config.config import CREDIT_PER_1K_TOKENS, CREDIT_SETTLE_INTERVAL, CREDIT_SETTLE_BATCH
+
+@dataclass
+class Reservation:
+    user_id: str
+    amount: int
+    settled: bool = field(default=False, compare=False)
+
+_RESERVE_SQL = text("UPDATE users SET credit = credit - :amount WHERE id = :id AND credit >= :amount")
+
+def reserve_credit(user_id: str, amount: int) -> Reservation:
+    """크레딧을 원자적으로 선차감한다. 조건부 UPDATE 한 번이 전부다.
+    Raises:
+        InsufficientCredit: 잔액이 부족하거나 유저가 없는 경우
+        DatabaseError: 데이터베이스 접근 도중 오류가 발생한 경우
+    """
+    try:
+        with get_conn() as conn:
+            with conn.begin():
+                rowcount = conn.execute(_RESERVE_SQL, {"id": user_id, "amount": amount}).rowcount
+    except Exception as e:
+        raise DatabaseError("Database error") from e
+    if rowcount != 1:
+        raise InsufficientCredit(user_id)
+    return Reservation(user_id, amount)
+
+async def reserve_credit_async(user_id: str, amount: int) -> Reservation:
+    """reserve_credit 의 비동기 버전."""
+    try:
+        async with get_async_conn() as conn:
+            async with conn.begin():
+                rowcount = (await conn.execute(_RESERVE_SQL, {"id": user_id, "amount": amount})).rowcount
+    except Exception as e:
+        raise DatabaseError("Database error") from e
+    if rowcount != 1:
+        raise InsufficientCredit(user_id)
+    return Reservation(user_id, amount)
+
+def estimate_cost(input_chars: int, output_chars: int) -> int:
+    """입출력 길이로 실제 비용(크레딧)을 추정한다. 최소 1."""
+    tokens = (input_chars + output_chars) / 4
+    return max(1, math.ceil(tokens / 1000 * CREDIT_PER_1K_TOKENS))
+
+# <---------- Write-behind settlement ---------->
+_pending: Dict[str, int] = {}
+_pending_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+_flusher_stop = threading.Event()
+
+def settle_credit(reservation: Reservation, actual_cost: int) -> None:
+    """예약분과 실제 비용의 차액을 환불 대기열에 넣는다. DB는 건드리지 않는다."""
+    if reservation.settled:
+        return
+    reservation.settled = True
+    refund = reservation.amount - min(max(actual_cost, 0), reservation.amount)
+    if refund <= 0:
+        return
+    with _pending_lock:
+        _pending[reservation.user_id] = _pending.get(reservation.user_id, 0) + refund
+    _ensure_flusher()
+
+def release_credit(reservation: Reservation) -> None:
+    """업스트림 실패 등으로 과금하지 않을 때 예약분 전체를 돌려준다."""
+    settle_credit(reservation, 0)
+
+def _bulk_refund_sql(n: int):
+    cases = " ".join(f"WHEN :id{i} THEN :amt{i}" for i in range(n))
+    ids = ", ".join(f":id{i}" for i in range(n))
+    return text(f"UPDATE users SET credit = credit + CASE id {cases} ELSE 0 END WHERE id IN ({ids})")
+
+def flush_settlements() -> int:
+    """대기 중인 환불을 CREDIT_SETTLE_BATCH 명씩 묶어 UPDATE 한 번으로 반영한다. 반영한 유저 수를 반환한다."""
+    with _pending_lock:
+        if not _pending:
+            return 0
+        items: List[Tuple[str, int]] = list(_pending.items())
+        _pending.clear()
+
+    done = 0
+    try:
+        with get_conn() as conn:
+            for start in range(0, len(items), CREDIT_SETTLE_BATCH):
+                batch = items[start:start + CREDIT_SETTLE_BATCH]
+                params = {}
+                for i, (user_id, amount) in enumerate(batch):
+                    params[f"id{i}"] = user_id
+                    params[f"amt{i}"] = amount
+                with conn.begin():
+                    conn.execute(_bulk_refund_sql(len(batch)), params)
+                done += len(batch)
+    except Exception as e:
+        # 반영하지 못한 환불은 다음 주기에 다시 시도한다
+        with _pending_lock:
+            for user_id, amount in items[done:]:
+                _pending[user_id] = _pending.get(user_id, 0) + amount
+        logger.error(f"Failed to flush credit settlements, {len(items) - done} pending", exc_info=e)
+    return done
+
+def _flusher_loop() -> None:
+    while not _flusher_stop.wait(CREDIT_SETTLE_INTERVAL):
+        flush_settlements()
+
+def _ensure_flusher() -> None:
+    # 포크 이후 워커 안에서 처음 정산할 때 스레드를 띄운다
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _flusher_stop.clear()
+        _flusher = threading.Thread(target=_flusher_loop, name="credit-settle", daemon=True)
+        _flusher.start()
+
+def stop_settlement() -> None:
+    _flusher_stop.set()
+    flush_settlements()
+
+atexit.register(stop_settlement)
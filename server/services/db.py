@@ -0,0 +1,178 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Pool stats ---------->
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from .metrics import DB_POOL_WAIT, DB_QUERY_DURATION, DB_POOL_PRE_PING_FAILURES, DB_POOL_TIMEOUTS, register_gauge
+
+# /metrics 에 카운터로도 내보내는 계측값
+_EXPORTED = {"pre_ping_failures": DB_POOL_PRE_PING_FAILURES, "timeouts": DB_POOL_TIMEOUTS}
+
+class PoolStats:
+    """커넥션 풀 계측값. 이벤트 리스너와 get_conn 에서 갱신한다.
+    Args:
+        name (str): /metrics 의 engine 라벨 ("sync" | "async")
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pre_ping_failures = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        # 한 번도 일어나지 않은 엔진도 0 으로 보이게 한다
+        for metric in _EXPORTED.values():
+            metric.inc(name, amount=0)
+
+    def incr(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+        metric = _EXPORTED.get(name)
+        if metric is not None:
+            metric.inc(self.name)
+
+    def observe_wait(self, seconds: float) -> None:
+        DB_POOL_WAIT.observe(seconds, self.name)
+        with self._lock:
+            self.wait_count += 1
+            self.wait_total += seconds
+            if seconds > self.wait_max:
+                self.wait_max = seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "pre_ping_failures": self.pre_ping_failures,
+                "timeouts": self.timeouts,
+                "wait_count": self.wait_count,
+                "wait_seconds_total": self.wait_total,
+                "wait_seconds_max": self.wait_max,
+            }
+
+def _instrument(engine: Any, stats: PoolStats) -> None:
+    from sqlalchemy import event
+
+    event.listen(engine.pool, "connect", lambda *a: stats.incr("connects"))
+    event.listen(engine.pool, "checkout", lambda *a: stats.incr("checkouts"))
+    event.listen(engine.pool, "invalidate", lambda *a: stats.incr("invalidations"))
+
+    def _on_error(ctx) -> None:
+        if getattr(ctx, "is_pre_ping", False):
+            stats.incr("pre_ping_failures")
+    event.listen(engine, "handle_error", _on_error)
+
+    # 쿼리 실행 시간. 실패한 쿼리는 after 이벤트가 오지 않으므로 다음 before 에서 덮어쓴다
+    def _before(conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info["query_started"] = time.perf_counter()
+
+    def _after(conn, cursor, statement, parameters, context, executemany) -> None:
+        started = conn.info.pop("query_started", None)
+        if started is not None:
+            DB_QUERY_DURATION.observe(time.perf_counter() - started, stats.name)
+    event.listen(engine, "before_cursor_execute", _before)
+    event.listen(engine, "after_cursor_execute", _after)
+
+def _pool_state(engine: Any) -> Dict[str, Any]:
+    pool = engine.pool
+    return {
+        "size": pool.size(),
+        "checked_out": pool.checkedout(),
+        "checked_in": pool.checkedin(),
+        "overflow": pool.overflow(),
+    }
+
+# <---------- MySQL ---------->
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from ..config.config import (
+    DB_URL, DB_ASYNC_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT, DB_POOL_RECYCLE, DB_POOL_PRE_PING,
+    DB_ASYNC_POOL_SIZE, DB_ASYNC_MAX_OVERFLOW,
+)
+
+POOL_OPTIONS: Dict[str, Any] = dict(
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+
+# 모든 서비스가 공유하는 워커 프로세스당 단일 엔진
+engine: Engine = create_engine(DB_URL, **POOL_OPTIONS)
+sync_stats = PoolStats("sync")
+_instrument(engine, sync_stats)
+
+def get_conn() -> Connection:
+    """공유 풀에서 커넥션을 꺼낸다. 대기 시간과 타임아웃을 기록한다."""
+    started = time.perf_counter()
+    try:
+        conn = engine.connect()
+    except PoolTimeoutError as e:
+        sync_stats.incr("timeouts")
+        logger.error("Timed out waiting for DB connection", exc_info=e)
+        raise
+    except Exception as e:
+        logger.error("Failed to get DB connection", exc_info=e)
+        raise
+    sync_stats.observe_wait(time.perf_counter() - started)
+    return conn
+
+# <---------- MySQL (async) ---------->
+# 비동기 엔진은 ASGI 경로에서만 필요하므로 처음 사용할 때 만든다 (aiomysql 미설치 환경 보호)
+# 동기 엔진과 같은 프로세스에 함께 뜨므로 풀 크기는 DB_ASYNC_* 로 따로 잡는다
+ASYNC_POOL_OPTIONS: Dict[str, Any] = dict(
+    POOL_OPTIONS,
+    pool_size=DB_ASYNC_POOL_SIZE,
+    max_overflow=DB_ASYNC_MAX_OVERFLOW,
+)
+_async_engine: Optional[Any] = None
+_async_engine_lock = threading.Lock()
+async_stats = PoolStats("async")
+
+def get_async_engine() -> Any:
+    global _async_engine
+    if _async_engine is None:
+        with _async_engine_lock:
+            if _async_engine is None:
+                from sqlalchemy.ext.asyncio import create_async_engine
+                _async_engine = create_async_engine(DB_ASYNC_URL, **ASYNC_POOL_OPTIONS)
+                _instrument(_async_engine.sync_engine, async_stats)
+    return _async_engine
+
+def get_async_conn() -> Any:
+    """공유 비동기 풀의 AsyncConnection 을 반환한다. 실제 체크아웃은 async with 진입 시 일어난다."""
+    try:
+        return get_async_engine().connect()
+    except Exception as e:
+        logger.error("Failed to get async DB connection", exc_info=e)
+        raise
+
+# <---------- Metrics ---------->
+def pool_stats() -> Dict[str, Any]:
+    """풀 상태(체크아웃/오버플로)와 누적 계측값을 반환한다."""
+    stats: Dict[str, Any] = {"sync": {**_pool_state(engine), **sync_stats.snapshot()}}
+    if _async_engine is not None:
+        stats["async"] = {**_pool_state(_async_engine.sync_engine), **async_stats.snapshot()}
+    return stats
+
+def _pool_gauges():
+    for name, state in pool_stats().items():
+        for key in ("size", "checked_out", "checked_in", "overflow"):
+            yield (name, key), state[key]
+
+register_gauge("dive_db_pool_connections", "Connection pool state", ("engine", "state"), _pool_gauges)
@@ -0,0 +1,272 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Columnar feedback ---------->
+# 피드백 세그먼트(feedback_store 의 file 백엔드)를 열 단위 NumPy 배열로 읽어 들여 그룹별 만족도를 계산한다.
+# - 범주형 열(model, public_prompt, image_key)은 사전 인코딩한 int32 코드로 들고 있다.
+# - 그룹별 합계/긍정 수/사유 히스토그램은 새 레코드가 들어올 때 bincount 로 누적하므로 전체 기간 조회는 배열 몇 개를 읽는 것이 전부다.
+# - 세그먼트는 파일별로 읽은 압축 바이트 위치를 기억해 새로 붙은 gzip 멤버만 읽는다.
+# - 읽은 열은 주기적으로 .npy 스냅샷으로 남기고, 다시 뜰 때는 mmap 으로 열어 세그먼트를 처음부터 읽지 않는다.
+import os
+import json
+import glob
+import time
+import zlib
+import shutil
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # 선택 의존성
+    np = None
+
+from .http_json import loads
+from ..config.config import FEEDBACK_DIR, FEEDBACK_ANALYTICS_DIR, FEEDBACK_ANALYTICS_REFRESH, FEEDBACK_ANALYTICS_SNAPSHOT_ROWS
+
+DIMENSIONS = ("model", "public_prompt", "image_key")
+COLUMNS = DIMENSIONS + ("is_good", "reason", "received_at")
+REASON_BINS = 16  # 0 은 사유 없음, 1..15 는 reasone 값 0..14 (그 이상은 마지막 칸)
+UNKNOWN = "unknown"
+_REASON_LABELS = ["none"] + [str(b) for b in range(REASON_BINS - 2)] + [f"{REASON_BINS - 2}+"]
+
+def _dtype(column: str) -> Any:
+    return {"is_good": np.bool_, "reason": np.int16, "received_at": np.float64}.get(column, np.int32)
+
+def _reason_bins(reason: "np.ndarray") -> "np.ndarray":
+    return np.clip(reason.astype(np.int32) + 1, 0, REASON_BINS - 1)
+
+class FeedbackAnalytics:
+    """피드백 세그먼트 위의 열 저장소와 누적 집계.
+    Args:
+        segment_dir (str): 피드백 세그먼트 디렉터리
+        snapshot_dir (str): 열 스냅샷을 둘 디렉터리
+        refresh_interval (float): 조회 시 세그먼트를 다시 훑는 최소 간격(초)
+        snapshot_rows (int): 마지막 스냅샷 이후 이만큼 쌓이면 새 스냅샷을 남긴다
+    """
+    def __init__(self, segment_dir: str, snapshot_dir: str, refresh_interval: float, snapshot_rows: int) -> None:
+        self.segment_dir = segment_dir
+        self.snapshot_dir = snapshot_dir
+        self.refresh_interval = refresh_interval
+        self.snapshot_rows = snapshot_rows
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._last_refresh = 0.0
+        self._offsets: Dict[str, int] = {}
+        self._codes: Dict[str, Dict[str, int]] = {d: {} for d in DIMENSIONS}
+        self._names: Dict[str, List[str]] = {d: [] for d in DIMENSIONS}
+        self._chunks: Dict[str, List["np.ndarray"]] = {c: [] for c in COLUMNS}
+        self._rows = 0
+        self._snapshot_rows = 0
+        self._total: Dict[str, "np.ndarray"] = {}
+        self._good: Dict[str, "np.ndarray"] = {}
+        self._reasons: Dict[str, "np.ndarray"] = {}
+
+    # <---------- Ingest ---------->
+    def _encode(self, dimension: str, value: Optional[str]) -> int:
+        key = value or UNKNOWN
+        code = self._codes[dimension].get(key)
+        if code is None:
+            code = self._codes[dimension][key] = len(self._names[dimension])
+            self._names[dimension].append(key)
+        return code
+
+    def _accumulate(self, batch: Dict[str, "np.ndarray"]) -> None:
+        bad = ~batch["is_good"]
+        bins = _reason_bins(batch["reason"][bad])
+        for d in DIMENSIONS:
+            n = len(self._names[d])
+            codes = batch[d]
+            total = np.bincount(codes, minlength=n)
+            good = np.bincount(codes, weights=batch["is_good"], minlength=n).astype(np.int64)
+            reasons = np.zeros((n, REASON_BINS), dtype=np.int64)
+            np.add.at(reasons, (codes[bad], bins), 1)
+            prev = self._total.get(d)
+            if prev is not None and len(prev) < n:
+                pad = n - len(prev)
+                self._total[d] = np.concatenate([prev, np.zeros(pad, dtype=np.int64)])
+                self._good[d] = np.concatenate([self._good[d], np.zeros(pad, dtype=np.int64)])
+                self._reasons[d] = np.vstack([self._reasons[d], np.zeros((pad, REASON_BINS), dtype=np.int64)])
+            if prev is None:
+                self._total[d], self._good[d], self._reasons[d] = total, good, reasons
+            else:
+                self._total[d] += total
+                self._good[d] += good
+                self._reasons[d] += reasons
+
+    def _append(self, records: List[Dict[str, Any]]) -> None:
+        if not records:
+            return
+        batch: Dict[str, "np.ndarray"] = {}
+        for d in DIMENSIONS:
+            if d == "image_key":
+                values = [self._encode(d, (r.get("image") or {}).get("key")) for r in records]
+            else:
+                values = [self._encode(d, r.get(d)) for r in records]
+            batch[d] = np.fromiter(values, dtype=np.int32, count=len(records))
+        batch["is_good"] = np.fromiter((bool(r.get("is_good")) for r in records), dtype=np.bool_, count=len(records))
+        batch["reason"] = np.fromiter(
+            (-1 if r.get("reasone") is None else int(r["reasone"]) for r in records), dtype=np.int16, count=len(records)
+        )
+        batch["received_at"] = np.fromiter((float(r.get("received_at") or 0.0) for r in records), dtype=np.float64, count=len(records))
+        for c in COLUMNS:
+            self._chunks[c].append(batch[c])
+        self._rows += len(records)
+        self._accumulate(batch)
+
+    def _read_new(self, path: str) -> List[Dict[str, Any]]:
+        """파일에 새로 붙은 완전한 gzip 멤버만 읽는다. 쓰는 중인 마지막 멤버는 다음에 읽는다."""
+        offset = self._offsets.get(path, 0)
+        if os.path.getsize(path) <= offset:
+            return []
+        with open(path, "rb") as f:
+            f.seek(offset)
+            data = f.read()
+        records: List[Dict[str, Any]] = []
+        while data:
+            d = zlib.decompressobj(zlib.MAX_WBITS | 16)
+            try:
+                raw = d.decompress(data)
+            except zlib.error:
+                logger.error(f"Corrupt feedback segment {path} at byte {offset}, skipping the rest")
+                offset += len(data)
+                break
+            if not d.eof:
+                break
+            records.extend(loads(line) for line in raw.splitlines() if line)
+            consumed = len(data) - len(d.unused_data)
+            offset += consumed
+            data = d.unused_data
+        self._offsets[path] = offset
+        return records
+
+    def refresh(self, force: bool = False) -> int:
+        """새 세그먼트 데이터를 읽어 들인다. 새로 읽은 레코드 수를 반환한다."""
+        with self._lock:
+            self._load_snapshot()
+            now = time.monotonic()
+            if not force and now - self._last_refresh < self.refresh_interval:
+                return 0
+            self._last_refresh = now
+            added = 0
+            for path in sorted(glob.glob(os.path.join(self.segment_dir, "feedback-*.jsonl.gz"))):
+                records = self._read_new(path)
+                self._append(records)
+                added += len(records)
+            if self._rows - self._snapshot_rows >= self.snapshot_rows:
+                self._save_snapshot()
+            return added
+
+    # <---------- Snapshot ---------->
+    def _column(self, c: str) -> "np.ndarray":
+        chunks = self._chunks[c]
+        if len(chunks) > 1:
+            # 조회 때마다 이어 붙이지 않도록 한 번 합쳐 둔다
+            self._chunks[c] = chunks = [np.concatenate(chunks)]
+        return chunks[0] if chunks else np.empty(0, dtype=_dtype(c))
+
+    def _save_snapshot(self) -> None:
+        # 세대별 디렉터리에 모두 쓴 뒤 CURRENT 를 바꿔 가리킨다. 여러 워커가 동시에 써도 읽는 쪽은 항상 온전한 세대를 본다
+        generation = f"gen-{time.time_ns()}-{os.getpid()}"
+        target = os.path.join(self.snapshot_dir, generation)
+        os.makedirs(target, exist_ok=True)
+        for c in COLUMNS:
+            np.save(os.path.join(target, f"{c}.npy"), self._column(c))
+        with open(os.path.join(target, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"names": self._names, "offsets": self._offsets, "rows": self._rows}, f, ensure_ascii=False)
+        pointer = os.path.join(self.snapshot_dir, "CURRENT")
+        with open(pointer + ".tmp", "w", encoding="utf-8") as f:
+            f.write(generation)
+        os.replace(pointer + ".tmp", pointer)
+        self._snapshot_rows = self._rows
+        for old in glob.glob(os.path.join(self.snapshot_dir, "gen-*")):
+            if os.path.basename(old) != generation:
+                shutil.rmtree(old, ignore_errors=True)
+
+    def _load_snapshot(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        pointer = os.path.join(self.snapshot_dir, "CURRENT")
+        if not os.path.exists(pointer):
+            return
+        try:
+            with open(pointer, encoding="utf-8") as f:
+                source = os.path.join(self.snapshot_dir, f.read().strip())
+            with open(os.path.join(source, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+            columns = {c: np.load(os.path.join(source, f"{c}.npy"), mmap_mode="r") for c in COLUMNS}
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not load feedback snapshot, rebuilding from segments, {e}")
+            return
+        self._names = {d: list(meta["names"][d]) for d in DIMENSIONS}
+        self._codes = {d: {name: i for i, name in enumerate(self._names[d])} for d in DIMENSIONS}
+        self._offsets = dict(meta["offsets"])
+        self._chunks = {c: [columns[c]] for c in COLUMNS}
+        self._rows = self._snapshot_rows = int(meta["rows"])
+        if self._rows:
+            self._accumulate(columns)
+        logger.info(f"Loaded feedback snapshot with {self._rows} rows")
+
+    # <---------- Query ---------->
+    def _groups(self, dimension: str, total: "np.ndarray", good: "np.ndarray", reasons: "np.ndarray") -> List[Dict[str, Any]]:
+        names = self._names[dimension]
+        order = np.argsort(-total, kind="stable")
+        groups = []
+        for i in order:
+            if total[i] == 0:
+                break
+            groups.append({
+                "key": names[i],
+                "total": int(total[i]),
+                "good": int(good[i]),
+                "rate": round(float(good[i]) / float(total[i]), 4),
+                "reasons": {_REASON_LABELS[b]: int(n) for b, n in enumerate(reasons[i]) if n},
+            })
+        return groups
+
+    def query(self, dimension: str, since: Optional[float] = None) -> Dict[str, Any]:
+        """dimension 별 긍정 비율과 부정 사유 히스토그램.
+        Args:
+            dimension (str): DIMENSIONS 중 하나
+            since (float | None): 이 시각(unix) 이후 레코드만 센다. None 이면 누적 집계를 그대로 쓴다
+        """
+        self.refresh()
+        with self._lock:
+            if self._rows == 0:
+                return {"group_by": dimension, "total": 0, "groups": []}
+            if since is None:
+                total, good, reasons = self._total[dimension], self._good[dimension], self._reasons[dimension]
+            else:
+                # 기간 조회는 누적 집계를 쓸 수 없으므로 열 두 개를 마스킹해 다시 센다 (벡터 연산 한 번)
+                mask = self._column("received_at") >= since
+                codes = self._column(dimension)[mask]
+                is_good = self._column("is_good")[mask]
+                n = len(self._names[dimension])
+                total = np.bincount(codes, minlength=n)
+                good = np.bincount(codes, weights=is_good, minlength=n).astype(np.int64)
+                bad = ~is_good
+                reasons = np.zeros((n, REASON_BINS), dtype=np.int64)
+                np.add.at(reasons, (codes[bad], _reason_bins(self._column("reason")[mask][bad])), 1)
+            return {
+                "group_by": dimension,
+                "total": int(total.sum()),
+                "groups": self._groups(dimension, total, good, reasons),
+            }
+
+# <---------- Instance ---------->
+_analytics: Optional[FeedbackAnalytics] = None
+_analytics_lock = threading.Lock()
+
+def get_feedback_analytics() -> FeedbackAnalytics:
+    """프로세스 하나에 하나. NumPy 가 없으면 RuntimeError."""
+    global _analytics
+    if np is None:
+        raise RuntimeError("numpy is required for feedback analytics")
+    if _analytics is None:
+        with _analytics_lock:
+            if _analytics is None:
+                _analytics = FeedbackAnalytics(FEEDBACK_DIR, FEEDBACK_ANALYTICS_DIR, FEEDBACK_ANALYTICS_REFRESH, FEEDBACK_ANALYTICS_SNAPSHOT_ROWS)
+    return _analytics
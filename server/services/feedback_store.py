@@ -0,0 +1,202 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class FeedbackBufferFull(Exception):
+    def __init__(self, size: int) -> None:
+        super().__init__(f"Feedback buffer is full ({size} records)")
+        self.size = size
+
+# <---------- Sinks ---------->
+# 평가 피드백을 묶음 단위로 쓰는 대상. write 는 묶음 하나를 통째로 쓰거나 예외를 던진다.
+import os
+import gzip
+import time
+import atexit
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from sqlalchemy import text
+
+from .db import get_conn
+from .http_json import dumps_bytes
+from .metrics import counter, register_gauge
+from ..config.config import (
+    FEEDBACK_BACKEND, FEEDBACK_DIR, FEEDBACK_FLUSH_INTERVAL, FEEDBACK_FLUSH_SIZE, FEEDBACK_BUFFER_MAX,
+    FEEDBACK_SEGMENT_BYTES, FEEDBACK_SEGMENT_SECONDS, FEEDBACK_GZIP_LEVEL,
+)
+
+class SegmentFileSink:
+    """gzip 으로 압축한 JSON Lines 세그먼트 파일에 추가만 한다.
+    묶음 하나가 gzip 멤버 하나이고, 여러 멤버를 이어 붙인 파일도 gzip 으로 그대로 읽힌다 (zcat, gzip.open).
+    워커마다 파일을 따로 쓰므로 프로세스 간 잠금이 없다. 크기나 나이가 넘으면 새 세그먼트로 넘어간다.
+    Args:
+        directory (str): 세그먼트를 둘 디렉터리
+        segment_bytes (int): 세그먼트 하나의 최대 크기(압축 후)
+        segment_seconds (float): 세그먼트 하나를 쓸 최대 시간
+        level (int): gzip 압축 레벨
+    """
+    def __init__(self, directory: str, segment_bytes: int, segment_seconds: float, level: int) -> None:
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.segment_seconds = segment_seconds
+        self.level = level
+        self._path: Optional[str] = None
+        self._opened_at = 0.0
+        self._size = 0
+
+    def _segment(self, incoming: int) -> str:
+        now = time.time()
+        if (
+            self._path is None
+            or self._size + incoming > self.segment_bytes
+            or now - self._opened_at > self.segment_seconds
+        ):
+            os.makedirs(self.directory, exist_ok=True)
+            stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(now))
+            self._path = os.path.join(self.directory, f"feedback-{stamp}-{os.getpid()}-{int(now * 1000) % 1000:03d}.jsonl.gz")
+            self._opened_at = now
+            self._size = 0
+        return self._path
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        data = gzip.compress(b"".join(dumps_bytes(r) + b"\n" for r in records), compresslevel=self.level)
+        path = self._segment(len(data))
+        with open(path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._size += len(data)
+
+class DatabaseSink:
+    """묶음을 다중 행 INSERT 한 번으로 evaluation_feedback 테이블에 쓴다.
+        CREATE TABLE evaluation_feedback (
+            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+            user_id VARCHAR(64) NOT NULL,
+            is_good BOOLEAN NOT NULL,
+            reason INT NULL,
+            payload JSON NOT NULL,
+            created_at DOUBLE NOT NULL
+        )
+    Args:
+        batch (int): INSERT 한 번의 최대 행 수
+    """
+    def __init__(self, batch: int) -> None:
+        self.batch = batch
+
+    @staticmethod
+    def _insert_sql(n: int):
+        rows = ", ".join(f"(:u{i}, :g{i}, :r{i}, :p{i}, :t{i})" for i in range(n))
+        return text(f"INSERT INTO evaluation_feedback (user_id, is_good, reason, payload, created_at) VALUES {rows}")
+
+    def write(self, records: List[Dict[str, Any]]) -> None:
+        with get_conn() as conn:
+            with conn.begin():
+                for start in range(0, len(records), self.batch):
+                    chunk = records[start:start + self.batch]
+                    params = {}
+                    for i, r in enumerate(chunk):
+                        params[f"u{i}"] = r["user"]
+                        params[f"g{i}"] = r["is_good"]
+                        params[f"r{i}"] = r.get("reasone")
+                        params[f"p{i}"] = dumps_bytes(r).decode("utf-8")
+                        params[f"t{i}"] = r["received_at"]
+                    conn.execute(self._insert_sql(len(chunk)), params)
+
+# <---------- Buffer ---------->
+# 요청 스레드는 메모리 버퍼에 넣기만 하고, 플러시 스레드가 주기적으로(또는 FEEDBACK_FLUSH_SIZE 개가 쌓이면) 묶어서 쓴다.
+FEEDBACK_RECORDS = counter("dive_feedback_records_total", "Evaluation feedback records by outcome", ("outcome",))
+
+def _build_sink() -> Any:
+    if FEEDBACK_BACKEND == "db":
+        return DatabaseSink(FEEDBACK_FLUSH_SIZE)
+    return SegmentFileSink(FEEDBACK_DIR, FEEDBACK_SEGMENT_BYTES, FEEDBACK_SEGMENT_SECONDS, FEEDBACK_GZIP_LEVEL)
+
+class FeedbackStore:
+    """평가 피드백 버퍼.
+    Args:
+        sink (Any): write(records) 를 가진 대상
+        max_buffer (int): 쓰기 전 들고 있을 최대 레코드 수
+        flush_size (int): 이만큼 쌓이면 주기를 기다리지 않고 쓴다
+        flush_interval (float): 쓰기 주기(초)
+    """
+    def __init__(self, sink: Any, max_buffer: int, flush_size: int, flush_interval: float) -> None:
+        self.sink = sink
+        self.max_buffer = max_buffer
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._flusher: Optional[threading.Thread] = None
+
+    def append(self, record: Dict[str, Any]) -> None:
+        """레코드를 버퍼에 넣는다. 파일/DB 는 건드리지 않는다.
+        Raises:
+            FeedbackBufferFull: 버퍼가 가득 찬 경우 (쓰기가 계속 실패하는 중)
+        """
+        with self._lock:
+            if len(self._buffer) >= self.max_buffer:
+                FEEDBACK_RECORDS.inc("rejected")
+                raise FeedbackBufferFull(len(self._buffer))
+            self._buffer.append(record)
+            size = len(self._buffer)
+        self._ensure_flusher()
+        if size >= self.flush_size:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """버퍼를 비워 sink 에 쓴다. 쓴 레코드 수를 반환한다. 실패하면 레코드를 버퍼 앞쪽에 되돌린다."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._buffer:
+                    return 0
+                records = list(self._buffer)
+                self._buffer.clear()
+            try:
+                self.sink.write(records)
+            except Exception as e:
+                with self._lock:
+                    self._buffer.extendleft(reversed(records))
+                FEEDBACK_RECORDS.inc("failed", amount=len(records))
+                logger.error(f"Failed to write {len(records)} feedback records", exc_info=e)
+                return 0
+            FEEDBACK_RECORDS.inc("written", amount=len(records))
+            return len(records)
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def _ensure_flusher(self) -> None:
+        # 포크 이후 워커 안에서 처음 쓸 때 스레드를 띄운다
+        if self._flusher is not None and self._flusher.is_alive():
+            return
+        with self._start_lock:
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._stop.clear()
+            self._flusher = threading.Thread(target=self._loop, name="feedback-flush", daemon=True)
+            self._flusher.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wake.set()
+        self.flush()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._buffer)
+
+feedback_store = FeedbackStore(_build_sink(), FEEDBACK_BUFFER_MAX, FEEDBACK_FLUSH_SIZE, FEEDBACK_FLUSH_INTERVAL)
+atexit.register(feedback_store.stop)
+
+register_gauge("dive_feedback_buffered", "Evaluation feedback records waiting to be written", (), lambda: [((), len(feedback_store))])
@@ -1,58 +1,55 @@
 # gemini_client.py
-import os, json, re
-from typing import List, Optional, Dict, Any
+import os
+import asyncio, functools
+from typing import List, Optional, Dict, Any, Iterator
 
 from google import genai
 from google.genai import types
 from schemas.ai_response import ChatResponse as ChatRespModel
+from .prompt_cache import gemini_prefix_cache
+from .json_parser import parse_chat_response
 
 # ---- Client ----
 def gemini_setup_client() -> genai.Client:
     return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 
-# ---- Helpers ----
-def _mk_text_part(text: str):
-    """google.genai 버전차를 흡수하여 안전하게 텍스트 Part 생성"""
-    # 신버전 경로
+def gemini_warm_up_client(client: genai.Client, model: str = "gemini-2.0-flash") -> None:
+    """모델 메타데이터를 한 번 조회해 커넥션을 미리 열어둔다."""
+    client.models.get(model=model)
+
+# ---- SDK capabilities ----
+# 설치된 google.genai 가 지원하는 경로를 import 시 한 번만 확인한다. 요청 경로에서는 try/except 를 돌지 않는다.
+def _detect_part_factory():
     try:
-        return types.Part(text=text)
+        types.Part(text="")
+        return lambda text: types.Part(text=text)
     except Exception:
         pass
-    # 구버전 경로 (키워드 인자!)
     try:
-        return types.Part.from_text(text=text)
+        types.Part.from_text(text="")
+        return lambda text: types.Part.from_text(text=text)
     except Exception:
-        pass
-    # 최후 수단: 문자열 그대로 (일부 버전 허용)
-    return text
+        # 최후 수단: 문자열 그대로 (일부 버전 허용)
+        return lambda text: text
+
+_mk_text_part = _detect_part_factory()
+
+_CONFIG_FIELDS = frozenset(getattr(types.GenerateContentConfig, "model_fields", ()) or ())
+# 필드 목록을 알 수 없는 버전이면 지원한다고 보고, 생성 시 TypeError 로 한 번 더 확인한다
+_SUPPORTS_JSON_SCHEMA = not _CONFIG_FIELDS or {"response_mime_type", "response_schema"} <= _CONFIG_FIELDS
+
+_RESPONSE_SCHEMA = ChatRespModel.model_json_schema()
+
+# ---- Helpers ----
+# Gemini 는 user/model 두 역할만 받는다. system 턴(요약 등)은 user 로 보낸다.
+_ROLE_MAP = {"user": "user", "assistant": "model", "model": "model", "system": "user"}
 
 def _to_genai_contents(message_input: List[dict]) -> List[types.Content]:
-    contents: List[types.Content] = []
-    for m in message_input:
-        role = m.get("role", "user")
-        content = m.get("content", "")
-        part = _mk_text_part(str(content))
-        # Content 생성도 버전차 보완
-        try:
-            contents.append(types.Content(role=role, parts=[part]))
-        except Exception:
-            # 일부 버전은 parts에 str 허용 X → Part로 강제
-            contents.append(types.Content(role=role, parts=[_mk_text_part(str(content))]))
-    return contents
-
-_JSON_BLOCK = re.compile(r"```(?:json)?\s*(\{.*?\})\s*```", re.DOTALL)
-
-def _extract_json_text(text: str) -> str:
-    """코드블록/잡텍스트에서 첫 JSON 오브젝트만 추출"""
-    if not text:
-        return ""
-    m = _JSON_BLOCK.search(text)
-    if m:
-        return m.group(1).strip()
-    s, e = text.find("{"), text.rfind("}")
-    if s != -1 and e != -1 and e > s:
-        return text[s:e+1].strip()
-    return text.strip()
+    content_cls, role_map, mk_part = types.Content, _ROLE_MAP, _mk_text_part
+    return [
+        content_cls(role=role_map.get(m.get("role"), "user"), parts=[mk_part(str(m.get("content") or ""))])
+        for m in message_input
+    ]
 
 def _extract_text(resp: Any) -> str:
     """
@@ -84,57 +81,93 @@ def _extract_text(resp: Any) -> str:
     # 3) 마지막 시도: 문자열화
     return str(resp)
 
-def _build_config(
-    *,
-    prompt_input: str,
+@functools.lru_cache(maxsize=64)
+def _base_config(
     temperature: float,
     top_p: float,
     max_output_tokens: int,
     seed: Optional[int],
 ) -> types.GenerateContentConfig:
+    """요청마다 같은 부분(생성 파라미터, 응답 스키마)만 조합별로 한 번 만든다. 공유 인스턴스이므로 수정하지 않는다."""
+    global _SUPPORTS_JSON_SCHEMA
     cfg: Dict[str, Any] = dict(
-        system_instruction=prompt_input,
         temperature=temperature,
         top_p=top_p,
         max_output_tokens=max_output_tokens,
-        # 아래 두 항목은 신버전에서 JSON 구조화를 지원.
-        # 구버전/호환 이슈가 있으면 try/except로 제거 fallback.
-        response_mime_type="application/json",
-        response_schema=ChatRespModel.model_json_schema(),
     )
     if seed is not None:
         cfg["seed"] = seed
 
-    try:
-        return types.GenerateContentConfig(**cfg)
-    except TypeError:
-        # 구버전 호환: schema/mime 미지원 시 제거 후 재생성
-        cfg.pop("response_mime_type", None)
-        cfg.pop("response_schema", None)
-        return types.GenerateContentConfig(**cfg)
+    if _SUPPORTS_JSON_SCHEMA:
+        try:
+            return types.GenerateContentConfig(
+                **cfg,
+                response_mime_type="application/json",
+                response_schema=_RESPONSE_SCHEMA,
+            )
+        except TypeError:
+            # 구버전 호환: schema/mime 미지원. 다음부터는 시도하지 않는다
+            _SUPPORTS_JSON_SCHEMA = False
+    return types.GenerateContentConfig(**cfg)
 
-# ---- Request ----
-def gemini_send_message(
+def _build_config(
+    *,
+    prompt_input: Optional[str],
+    temperature: float,
+    top_p: float,
+    max_output_tokens: int,
+    seed: Optional[int],
+    cached_content: Optional[str] = None,
+) -> types.GenerateContentConfig:
+    """공유 기본 설정의 얕은 복사본에 요청별 값(system_instruction 또는 cached_content)만 채운다.
+    cached content 를 쓰면 system_instruction 은 캐시에 들어 있으므로 prompt_input 은 None 으로 넘긴다.
+    """
+    base = _base_config(temperature, top_p, max_output_tokens, seed)
+    if cached_content is not None:
+        return base.model_copy(update={"cached_content": cached_content})
+    return base.model_copy(update={"system_instruction": prompt_input})
+
+def _chunk_text(chunk: Any) -> str:
+    """스트림 청크의 텍스트만 추출한다. 텍스트가 없는 청크(사용량 정보 등)는 빈 문자열."""
+    t = getattr(chunk, "text", None)
+    if isinstance(t, str):
+        return t
+    cands = getattr(chunk, "candidates", None)
+    if cands and cands[0].content:
+        return "".join(getattr(p, "text", None) or "" for p in (cands[0].content.parts or []))
+    return ""
+
+def _build_request_kwargs(
     client: genai.Client,
     message_input: List[dict],
     prompt_input: str,
     *,
-    model: str = "gemini-2.0-flash",
-    temperature: float = 0.7,
-    top_p: float = 1.0,
-    max_output_tokens: int = 1024,
-    seed: Optional[int] = None,
-    extra_headers: Optional[Dict[str, str]] = None,
-    timeout: Optional[int] = None,
-    stream: bool = False,
-) -> ChatRespModel:
+    prompt_prefix: Optional[str],
+    model: str,
+    temperature: float,
+    top_p: float,
+    max_output_tokens: int,
+    seed: Optional[int],
+    extra_headers: Optional[Dict[str, str]],
+    timeout: Optional[int],
+) -> Dict[str, Any]:
+    cached_content = None
+    if prompt_prefix and prompt_input.startswith(prompt_prefix):
+        cached_content = gemini_prefix_cache.get_or_create(client, model, prompt_prefix)
+    if cached_content is not None:
+        # 프리픽스 뒤의 가변 부분(유저 노트)은 첫 user 턴으로 보낸다
+        suffix = prompt_input[len(prompt_prefix):].strip()
+        if suffix:
+            message_input = [{"role": "user", "content": suffix}, *message_input]
+
     contents = _to_genai_contents(message_input)
     config = _build_config(
-        prompt_input=prompt_input,
+        prompt_input=None if cached_content is not None else prompt_input,
         temperature=temperature,
         top_p=top_p,
         max_output_tokens=max_output_tokens,
         seed=seed,
+        cached_content=cached_content,
     )
 
     request_kwargs: Dict[str, Any] = dict(model=model, contents=contents, config=config)
@@ -142,31 +175,121 @@ def gemini_send_message(
         request_kwargs["extra_headers"] = extra_headers
     if timeout is not None:
         request_kwargs["request_options"] = {"timeout": timeout}
+    return request_kwargs
+
+# ---- Request ----
+def gemini_stream_message(
+    client: genai.Client,
+    message_input: List[dict],
+    prompt_input: str,
+    *,
+    model: str = "gemini-2.0-flash",
+    temperature: float = 0.7,
+    top_p: float = 1.0,
+    max_output_tokens: int = 1024,
+    seed: Optional[int] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[int] = None,
+    prompt_prefix: Optional[str] = None,
+) -> Iterator[str]:
+    """응답 텍스트 청크를 도착하는 대로 yield 한다. 파싱은 호출자가 담당한다."""
+    request_kwargs = _build_request_kwargs(
+        client,
+        message_input,
+        prompt_input,
+        prompt_prefix=prompt_prefix,
+        model=model,
+        temperature=temperature,
+        top_p=top_p,
+        max_output_tokens=max_output_tokens,
+        seed=seed,
+        extra_headers=extra_headers,
+        timeout=timeout,
+    )
+    for chunk in client.models.generate_content_stream(**request_kwargs):
+        t = _chunk_text(chunk)
+        if t:
+            yield t
 
+def gemini_send_message(
+    client: genai.Client,
+    message_input: List[dict],
+    prompt_input: str,
+    *,
+    model: str = "gemini-2.0-flash",
+    temperature: float = 0.7,
+    top_p: float = 1.0,
+    max_output_tokens: int = 1024,
+    seed: Optional[int] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[int] = None,
+    stream: bool = False,
+    prompt_prefix: Optional[str] = None,
+) -> ChatRespModel:
     # --- 스트리밍 ---
     if stream:
-        stream_resp = client.models.generate_content(stream=True, **request_kwargs)
-        full_text = []
-        for chunk in stream_resp:
-            # 신버전: chunk.text / 구버전: candidates 파고들기
-            t = getattr(chunk, "text", None)
-            if isinstance(t, str) and t:
-                full_text.append(t)
-                continue
-            # fallback
-            full_text.append(_extract_text(chunk))
-        text_joined = "".join(full_text).strip()
-        try:
-            j = _extract_json_text(text_joined)
-            return ChatRespModel.model_validate(json.loads(j))
-        except Exception as e:
-            raise ValueError(f"Failed to parse stream response into Response: {text_joined}") from e
+        text_joined = "".join(gemini_stream_message(
+            client,
+            message_input,
+            prompt_input,
+            model=model,
+            temperature=temperature,
+            top_p=top_p,
+            max_output_tokens=max_output_tokens,
+            seed=seed,
+            extra_headers=extra_headers,
+            timeout=timeout,
+            prompt_prefix=prompt_prefix,
+        ))
+        return parse_chat_response(text_joined)
 
     # --- 논스트리밍 ---
+    request_kwargs = _build_request_kwargs(
+        client,
+        message_input,
+        prompt_input,
+        prompt_prefix=prompt_prefix,
+        model=model,
+        temperature=temperature,
+        top_p=top_p,
+        max_output_tokens=max_output_tokens,
+        seed=seed,
+        extra_headers=extra_headers,
+        timeout=timeout,
+    )
     resp = client.models.generate_content(**request_kwargs)
-    try:
-        text = _extract_text(resp)
-        j = _extract_json_text(text)
-        return ChatRespModel.model_validate(json.loads(j))
-    except Exception as e:
-        raise ValueError(f"Failed to parse response into Response: {_extract_text(resp)}") from e
+    return parse_chat_response(_extract_text(resp))
+
+async def gemini_send_message_async(
+    client: genai.Client,
+    message_input: List[dict],
+    prompt_input: str,
+    *,
+    model: str = "gemini-2.0-flash",
+    temperature: float = 0.7,
+    top_p: float = 1.0,
+    max_output_tokens: int = 1024,
+    seed: Optional[int] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    timeout: Optional[int] = None,
+    prompt_prefix: Optional[str] = None,
+) -> ChatRespModel:
+    """gemini_send_message 의 비동기 버전. 같은 클라이언트의 aio 인터페이스를 사용한다."""
+    build = functools.partial(
+        _build_request_kwargs,
+        client,
+        message_input,
+        prompt_input,
+        prompt_prefix=prompt_prefix,
+        model=model,
+        temperature=temperature,
+        top_p=top_p,
+        max_output_tokens=max_output_tokens,
+        seed=seed,
+        extra_headers=extra_headers,
+        timeout=timeout,
+    )
+    # cached content 생성은 블로킹 호출이므로 프리픽스가 있을 때는 스레드에서 만든다
+    request_kwargs = await asyncio.to_thread(build) if prompt_prefix else build()
+    resp = await client.aio.models.generate_content(**request_kwargs)
+    return parse_chat_response(_extract_text(resp))
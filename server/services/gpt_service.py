@@ -1,12 +1,16 @@
 import os
 import uuid
 import instructor
-from typing import List, Optional, Dict, Any
-from openai import OpenAI
+from typing import List, Optional, Dict, Any, Iterator
+from openai import OpenAI, AsyncOpenAI, DefaultHttpxClient, DefaultAsyncHttpxClient
+import httpx
 from schemas.ai_response import ChatResponse as ChatRespModel
 from schemas.ai_response import SummaryResponse as SummaryRespModel
+from .prompt_cache import prefix_cache_key
+from .json_parser import parse_chat_response
 
 from ..config.config import GPT_MINI_MODEL, OPENAI_API_KEY
+from ..config.config import GPT_MAX_CONNECTIONS, GPT_KEEPALIVE_CONNECTIONS, GPT_KEEPALIVE_EXPIRY
 
 # <---------- Client ---------->
 def gpt_setup_client() -> instructor:
@@ -14,19 +18,66 @@ def gpt_setup_client() -> instructor:
         client=OpenAI(
             api_key=os.getenv("OPENAI_API_KEY"),
             max_retries=3,
-            timeout=30
+            timeout=30,
+            # keep-alive 커넥션을 유지해 매 요청마다 TLS 핸드셰이크를 하지 않도록 한다
+            http_client=DefaultHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=GPT_MAX_CONNECTIONS,
+                    max_keepalive_connections=GPT_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=GPT_KEEPALIVE_EXPIRY,
+                )
+            ),
         )
     )
 
+def gpt_setup_async_client() -> instructor.AsyncInstructor:
+    return instructor.from_openai(
+        client=AsyncOpenAI(
+            api_key=os.getenv("OPENAI_API_KEY"),
+            max_retries=3,
+            timeout=30,
+            http_client=DefaultAsyncHttpxClient(
+                limits=httpx.Limits(
+                    max_connections=GPT_MAX_CONNECTIONS,
+                    max_keepalive_connections=GPT_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=GPT_KEEPALIVE_EXPIRY,
+                )
+            ),
+        )
+    )
+
+def gpt_warm_up_client(client: instructor.Instructor) -> None:
+    """가벼운 요청을 한 번 보내 커넥션 풀에 TLS 커넥션을 미리 열어둔다."""
+    client.client.with_options(max_retries=0, timeout=5).models.list()
+
 # <---------- Request ---------->
+def _cache_kwargs(prompt_prefix: Optional[str]) -> Dict[str, Any]:
+    """OpenAI 는 앞부분이 바이트 단위로 같은 요청을 자동 캐싱한다. 같은 프리픽스끼리 같은 캐시로 라우팅되도록 키를 붙인다."""
+    if not prompt_prefix:
+        return {}
+    return {"prompt_cache_key": prefix_cache_key(prompt_prefix)}
+
 def gpt_5_mini_send_message(
     client: instructor.Instructor,
     message_input: List[dict],
     prompt_input: str,
     *,
-    model: str = "GPT_MINI_MODEL",
-    extra_headers: Optional[Dict[str, str]] = None
+    model: str = GPT_MINI_MODEL,
+    extra_headers: Optional[Dict[str, str]] = None,
+    stream: bool = False,
+    prompt_prefix: Optional[str] = None
 ) -> ChatRespModel:
+    # --- 스트리밍: Gemini 와 같은 추출/검증 경로를 쓴다 ---
+    if stream:
+        return parse_chat_response("".join(gpt_5_mini_stream_message(
+            client,
+            message_input,
+            prompt_input,
+            model=model,
+            extra_headers=extra_headers,
+            prompt_prefix=prompt_prefix,
+        )))
+
     headers = {"Idempotency-Key": str(uuid.uuid4())}
     if extra_headers:
         headers.update(extra_headers)
@@ -39,16 +90,57 @@ def gpt_5_mini_send_message(
             *message_input,
         ],
         extra_headers=headers,
+        **_cache_kwargs(prompt_prefix),
     )
 
     return resp
 
+_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "ChatResponse", "schema": ChatRespModel.model_json_schema()},
+}
+
+def gpt_5_mini_stream_message(
+    client: instructor.Instructor,
+    message_input: List[dict],
+    prompt_input: str,
+    *,
+    model: str = GPT_MINI_MODEL,
+    extra_headers: Optional[Dict[str, str]] = None,
+    prompt_prefix: Optional[str] = None
+) -> Iterator[str]:
+    """응답 텍스트 청크를 도착하는 대로 yield 한다.
+    instructor 는 완성된 모델만 돌려주므로 내부 OpenAI 클라이언트로 직접 스트리밍하고, 파싱은 호출자가 담당한다.
+    """
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    if extra_headers:
+        headers.update(extra_headers)
+
+    stream = client.client.chat.completions.create(
+        model=model,
+        messages=[
+            {"role": "system", "content": prompt_input},
+            *message_input,
+        ],
+        response_format=_RESPONSE_FORMAT,
+        stream=True,
+        extra_headers=headers,
+        **_cache_kwargs(prompt_prefix),
+    )
+
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if delta:
+            yield delta
+
 def gpt_5_mini_summary_note(
     client: instructor.Instructor,
     message_input: List[dict],
     prompt_input: str,
     *,
-    model: str = "GPT_MINI_MODEL",
+    model: str = GPT_MINI_MODEL,
     extra_headers: Optional[Dict[str, str]] = None
 ) -> SummaryRespModel:
     headers = {"Idempotency-Key": str(uuid.uuid4())}
@@ -65,4 +157,55 @@ def gpt_5_mini_summary_note(
         extra_headers=headers,
     )
 
-    return resp
\ No newline at end of file
+    return resp
+
+# <---------- Async Request ---------->
+async def gpt_5_mini_send_message_async(
+    client: instructor.AsyncInstructor,
+    message_input: List[dict],
+    prompt_input: str,
+    *,
+    model: str = GPT_MINI_MODEL,
+    extra_headers: Optional[Dict[str, str]] = None,
+    prompt_prefix: Optional[str] = None
+) -> ChatRespModel:
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    if extra_headers:
+        headers.update(extra_headers)
+
+    resp: ChatRespModel = await client.chat.completions.create(
+        model=model,
+        response_model=ChatRespModel,
+        messages=[
+            {"role": "system", "content": prompt_input},
+            *message_input,
+        ],
+        extra_headers=headers,
+        **_cache_kwargs(prompt_prefix),
+    )
+
+    return resp
+
+async def gpt_5_mini_summary_note_async(
+    client: instructor.AsyncInstructor,
+    message_input: List[dict],
+    prompt_input: str,
+    *,
+    model: str = GPT_MINI_MODEL,
+    extra_headers: Optional[Dict[str, str]] = None
+) -> SummaryRespModel:
+    headers = {"Idempotency-Key": str(uuid.uuid4())}
+    if extra_headers:
+        headers.update(extra_headers)
+
+    resp: SummaryRespModel = await client.chat.completions.create(
+        model=model,
+        response_model=SummaryRespModel,
+        messages=[
+            {"role": "system", "content": prompt_input},
+            *message_input,
+        ],
+        extra_headers=headers,
+    )
+
+    return resp
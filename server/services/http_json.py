@@ -0,0 +1,106 @@
+# <---------- Codec ---------->
+# orjson 이 있으면 쓰고, 없으면 표준 json 으로 같은 결과(UTF-8, 공백 없는 구분자)를 만든다.
+import json
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # 선택 의존성
+    orjson = None
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    # HttpUrl 등 문자열로 표현되는 값
+    return str(obj)
+
+def dumps_bytes(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=_default).encode("utf-8")
+
+def loads(data: Any) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def encode_body(body: Any) -> bytes:
+    """핸들러 반환값을 응답 바이트로 만든다. pydantic 모델은 model_dump_json 으로 한 번에 직렬화한다."""
+    if body is None:
+        return b""
+    if isinstance(body, BaseModel):
+        return body.model_dump_json().encode("utf-8")
+    return dumps_bytes(body)
+
+# <---------- Compression ---------->
+# Accept-Encoding 에 따라 요청마다 zstd > gzip 순으로 고른다. 작은 응답은 압축하지 않는다.
+import gzip
+
+from ..config.config import RESPONSE_COMPRESSION, RESPONSE_COMPRESS_MIN_BYTES, RESPONSE_GZIP_LEVEL, RESPONSE_ZSTD_LEVEL
+
+try:
+    import zstandard
+except ImportError:  # 선택 의존성
+    zstandard = None
+
+SUPPORTED_ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """클라이언트가 받는 인코딩 중 서버가 지원하는 가장 좋은 것. 없으면 None."""
+    if not RESPONSE_COMPRESSION or not accept_encoding:
+        return None
+    accepted = set()
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if q > 0:
+            accepted.add(name.strip().lower())
+    for encoding in SUPPORTED_ENCODINGS:
+        if encoding in accepted or "*" in accepted:
+            return encoding
+    return None
+
+def compress(raw: bytes, encoding: Optional[str]) -> tuple[bytes, Optional[str]]:
+    """(본문, 실제 적용한 인코딩) 을 반환한다."""
+    if encoding is None or len(raw) < RESPONSE_COMPRESS_MIN_BYTES:
+        return raw, None
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=RESPONSE_ZSTD_LEVEL).compress(raw), "zstd"
+    return gzip.compress(raw, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0), "gzip"
+
+# <---------- Flask ---------->
+from flask import Flask, Response, request
+from flask.json.provider import DefaultJSONProvider
+
+class FastJSONProvider(DefaultJSONProvider):
+    """app.json 교체용 provider. dict 반환 경로(jsonify, return body, code)도 같은 코덱을 쓴다."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return dumps_bytes(obj).decode("utf-8")
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        return loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(dumps_bytes(obj), mimetype=self.mimetype)
+
+def install_json_provider(app: Flask) -> None:
+    app.json = FastJSONProvider(app)
+
+def json_response(body: Any, code: int) -> Response:
+    """핸들러 반환값으로 JSON 응답을 만든다. 요청의 Accept-Encoding 에 맞춰 압축한다."""
+    raw, encoding = compress(encode_body(body), negotiate_encoding(request.headers.get("Accept-Encoding")))
+    response = Response(raw, status=code, mimetype="application/json")
+    response.vary.add("Accept-Encoding")
+    if encoding is not None:
+        response.headers["Content-Encoding"] = encoding
+    return response
@@ -0,0 +1,190 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class IdempotencyKeyReused(Exception):
+    def __init__(self, key: str) -> None:
+        super().__init__(f"Idempotency key {key} was used with a different request")
+        self.key = key
+
+class IdempotencyInProgress(Exception):
+    def __init__(self, key: str) -> None:
+        super().__init__(f"Request with idempotency key {key} is still in progress")
+        self.key = key
+
+# <---------- Store ---------->
+# 클라이언트 멱등성 키 -> 결과. 같은 키의 요청이 처리 중이면 새로 처리하지 않고 그 결과를 기다리고(single-flight),
+# 끝난 성공 응답은 TTL 동안 그대로 돌려준다. 실패 응답은 남기지 않으므로 재시도하면 다시 처리된다.
+# 워커 프로세스 내부 메모리라 같은 키의 재시도가 다른 워커로 가면 새로 처리된다.
+import time
+import asyncio
+import threading
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from ..config.config import IDEMPOTENCY_TTL, IDEMPOTENCY_MAX_ENTRIES, IDEMPOTENCY_WAIT
+from .metrics import counter
+
+Result = Tuple[bool, int, Any]
+
+IDEMPOTENCY_OUTCOMES = counter("dive_idempotency_requests_total", "Requests carrying an idempotency key by outcome", ("outcome",))
+
+class _Flight:
+    __slots__ = ("fingerprint", "done", "result")
+
+    def __init__(self, fingerprint: str, done: Any) -> None:
+        self.fingerprint = fingerprint
+        self.done = done
+        self.result: Optional[Result] = None
+
+class _ResultCache:
+    """끝난 성공 응답. 삽입 순서가 곧 만료 순서다 (TTL 이 하나뿐이므로)."""
+    def __init__(self, ttl: float, max_entries: int) -> None:
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str, Result]]" = OrderedDict()
+
+    def get(self, key: str, now: float) -> Optional[Tuple[str, Result]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires, fingerprint, result = entry
+        if expires <= now:
+            del self._entries[key]
+            return None
+        return fingerprint, result
+
+    def put(self, key: str, fingerprint: str, result: Result, now: float) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (now + self.ttl, fingerprint, result)
+        while self._entries:
+            oldest_key, (expires, _, _) = next(iter(self._entries.items()))
+            if expires > now and len(self._entries) <= self.max_entries:
+                break
+            del self._entries[oldest_key]
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def _cacheable(result: Result) -> bool:
+    return bool(result[0]) and 200 <= result[1] < 300
+
+class IdempotencyStore:
+    """스레드 워커용 멱등성 저장소.
+    Args:
+        ttl (float): 성공 응답을 들고 있을 시간(초)
+        max_entries (int): 들고 있을 응답 수 상한
+        wait (float): 처리 중인 같은 키의 요청을 기다릴 최대 시간(초)
+    """
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES, wait: float = IDEMPOTENCY_WAIT) -> None:
+        self.wait = wait
+        self._cache = _ResultCache(ttl, max_entries)
+        self._flights: Dict[str, _Flight] = {}
+        self._lock = threading.Lock()
+
+    def run(self, key: str, fingerprint: str, fn: Callable[[], Result]) -> Result:
+        """key 의 결과를 돌려준다. 처음 온 요청만 fn 을 실행하고, 동시에 온 같은 키의 요청은 그 결과를 공유한다.
+        Args:
+            key (str): 유저 범위로 한정한 멱등성 키
+            fingerprint (str): 요청 본문 해시. 같은 키에 다른 본문이 오면 거절한다
+            fn (Callable): (ok, code, body) 를 돌려주는 실제 처리
+        Raises:
+            IdempotencyKeyReused: 같은 키로 다른 요청이 온 경우
+            IdempotencyInProgress: wait 안에 먼저 온 요청이 끝나지 않은 경우
+        """
+        while True:
+            with self._lock:
+                cached = self._cache.get(key, time.monotonic())
+                if cached is not None:
+                    if cached[0] != fingerprint:
+                        IDEMPOTENCY_OUTCOMES.inc("reused")
+                        raise IdempotencyKeyReused(key)
+                    IDEMPOTENCY_OUTCOMES.inc("replayed")
+                    return cached[1]
+                flight = self._flights.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._flights[key] = _Flight(fingerprint, threading.Event())
+                elif flight.fingerprint != fingerprint:
+                    IDEMPOTENCY_OUTCOMES.inc("reused")
+                    raise IdempotencyKeyReused(key)
+
+            if leader:
+                IDEMPOTENCY_OUTCOMES.inc("executed")
+                return self._lead(key, flight, fn)
+
+            if not flight.done.wait(self.wait):
+                IDEMPOTENCY_OUTCOMES.inc("timeout")
+                raise IdempotencyInProgress(key)
+            if flight.result is not None:
+                IDEMPOTENCY_OUTCOMES.inc("coalesced")
+                return flight.result
+            # 먼저 온 요청이 예외로 끝났다. 다시 시도해 이번에는 직접 처리한다
+
+    def _lead(self, key: str, flight: _Flight, fn: Callable[[], Result]) -> Result:
+        try:
+            result = flight.result = fn()
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+                if flight.result is not None and _cacheable(flight.result):
+                    self._cache.put(key, flight.fingerprint, flight.result, time.monotonic())
+            flight.done.set()
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"in_flight": len(self._flights), "cached": len(self._cache)}
+
+class AsyncIdempotencyStore:
+    """이벤트 루프용 멱등성 저장소. 한 루프 안에서만 쓴다. 동작은 IdempotencyStore 와 같다."""
+    def __init__(self, ttl: float = IDEMPOTENCY_TTL, max_entries: int = IDEMPOTENCY_MAX_ENTRIES, wait: float = IDEMPOTENCY_WAIT) -> None:
+        self.wait = wait
+        self._cache = _ResultCache(ttl, max_entries)
+        self._flights: Dict[str, _Flight] = {}
+
+    async def run(self, key: str, fingerprint: str, fn: Callable[[], Awaitable[Result]]) -> Result:
+        """IdempotencyStore.run 의 비동기 버전."""
+        while True:
+            cached = self._cache.get(key, time.monotonic())
+            if cached is not None:
+                if cached[0] != fingerprint:
+                    IDEMPOTENCY_OUTCOMES.inc("reused")
+                    raise IdempotencyKeyReused(key)
+                IDEMPOTENCY_OUTCOMES.inc("replayed")
+                return cached[1]
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = self._flights[key] = _Flight(fingerprint, asyncio.Event())
+                IDEMPOTENCY_OUTCOMES.inc("executed")
+                return await self._lead(key, flight, fn)
+            if flight.fingerprint != fingerprint:
+                IDEMPOTENCY_OUTCOMES.inc("reused")
+                raise IdempotencyKeyReused(key)
+
+            try:
+                await asyncio.wait_for(flight.done.wait(), self.wait)
+            except asyncio.TimeoutError:
+                IDEMPOTENCY_OUTCOMES.inc("timeout")
+                raise IdempotencyInProgress(key) from None
+            if flight.result is not None:
+                IDEMPOTENCY_OUTCOMES.inc("coalesced")
+                return flight.result
+
+    async def _lead(self, key: str, flight: _Flight, fn: Callable[[], Awaitable[Result]]) -> Result:
+        try:
+            result = flight.result = await fn()
+        finally:
+            self._flights.pop(key, None)
+            if flight.result is not None and _cacheable(flight.result):
+                self._cache.put(key, flight.fingerprint, flight.result, time.monotonic())
+            flight.done.set()
+        return result
+
+    def stats(self) -> Dict[str, int]:
+        return {"in_flight": len(self._flights), "cached": len(self._cache)}
+
+idempotency_store = IdempotencyStore()
+async_idempotency_store = AsyncIdempotencyStore()
@@ -0,0 +1,184 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class QueueFull(Exception):
+    def __init__(self, name: str, size: int) -> None:
+        super().__init__(f"{name} job queue is full ({size} queued)")
+        self.name = name
+        self.size = size
+
+# <---------- Jobs ---------->
+# 지연에 민감하지 않은 업스트림 작업(요약 등)을 요청 스레드에서 떼어 내는 로컬 작업 큐.
+# 들어온 작업은 묶음을 기다리지 않고 바로 작업 스레드 풀에 넘긴다. 동시에 나가는 업스트림 호출은 workers 개를 넘지 않고,
+# 나머지는 풀의 대기열에서 순서대로 기다린다 (max_queue 까지).
+# 같은 key 의 작업이 대기/진행 중이거나 끝난 지 ttl 이 지나지 않았으면 새로 만들지 않고 그 작업을 돌려준다.
+# 작업 상태는 이 워커 프로세스 메모리에만 있다. 여러 워커로 띄우면 조회(GET /onSummary/<job_id>)가 작업을 만든
+# 워커로 가야 하므로 sticky routing 이 필요하고, 다른 워커로 간 조회는 404 를 받는다.
+import time
+import uuid
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .metrics import counter, histogram, register_gauge
+
+JOB_RESULTS = counter("dive_jobs_total", "Background jobs by outcome", ("queue", "outcome"))
+JOB_QUEUE_WAIT = histogram("dive_job_queue_wait_seconds", "Time a job spent queued before it started", ("queue",))
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+
+@dataclass
+class Job:
+    id: str
+    key: str
+    payload: Any
+    owner: Optional[str] = None  # 작업을 넣은 유저 ID. 조회할 때 같은 유저인지 확인한다
+    status: str = QUEUED
+    result: Any = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+
+class JobQueue:
+    """작업 스레드 풀에 바로 넘기는 작업 큐.
+    Args:
+        name (str): 큐 이름 (메트릭 라벨)
+        process (Callable): payload 하나를 처리해 결과를 돌려주는 함수. 예외가 나면 작업은 failed 가 된다
+        workers (int): 동시에 처리할 작업 수
+        max_queue (int): 대기열 길이 상한
+        ttl (float): 끝난 작업을 조회할 수 있게 들고 있을 시간(초)
+    """
+    def __init__(
+        self,
+        name: str,
+        process: Callable[[Any], Any],
+        workers: int,
+        max_queue: int,
+        ttl: float,
+    ) -> None:
+        self.name = name
+        self.process = process
+        self.workers = max(1, workers)
+        self.max_queue = max_queue
+        self.ttl = ttl
+        self._jobs: Dict[str, Job] = {}
+        self._by_key: Dict[str, Job] = {}
+        self._queued = 0
+        self._running = 0
+        self._lock = threading.Lock()
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._last_sweep = time.monotonic()
+
+    # <---------- Public ---------->
+    def find(self, key: str) -> Optional[Job]:
+        """재사용할 수 있는 같은 key 의 작업 (실패했거나 만료된 작업은 제외)."""
+        with self._lock:
+            return self._reusable(key, time.monotonic())
+
+    def submit(self, key: str, payload: Any, owner: Optional[str] = None) -> Job:
+        """작업을 넣고 돌려준다. 재사용할 수 있는 같은 key 의 작업이 있으면 그것을 돌려준다.
+        Raises:
+            QueueFull: 대기열이 가득 찬 경우
+        """
+        now = time.monotonic()
+        with self._lock:
+            existing = self._reusable(key, now)
+            if existing is not None:
+                JOB_RESULTS.inc(self.name, "deduplicated")
+                return existing
+            if self._queued >= self.max_queue:
+                JOB_RESULTS.inc(self.name, "rejected")
+                raise QueueFull(self.name, self._queued)
+            job = Job(uuid.uuid4().hex, key, payload, owner)
+            self._jobs[job.id] = job
+            self._by_key[key] = job
+            self._queued += 1
+            self._sweep_locked(now)
+            pool = self._ensure_pool()
+        try:
+            pool.submit(self._run, job)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+                self._forget_locked(job)
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or self._expired(job, time.monotonic()):
+                return None
+            return job
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"queued": self._queued, "running": self._running, "tracked": len(self._jobs)}
+
+    # <---------- Internal ---------->
+    def _expired(self, job: Job, now: float) -> bool:
+        return job.finished_at is not None and now - job.finished_at > self.ttl
+
+    def _reusable(self, key: str, now: float) -> Optional[Job]:
+        job = self._by_key.get(key)
+        if job is None or job.status == FAILED or self._expired(job, now):
+            return None
+        return job
+
+    def _ensure_pool(self) -> ThreadPoolExecutor:
+        # 포크 이후 워커 안에서 처음 작업이 들어올 때 띄운다
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"{self.name}-job")
+        return self._pool
+
+    def _forget_locked(self, job: Job) -> None:
+        self._jobs.pop(job.id, None)
+        if self._by_key.get(job.key) is job:
+            del self._by_key[job.key]
+
+    def _run(self, job: Job) -> None:
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        job.status = RUNNING
+        JOB_QUEUE_WAIT.observe(time.monotonic() - job.created_at, self.name)
+        try:
+            job.result = self.process(job.payload)
+            job.status = DONE
+        except Exception as e:
+            job.error = getattr(e, "message", None) or str(e) or type(e).__name__
+            job.status = FAILED
+            logger.warning(f"{self.name} job {job.id} failed, {e}")
+        finally:
+            job.payload = None
+            job.finished_at = time.monotonic()
+            JOB_RESULTS.inc(self.name, job.status)
+            with self._lock:
+                self._running -= 1
+
+    def _sweep_locked(self, now: float) -> None:
+        if now - self._last_sweep < self.ttl / 10:
+            return
+        self._last_sweep = now
+        for job in [job for job in self._jobs.values() if self._expired(job, now)]:
+            self._forget_locked(job)
+
+# <---------- Registry ---------->
+_queues: List[JobQueue] = []
+
+def register_queue(queue: JobQueue) -> JobQueue:
+    _queues.append(queue)
+    return queue
+
+def _collect(field_name: str):
+    def collect():
+        for q in list(_queues):
+            yield (q.name,), q.stats()[field_name]
+    return collect
+
+register_gauge("dive_jobs_queued", "Background jobs waiting for a worker", ("queue",), _collect("queued"))
+register_gauge("dive_jobs_running", "Background jobs currently running", ("queue",), _collect("running"))
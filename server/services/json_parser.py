@@ -0,0 +1,182 @@
+# <---------- Incremental ChatResponse parser ---------->
+import json
+from typing import Any, Iterator, List, Optional, Tuple
+
+from schemas.ai_response import ChatResponse as ChatRespModel
+from schemas.ai_response import MessageItem
+
+class ChatResponseStreamParser:
+    """LLM 스트림 청크를 받아 ChatResponse JSON 을 점진적으로 파싱한다.
+
+    conversation 배열의 MessageItem 은 해당 오브젝트가 닫히는 즉시 ("message", MessageItem) 으로 내보내고,
+    최상위 오브젝트가 닫히면 ("image_selected", str), ("summary", str) 를 내보낸다.
+    최상위 '{' 이전의 텍스트(코드블록 펜스 등)와 최상위 '}' 이후의 텍스트는 무시한다.
+    """
+
+    def __init__(self) -> None:
+        self._text = ""
+        self._pos = 0
+
+        self._root_start: Optional[int] = None
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+
+        self._expect_key = False
+        self._key: Optional[str] = None
+        self._in_conversation = False
+        self._item_start: Optional[int] = None
+
+        self.result: Optional[ChatRespModel] = None
+
+    @property
+    def done(self) -> bool:
+        return self.result is not None
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """청크를 추가하고 새로 완성된 이벤트 목록을 반환한다.
+        Raises:
+            ValueError: 완성된 오브젝트가 스키마와 맞지 않는 경우
+        """
+        if self.done or not chunk:
+            return []
+        self._text += chunk
+        events: List[Tuple[str, Any]] = []
+        text = self._text
+        i = self._pos
+        n = len(text)
+
+        while i < n:
+            c = text[i]
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(text[self._string_start:i + 1])
+                        self._expect_key = False
+                i += 1
+                continue
+
+            if self._root_start is None:
+                if c == "{":
+                    self._root_start = i
+                    self._depth = 1
+                    self._expect_key = True
+                i += 1
+                continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+            elif c == "{" or c == "[":
+                self._depth += 1
+                if self._depth == 2 and c == "[" and self._key == "conversation":
+                    self._in_conversation = True
+                elif self._depth == 3 and c == "{" and self._in_conversation:
+                    self._item_start = i
+            elif c == "}" or c == "]":
+                self._depth -= 1
+                if self._depth == 2 and c == "}" and self._item_start is not None:
+                    item = MessageItem.model_validate_json(text[self._item_start:i + 1])
+                    self._item_start = None
+                    events.append(("message", item))
+                elif self._depth == 1 and c == "]":
+                    self._in_conversation = False
+                elif self._depth == 0:
+                    self.result = ChatRespModel.model_validate_json(text[self._root_start:i + 1])
+                    events.append(("image_selected", self.result.image_selected))
+                    events.append(("summary", self.result.summary))
+                    i += 1
+                    break
+            elif c == "," and self._depth == 1:
+                self._expect_key = True
+
+            i += 1
+
+        self._pos = i
+        return events
+
+    def close(self) -> ChatRespModel:
+        """스트림 종료 시 호출한다. 최상위 오브젝트가 닫히지 않았다면 오류를 낸다.
+        Raises:
+            ValueError: 스트림이 완전한 ChatResponse 를 포함하지 않은 경우
+        """
+        if self.result is None:
+            raise ValueError(f"Stream ended before ChatResponse was complete: {self._text}")
+        return self.result
+
+# <---------- One-shot extraction ---------->
+# 논스트리밍 응답용. 코드블록 펜스나 앞뒤 잡텍스트가 섞인 출력에서 최상위 JSON 오브젝트를 찾는다.
+#   1. 첫 '{' ~ 마지막 '}' 구간이 그대로 스키마 검증을 통과하면 쓴다 (대부분의 출력은 여기서 끝난다)
+#   2. 아니면 문자열 토큰을 통째로 건너뛰는 스캐너로 최상위 오브젝트 후보를 앞에서부터 보고, 처음으로 스키마에 맞는 것을 쓴다
+import re
+
+from pydantic import ValidationError
+
+# 문자열 리터럴(이스케이프 포함)은 토큰 하나로 소비하므로 문자열 안의 중괄호는 세지 않는다
+_TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}]', re.DOTALL)
+
+def iter_json_objects(text: str) -> Iterator[str]:
+    """text 안의 최상위 {...} 구간을 앞에서부터 차례로 반환한다.
+    끝까지 닫히지 않은 '{'(설명문 속 괄호 등)는 후보가 아니며, 그 안에서 닫힌 오브젝트 중 가장 바깥 것들을 대신 반환한다.
+    앞 구간이 끝난 위치에서 이어서 훑으므로 후보를 모두 돌아도 전체 비용은 선형이다.
+    최상위 오브젝트 밖의 따옴표는 일반 텍스트로 본다.
+    """
+    pos = 0
+    while True:
+        start = text.find("{", pos)
+        if start == -1:
+            return
+        opened: List[int] = []
+        closed: List[Tuple[int, int]] = []  # 바깥 '{' 가 아직 열려 있는 동안 닫힌 구간
+        for m in _TOKEN.finditer(text, start):
+            c = text[m.start()]
+            if c == "{":
+                opened.append(m.start())
+            elif c == "}":
+                s = opened.pop()
+                if not opened:
+                    pos = m.end()
+                    yield text[s:pos]
+                    break
+                closed.append((s, m.end()))
+        else:
+            # 텍스트 끝까지 닫히지 않았다. 다시 훑지 않고 그 안에서 닫힌 구간으로 넘어간다
+            end = -1
+            for s, e in sorted(closed):
+                if s >= end:
+                    yield text[s:e]
+                    end = e
+            return
+
+def extract_json_object(text: str) -> Optional[str]:
+    """첫 번째로 완성된 최상위 JSON 오브젝트 구간. 없으면 None."""
+    return next(iter_json_objects(text or ""), None)
+
+def parse_chat_response(text: str) -> ChatRespModel:
+    """LLM 출력 텍스트를 ChatResponse 로 검증한다. 중간 dict 없이 model_validate_json 으로 바로 넘긴다.
+    스키마에 맞지 않는 후보(설명문 속 {예시} 등)는 건너뛰고 다음 후보를 본다.
+    Raises:
+        ValueError: 스키마에 맞는 오브젝트가 없는 경우
+    """
+    text = text or ""
+    s, e = text.find("{"), text.rfind("}")
+    if s != -1 and e > s:
+        # 출력이 오브젝트 하나(앞뒤 펜스/잡텍스트만 있는 경우)면 스캔 없이 끝난다.
+        # 이 구간은 검증을 통과할 때만 쓰고, 실패하면 버린 뒤 후보를 앞에서부터 본다
+        try:
+            return ChatRespModel.model_validate_json(text[s:e + 1])
+        except ValidationError:
+            pass
+    for candidate in iter_json_objects(text):
+        try:
+            return ChatRespModel.model_validate_json(candidate)
+        except ValidationError:
+            continue
+    raise ValueError(f"Failed to parse response into Response: {text}")
@@ -0,0 +1,253 @@
+# <---------- Metrics ---------->
+# 프로세스 내부 계측값. /metrics 에서 Prometheus 텍스트 포맷으로 내보낸다.
+# 관측 한 번은 bisect 한 번 + 짧은 락 구간이 전부라 요청 경로에 두어도 부담이 없다.
+# 워커 프로세스마다 따로 집계되므로 수집기에서 인스턴스 단위로 합친다.
+import bisect
+import threading
+from typing import Callable, Dict, Iterable, List, Tuple
+
+LabelValues = Tuple[str, ...]
+
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+UPSTREAM_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 3.0, 5.0, 8.0, 13.0, 20.0, 30.0, 60.0)
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Tuple[str, ...], values: LabelValues, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+class Counter:
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = labelnames
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} counter"
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.name = name
+        self.doc = doc
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets)
+        # labels -> [버킷별 개수..., +Inf 개수, 합계]
+        self._values: Dict[LabelValues, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *labels: str) -> None:
+        i = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            row = self._values.get(labels)
+            if row is None:
+                row = self._values[labels] = [0.0] * (len(self.buckets) + 2)
+            row[i] += 1
+            row[-1] += seconds
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.doc}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            items = [(labels, list(row)) for labels, row in self._values.items()]
+        for labels, row in items:
+            cumulative = 0.0
+            for bound, count in zip(self.buckets, row):
+                cumulative += count
+                le = 'le="%s"' % bound
+                yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            cumulative += row[len(self.buckets)]
+            le = 'le="+Inf"'
+            yield f"{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {row[-1]}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+# <---------- Registry ---------->
+_metrics: List[object] = []
+# 렌더링 시점에 값을 읽어 오는 게이지 (풀 상태 등). (name, doc, labelnames, 값 목록을 돌려주는 함수)
+_collectors: List[Tuple[str, str, Tuple[str, ...], Callable[[], Iterable[Tuple[LabelValues, float]]]]] = []
+
+def counter(name: str, doc: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+    c = Counter(name, doc, labelnames)
+    _metrics.append(c)
+    return c
+
+def histogram(name: str, doc: str, labelnames: Tuple[str, ...] = (), buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+    h = Histogram(name, doc, labelnames, buckets)
+    _metrics.append(h)
+    return h
+
+def register_gauge(name: str, doc: str, labelnames: Tuple[str, ...], collect: Callable[[], Iterable[Tuple[LabelValues, float]]]) -> None:
+    _collectors.append((name, doc, labelnames, collect))
+
+def render_prometheus() -> str:
+    lines: List[str] = []
+    for metric in _metrics:
+        lines.extend(metric.render())
+    for name, doc, labelnames, collect in _collectors:
+        lines.append(f"# HELP {name} {doc}")
+        lines.append(f"# TYPE {name} gauge")
+        try:
+            for labels, value in collect():
+                lines.append(f"{name}{_labels(labelnames, labels)} {value}")
+        except Exception:
+            # 게이지 하나가 실패해도 나머지는 내보낸다
+            continue
+    return "\n".join(lines) + "\n"
+
+# <---------- Standard metrics ---------->
+FLOW_DURATION = histogram("dive_flow_duration_seconds", "Duration of handler flows", ("flow",))
+FLOW_ERRORS = counter("dive_flow_errors_total", "Exceptions raised by handler flows", ("flow", "error", "status"))
+HANDLE_DURATION = histogram("dive_handle_duration_seconds", "Duration of handles by response status", ("handle", "status"))
+UPSTREAM_DURATION = histogram("dive_upstream_duration_seconds", "LLM provider call duration", ("provider", "model", "outcome"), UPSTREAM_BUCKETS)
+UPSTREAM_FIRST_CHUNK = histogram("dive_upstream_first_chunk_seconds", "Time to first streamed chunk", ("provider", "model"), UPSTREAM_BUCKETS)
+DB_QUERY_DURATION = histogram("dive_db_query_duration_seconds", "DB statement execution time", ("engine",))
+DB_POOL_WAIT = histogram("dive_db_pool_wait_seconds", "Time spent waiting for a pooled DB connection", ("engine",))
+DB_POOL_PRE_PING_FAILURES = counter("dive_db_pool_pre_ping_failures_total", "Pooled connections that failed the pre-ping check", ("engine",))
+DB_POOL_TIMEOUTS = counter("dive_db_pool_timeouts_total", "Timeouts waiting for a pooled DB connection", ("engine",))
+
+# <---------- Instrumentation ---------->
+import time
+import inspect
+import functools
+
+def _record_error(name: str, e: BaseException) -> None:
+    FLOW_ERRORS.inc(name, type(e).__name__, str(getattr(e, "http_status", "")))
+
+def timed_flow(fn: Callable) -> Callable:
+    """flow 함수의 소요 시간과 예외를 기록한다. 동기/비동기/제너레이터(끝까지 소비한 시간) 를 모두 지원한다."""
+    name = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException as e:
+                _record_error(name, e)
+                raise
+            finally:
+                FLOW_DURATION.observe(time.perf_counter() - started, name)
+        return async_wrapper
+
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def gen_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                yield from fn(*args, **kwargs)
+            except GeneratorExit:
+                raise
+            except BaseException as e:
+                _record_error(name, e)
+                raise
+            finally:
+                FLOW_DURATION.observe(time.perf_counter() - started, name)
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException as e:
+            _record_error(name, e)
+            raise
+        finally:
+            FLOW_DURATION.observe(time.perf_counter() - started, name)
+    return wrapper
+
+def timed_handle(fn: Callable) -> Callable:
+    """(ok, code, body) 를 돌려주는 handle 의 소요 시간을 응답 코드별로 기록한다."""
+    name = fn.__name__
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            result = await fn(*args, **kwargs)
+            HANDLE_DURATION.observe(time.perf_counter() - started, name, str(result[1]))
+            return result
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        result = fn(*args, **kwargs)
+        HANDLE_DURATION.observe(time.perf_counter() - started, name, str(result[1]))
+        return result
+    return wrapper
+
+def _model_name(fn: Callable) -> str:
+    try:
+        default = inspect.signature(fn).parameters["model"].default
+        return default if isinstance(default, str) else "unknown"
+    except (KeyError, TypeError, ValueError):
+        return "unknown"
+
+def timed_upstream(provider: str, fn: Callable) -> Callable:
+    """provider 호출 함수를 감싸 provider/model 별 지연을 기록한다. model 라벨은 호출 인자 또는 함수 기본값이다."""
+    default_model = _model_name(fn)
+
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            model = kwargs.get("model", default_model)
+            started = time.perf_counter()
+            outcome = "error"
+            try:
+                result = await fn(*args, **kwargs)
+                outcome = "ok"
+                return result
+            finally:
+                UPSTREAM_DURATION.observe(time.perf_counter() - started, provider, model, outcome)
+        return async_wrapper
+
+    if inspect.isgeneratorfunction(fn):
+        @functools.wraps(fn)
+        def gen_wrapper(*args, **kwargs):
+            model = kwargs.get("model", default_model)
+            started = time.perf_counter()
+            outcome = "error"
+            first = True
+            try:
+                for chunk in fn(*args, **kwargs):
+                    if first:
+                        UPSTREAM_FIRST_CHUNK.observe(time.perf_counter() - started, provider, model)
+                        first = False
+                    yield chunk
+                outcome = "ok"
+            except GeneratorExit:
+                outcome = "cancelled"
+                raise
+            finally:
+                UPSTREAM_DURATION.observe(time.perf_counter() - started, provider, model, outcome)
+        return gen_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        model = kwargs.get("model", default_model)
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = fn(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            UPSTREAM_DURATION.observe(time.perf_counter() - started, provider, model, outcome)
+    return wrapper
@@ -0,0 +1,181 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Write-behind notes ---------->
+# /onUpload 의 노트를 메모리에 모았다가 주기적으로(또는 NOTE_FLUSH_SIZE 명이 쌓이면) 다중 행 upsert 로 한 번에 쓴다.
+# 같은 유저의 노트는 마지막 것만 남는다. 반영 전에도 get_user_note 는 대기 중인 노트를 먼저 돌려준다.
+# 이 read-your-writes 는 업로드를 받은 워커 안에서만 성립한다. 다른 워커(다른 인스턴스)에서의 읽기는
+# 다음 flush 까지(최대 NOTE_FLUSH_INTERVAL 초, DB 장애 시 그 이상) 이전 노트를 볼 수 있다.
+# 교차 워커 일관성이 필요하면 NOTE_WRITE_BEHIND=0 으로 업로드마다 바로 쓴다.
+# 종료 시에는 남은 노트를 다시 시도해 쓰고, 그래도 실패하면 NOTE_SPILL_PATH 에 남겨 다음 기동 때 다시 쓴다.
+import os
+import json
+import atexit
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .db import get_conn
+from .user_state import DatabaseError
+from .metrics import counter, register_gauge
+from ..config.config import NOTE_FLUSH_INTERVAL, NOTE_FLUSH_SIZE, NOTE_SPILL_PATH
+
+NOTE_FLUSHED = counter("dive_note_flush_rows_total", "User notes written by the write-behind buffer", ("outcome",))
+
+_pending: Dict[str, str] = {}
+_flushing: Dict[str, str] = {}  # DB 에 쓰는 중인 노트. 쓰는 동안의 읽기도 최신 값을 보게 한다
+_pending_lock = threading.Lock()
+_flush_lock = threading.Lock()
+_flusher: Optional[threading.Thread] = None
+_flusher_lock = threading.Lock()
+_flusher_wake = threading.Event()
+_flusher_stop = threading.Event()
+
+def buffer_note(user_id: str, note: str) -> None:
+    """노트를 쓰기 대기열에 넣는다. DB는 건드리지 않는다."""
+    with _pending_lock:
+        _pending[user_id] = note
+        size = len(_pending)
+    _ensure_flusher()
+    if size >= NOTE_FLUSH_SIZE:
+        _flusher_wake.set()
+
+def pending_note(user_id: str) -> Optional[str]:
+    """아직 DB 에 반영되지 않은 유저의 노트. 없으면 None."""
+    with _pending_lock:
+        note = _pending.get(user_id)
+        return note if note is not None else _flushing.get(user_id)
+
+_SELECT_NOTE_SQL = text("SELECT note FROM user_notes WHERE user_id = :user_id")
+
+def get_user_note(user_id: str) -> Optional[str]:
+    """유저의 노트. 이 워커에 대기 중인 쓰기가 있으면 그것을 돌려준다 (같은 워커 안에서만 read-your-writes).
+    Raises:
+        DatabaseError: 데이터베이스 접근 도중 오류가 발생한 경우
+    """
+    _ensure_flusher()
+    note = pending_note(user_id)
+    if note is not None:
+        return note
+    try:
+        with get_conn() as conn:
+            row = conn.execute(_SELECT_NOTE_SQL, {"user_id": user_id}).first()
+    except Exception as e:
+        raise DatabaseError("Could not read user note") from e
+    return row[0] if row else None
+
+def _bulk_upsert_sql(n: int):
+    rows = ", ".join(f"(:id{i}, :note{i})" for i in range(n))
+    return text(f"INSERT INTO user_notes (user_id, note) VALUES {rows} ON DUPLICATE KEY UPDATE note = VALUES(note)")
+
+def flush_notes() -> int:
+    """대기 중인 노트를 NOTE_FLUSH_SIZE 명씩 묶어 INSERT 한 번으로 반영한다. 반영한 유저 수를 반환한다."""
+    with _flush_lock:
+        with _pending_lock:
+            if not _pending:
+                return 0
+            _flushing.update(_pending)
+            _pending.clear()
+            items: List[Tuple[str, str]] = list(_flushing.items())
+
+        done = 0
+        try:
+            with get_conn() as conn:
+                for start in range(0, len(items), NOTE_FLUSH_SIZE):
+                    batch = items[start:start + NOTE_FLUSH_SIZE]
+                    params = {}
+                    for i, (user_id, note) in enumerate(batch):
+                        params[f"id{i}"] = user_id
+                        params[f"note{i}"] = note
+                    with conn.begin():
+                        conn.execute(_bulk_upsert_sql(len(batch)), params)
+                    done += len(batch)
+        except Exception as e:
+            # 반영하지 못한 노트는 다음 주기에 다시 쓴다. 그 사이 새 노트가 들어왔으면 새 노트가 이긴다
+            with _pending_lock:
+                for user_id, note in items[done:]:
+                    _pending.setdefault(user_id, note)
+            NOTE_FLUSHED.inc("error", amount=len(items) - done)
+            logger.error(f"Failed to flush user notes, {len(items) - done} pending", exc_info=e)
+        finally:
+            with _pending_lock:
+                _flushing.clear()
+        if done:
+            NOTE_FLUSHED.inc("ok", amount=done)
+        return done
+
+def _flusher_loop() -> None:
+    while not _flusher_stop.is_set():
+        _flusher_wake.wait(NOTE_FLUSH_INTERVAL)
+        _flusher_wake.clear()
+        flush_notes()
+
+def _ensure_flusher() -> None:
+    # 포크 이후 워커 안에서 처음 쓸 때 스레드를 띄운다. 이전 종료 때 남긴 노트가 있으면 먼저 대기열에 올린다
+    global _flusher
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is not None and _flusher.is_alive():
+            return
+        _load_spill()
+        _flusher_stop.clear()
+        _flusher = threading.Thread(target=_flusher_loop, name="note-flush", daemon=True)
+        _flusher.start()
+
+# <---------- Shutdown ---------->
+def _load_spill() -> None:
+    if not NOTE_SPILL_PATH or not os.path.exists(NOTE_SPILL_PATH):
+        return
+    claimed = f"{NOTE_SPILL_PATH}.{os.getpid()}"
+    try:
+        # 여러 워커가 동시에 떠도 한 워커만 가져가도록 이름을 바꿔 선점한다
+        os.replace(NOTE_SPILL_PATH, claimed)
+    except OSError:
+        return
+    restored = 0
+    with open(claimed, encoding="utf-8") as f, _pending_lock:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                _pending.setdefault(item["user_id"], item["note"])
+                restored += 1
+    os.remove(claimed)
+    logger.warning(f"Restored {restored} user notes left by a previous shutdown")
+
+def _spill(items: Dict[str, str]) -> None:
+    os.makedirs(os.path.dirname(NOTE_SPILL_PATH) or ".", exist_ok=True)
+    with open(NOTE_SPILL_PATH, "a", encoding="utf-8") as f:
+        for user_id, note in items.items():
+            f.write(json.dumps({"user_id": user_id, "note": note}, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+def stop_note_buffer(attempts: int = 3) -> None:
+    """남은 노트를 쓰고 멈춘다. 끝내 쓰지 못한 노트는 spill 파일에 남긴다."""
+    _flusher_stop.set()
+    _flusher_wake.set()
+    for _ in range(attempts):
+        flush_notes()
+        with _pending_lock:
+            if not _pending:
+                return
+    with _pending_lock:
+        left = dict(_pending)
+        _pending.clear()
+    if NOTE_SPILL_PATH:
+        _spill(left)
+        logger.error(f"Could not flush {len(left)} user notes on shutdown, saved to {NOTE_SPILL_PATH}")
+    else:
+        logger.error(f"Could not flush {len(left)} user notes on shutdown, dropped")
+
+atexit.register(stop_note_buffer)
+
+def note_buffer_stats() -> Dict[str, int]:
+    with _pending_lock:
+        return {"pending": len(_pending), "flushing": len(_flushing)}
+
+register_gauge("dive_note_buffer_pending", "User notes waiting to be written", (), lambda: [((), note_buffer_stats()["pending"])])
@@ -0,0 +1,108 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Prefix key ---------->
+import hashlib
+
+def prefix_cache_key(prefix: str) -> str:
+    """안정 프리픽스의 짧은 해시. OpenAI prompt_cache_key 와 Gemini 캐시 키로 쓴다."""
+    return hashlib.sha256(prefix.encode("utf-8")).hexdigest()[:32]
+
+# <---------- Gemini explicit cache ---------->
+# 공용 프롬프트 + 캐릭터 프롬프트 + 이미지 목록으로 이루어진 프리픽스를 Gemini cached content 로 한 번 만들고,
+# 같은 프리픽스의 이후 요청은 cached_content 이름만 넘겨 재사용한다.
+import time
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from ..config.config import GEMINI_CACHE_TTL, GEMINI_CACHE_MIN_CHARS
+
+@dataclass
+class _CacheEntry:
+    name: Optional[str]   # None 이면 생성 실패 (재시도 억제용)
+    expires_at: float
+
+class GeminiPrefixCache:
+    """모델+프리픽스 단위 Gemini cached content 레지스트리.
+    Args:
+        ttl (int): cached content TTL(초)
+        min_chars (int): 이보다 짧은 프리픽스는 캐싱하지 않는다 (provider 최소 토큰 수 미만)
+    """
+    # 만료 직전의 캐시를 넘기지 않도록 여유를 둔다
+    EXPIRY_MARGIN = 30
+
+    def __init__(self, ttl: int = GEMINI_CACHE_TTL, min_chars: int = GEMINI_CACHE_MIN_CHARS) -> None:
+        self._ttl = ttl
+        self._min_chars = min_chars
+        self._entries: Dict[str, _CacheEntry] = {}
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def _lookup(self, key: str, now: float) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            return entry
+        return None
+
+    def get_or_create(self, client: Any, model: str, prefix: str) -> Optional[str]:
+        """프리픽스에 해당하는 cached content 이름을 반환한다. 캐싱하지 않거나 생성에 실패하면 None."""
+        if len(prefix) < self._min_chars:
+            return None
+        key = f"{model}:{prefix_cache_key(prefix)}"
+        now = time.monotonic()
+
+        entry = self._lookup(key, now)
+        if entry is not None:
+            if entry.name is not None:
+                self.hits += 1
+            return entry.name
+
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        # 같은 프리픽스를 동시에 여러 번 만들지 않는다. 다른 프리픽스는 서로 기다리지 않는다.
+        with key_lock:
+            entry = self._lookup(key, time.monotonic())
+            if entry is not None:
+                if entry.name is not None:
+                    self.hits += 1
+                return entry.name
+
+            self.misses += 1
+            name = self._create(client, model, prefix)
+            self._entries[key] = _CacheEntry(name, time.monotonic() + self._ttl - self.EXPIRY_MARGIN)
+            self._sweep(time.monotonic())
+            return name
+
+    def _create(self, client: Any, model: str, prefix: str) -> Optional[str]:
+        from google.genai import types
+        try:
+            cached = client.caches.create(
+                model=model,
+                config=types.CreateCachedContentConfig(
+                    system_instruction=prefix,
+                    ttl=f"{self._ttl}s",
+                ),
+            )
+            return cached.name
+        except Exception as e:
+            # 최소 토큰 미달 등. TTL 동안은 다시 시도하지 않고 일반 요청으로 보낸다.
+            self.failures += 1
+            logger.warning(f"Failed to create gemini cached content for {model}, {e}")
+            return None
+
+    def _sweep(self, now: float) -> None:
+        expired = [k for k, e in self._entries.items() if e.expires_at <= now]
+        for k in expired:
+            self._entries.pop(k, None)
+            self._key_locks.pop(k, None)
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses, "failures": self.failures}
+
+gemini_prefix_cache = GeminiPrefixCache()
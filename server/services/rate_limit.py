@@ -0,0 +1,145 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class RateLimited(Exception):
+    def __init__(self, scope: str, retry_after: float) -> None:
+        super().__init__(f"Rate limited on {scope}, retry after {retry_after:.1f}s")
+        self.scope = scope
+        self.retry_after = retry_after
+
+# <---------- Backends ---------->
+# 토큰 버킷: 버킷 용량 capacity, 초당 rate 개씩 회복. 요청 하나가 토큰 하나를 쓴다.
+# capacity=1, rate=1/cooldown 이면 기존 "마지막 요청 후 cooldown 초" 규칙과 같다.
+import time
+import threading
+from typing import Any, Dict, Tuple
+
+class InProcessBackend:
+    """워커 프로세스 내부 메모리 백엔드. 워커 간에는 한도가 공유되지 않는다."""
+    SWEEP_EVERY = 10000
+
+    def __init__(self) -> None:
+        self._buckets: Dict[str, Tuple[float, float, float, float]] = {}
+        self._lock = threading.Lock()
+        self._ops = 0
+
+    def acquire(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts, _, _ = self._buckets.get(key, (capacity, now, capacity, rate))
+            tokens = min(capacity, tokens + (now - ts) * rate)
+            if tokens >= 1:
+                allowed, retry_after = True, 0.0
+                tokens -= 1
+            else:
+                allowed, retry_after = False, (1 - tokens) / rate
+            self._buckets[key] = (tokens, now, capacity, rate)
+
+            self._ops += 1
+            if self._ops >= self.SWEEP_EVERY:
+                self._sweep(now)
+        return allowed, retry_after
+
+    def _sweep(self, now: float) -> None:
+        # 가득 찬 버킷은 기본값과 같으므로 지워도 동작이 바뀌지 않는다. 유저 수만큼 메모리가 자라는 것을 막는다.
+        self._ops = 0
+        self._buckets = {
+            k: b for k, b in self._buckets.items()
+            if b[0] + (now - b[1]) * b[3] < b[2]
+        }
+
+_REDIS_TOKEN_BUCKET = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local b = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(b[1]) or capacity
+local ts = tonumber(b[2]) or now
+tokens = math.min(capacity, tokens + (now - ts) * rate)
+local allowed = 0
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return {allowed, tostring(retry_after)}
+"""
+
+class RedisBackend:
+    """워커 간에 한도를 공유하는 백엔드. 버킷 갱신은 Lua 스크립트 하나로 원자적으로 처리된다.
+    Args:
+        client (Any): redis.Redis 호환 클라이언트 (register_script 지원)
+        prefix (str): 키 접두사
+    """
+    def __init__(self, client: Any, prefix: str = "rl:") -> None:
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET)
+        self._prefix = prefix
+
+    def acquire(self, key: str, capacity: float, rate: float) -> Tuple[bool, float]:
+        allowed, retry_after = self._script(keys=[self._prefix + key], args=[capacity, rate])
+        return bool(int(allowed)), float(retry_after)
+
+# <---------- Limiter ---------->
+from ..config.config import (
+    RATE_LIMIT_BACKEND, REDIS_URL,
+    SUMMARY_COOLDOWN, SUMMARY_BURST,
+    UPLOAD_COOLDOWN, UPLOAD_BURST,
+    EVALUATION_COOLDOWN, EVALUATION_BURST,
+)
+
+# scope -> (버킷 용량, 회복 주기 초). 주기마다 용량만큼 회복된다.
+RATE_LIMIT_POLICIES: Dict[str, Tuple[int, int]] = {
+    "summary": (SUMMARY_BURST, SUMMARY_COOLDOWN * SUMMARY_BURST),
+    "upload": (UPLOAD_BURST, UPLOAD_COOLDOWN * UPLOAD_BURST),
+    "evaluation": (EVALUATION_BURST, EVALUATION_COOLDOWN * EVALUATION_BURST),
+}
+
+def _build_backend() -> Any:
+    if RATE_LIMIT_BACKEND == "redis":
+        import redis
+        return RedisBackend(redis.Redis.from_url(REDIS_URL))
+    return InProcessBackend()
+
+_backend: Any = None
+_backend_lock = threading.Lock()
+
+def get_backend() -> Any:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _build_backend()
+    return _backend
+
+def set_backend(backend: Any) -> None:
+    """백엔드를 교체한다. 벤치마크/로컬 환경에서 공유 저장소 대역을 꽂을 때 쓴다."""
+    global _backend
+    _backend = backend
+
+def rate_limit(scope: str, user_id: str) -> None:
+    """scope 별 정책으로 유저의 요청 하나를 허용할지 판단한다. DB는 건드리지 않는다.
+    Args:
+        scope (str): RATE_LIMIT_POLICIES 의 키
+        user_id (str): 유저 ID
+    Raises:
+        RateLimited: 토큰이 없는 경우
+    """
+    capacity, period = RATE_LIMIT_POLICIES[scope]
+    if period <= 0:
+        return
+    try:
+        allowed, retry_after = get_backend().acquire(f"{scope}:{user_id}", capacity, capacity / period)
+    except Exception as e:
+        # 공유 저장소 장애로 서비스 전체를 막지 않는다 (fail-open)
+        logger.warning(f"Rate limit backend error on {scope}, allowing request, {e}")
+        return
+    if not allowed:
+        raise RateLimited(scope, retry_after)
@@ -0,0 +1,158 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class CacheMissError(Exception): ...
+
+# <---------- Client registry ---------->
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .gpt_service import gpt_setup_client, gpt_setup_async_client, gpt_warm_up_client
+from .gemini_service import gemini_setup_client, gemini_warm_up_client
+from ..config.config import CLIENT_REFRESH_INTERVAL, CLIENT_WARMUP, CLIENT_CLOSE_GRACE
+
+# 워커 프로세스당 provider 별로 클라이언트를 하나만 유지한다.
+_clients: Dict[str, Any] = {}
+_clients_lock = threading.Lock()
+
+def get_client(name: str) -> Any:
+    """캐싱된 클라이언트를 반환한다.
+    Args:
+        name (str): provider 이름 ("gpt" | "gemini")
+    Returns:
+        Any: 캐싱된 클라이언트
+    Raises:
+        CacheMissError: 클라이언트가 아직 생성되지 않았거나 생성에 실패한 경우
+    """
+    client = _clients.get(name)
+    if client is None:
+        raise CacheMissError(f"{name} client is not cached")
+    return client
+
+def get_gpt_client() -> Any:
+    return get_client("gpt")
+
+def get_gpt_async_client() -> Any:
+    return get_client("gpt_async")
+
+def get_gemini_client() -> Any:
+    return get_client("gemini")
+
+def _refresh_client(name: str, setup: Callable[[], Any], warm_up: Callable[[Any], None]) -> None:
+    client = setup()
+    if CLIENT_WARMUP:
+        try:
+            warm_up(client)
+        except Exception as e:
+            # warm-up 실패는 치명적이지 않다. 첫 요청에서 커넥션을 연다.
+            logger.warning(f"Failed to warm up {name} client, {e}")
+    # 교체는 참조 대입 한 번으로 끝난다. 이전 클라이언트를 쓰던 요청은 그대로 끝까지 진행되고,
+    # 이전 클라이언트는 그 요청들이 끝날 시간(CLIENT_CLOSE_GRACE)이 지난 뒤 닫는다.
+    with _clients_lock:
+        old = _clients.get(name)
+        _clients[name] = client
+    if old is not None and old is not client:
+        _retire_client(name, old)
+    logger.info(f"Success to refresh {name} client!")
+
+# <---------- Retired clients ---------->
+# 교체된 클라이언트의 커넥션 풀(httpx)을 닫는다. 요청이 클라이언트를 얼마나 쥐고 있는지 세지 않으므로
+# 요청 하나가 쓸 수 있는 최대 시간(timeout x 재시도, 스트림 포함)보다 긴 유예 뒤에 닫는다.
+# 비동기 클라이언트의 커넥션은 그 클라이언트를 쓴 이벤트 루프에서 닫아야 하므로 bind_event_loop 로 받은 루프에 넘긴다.
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
+def _close_gpt(client: Any) -> None:
+    client.client.close()
+
+async def _aclose_gpt(client: Any) -> None:
+    await client.client.close()
+
+def _close_gemini(client: Any) -> None:
+    client.close()
+
+async def _aclose_gemini(client: Any) -> None:
+    await client.aio.aclose()
+
+# provider -> (동기 close, 비동기 close)
+CLIENT_CLOSERS: Dict[str, Tuple[Optional[Callable[[Any], None]], Optional[Callable[[Any], Awaitable[None]]]]] = {
+    "gpt": (_close_gpt, None),
+    "gpt_async": (None, _aclose_gpt),
+    "gemini": (_close_gemini, _aclose_gemini),
+}
+
+def bind_event_loop(loop: asyncio.AbstractEventLoop) -> None:
+    """비동기 클라이언트를 쓰는 이벤트 루프를 등록한다. ASGI 앱이 시작할 때 부른다."""
+    global _client_loop
+    _client_loop = loop
+
+def _retire_client(name: str, client: Any) -> None:
+    timer = threading.Timer(CLIENT_CLOSE_GRACE, _close_client, args=(name, client))
+    timer.name = f"client-close-{name}"
+    timer.daemon = True
+    timer.start()
+
+def _close_client(name: str, client: Any) -> None:
+    close, aclose = CLIENT_CLOSERS.get(name, (None, None))
+    try:
+        if close is not None:
+            close(client)
+        # 루프가 없으면 비동기 경로에서 쓰인 적이 없어 열린 커넥션도 없다
+        loop = _client_loop
+        if aclose is not None and loop is not None and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(aclose(client), loop).result(timeout=30)
+        logger.info(f"Closed retired {name} client")
+    except Exception as e:
+        logger.warning(f"Failed to close retired {name} client, {e}")
+
+def refresh_gpt_client() -> None:
+    _refresh_client("gpt", gpt_setup_client, gpt_warm_up_client)
+
+def refresh_gpt_async_client() -> None:
+    # 비동기 클라이언트는 이벤트 루프 밖에서 warm-up 할 수 없으므로 생성만 한다
+    _refresh_client("gpt_async", gpt_setup_async_client, lambda client: None)
+
+def refresh_gemini_client() -> None:
+    _refresh_client("gemini", gemini_setup_client, gemini_warm_up_client)
+
+CLIENT_REFRESH_HANDLERS = {
+    "gpt": refresh_gpt_client,
+    "gpt_async": refresh_gpt_async_client,
+    "gemini": refresh_gemini_client,
+}
+
+def refresh_all_clients() -> None:
+    """모든 provider 클라이언트를 갱신한다. 하나가 실패해도 나머지는 갱신하며, 실패한 provider는 기존 클라이언트를 유지한다."""
+    for name, refresh in CLIENT_REFRESH_HANDLERS.items():
+        try:
+            refresh()
+        except Exception as e:
+            logger.error(f"Failed to refresh {name} client, {e}")
+
+# <---------- Scheduler ---------->
+_scheduler_thread: Optional[threading.Thread] = None
+_scheduler_stop = threading.Event()
+
+def _scheduler_loop(interval: int) -> None:
+    while not _scheduler_stop.wait(interval):
+        refresh_all_clients()
+
+def start_scheduler(interval: int = CLIENT_REFRESH_INTERVAL) -> None:
+    """클라이언트 주기 갱신 스레드를 시작한다. 이미 실행 중이면 아무것도 하지 않는다."""
+    global _scheduler_thread
+    if _scheduler_thread is not None and _scheduler_thread.is_alive():
+        return
+    _scheduler_stop.clear()
+    _scheduler_thread = threading.Thread(
+        target=_scheduler_loop,
+        args=(interval,),
+        name="client-refresh",
+        daemon=True,
+    )
+    _scheduler_thread.start()
+
+def stop_scheduler() -> None:
+    _scheduler_stop.set()
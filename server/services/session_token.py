@@ -0,0 +1,219 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Def exceptions ---------->
+class InvalidToken(Exception):
+    def __init__(self, reason: str) -> None:
+        super().__init__(f"Invalid session token ({reason})")
+        self.reason = reason
+
+# <---------- Session tokens ---------->
+# 로그인 때 발급하는 상태 없는 세션 토큰. "v1.<payload>.<signature>" 꼴이고 payload 는 {"sub", "exp", "jti"} JSON,
+# signature 는 payload 의 HMAC-SHA256 이다 (둘 다 base64url, 패딩 없음).
+# 검증은 서명 비교(compare_digest)와 만료 확인, 메모리의 폐기 집합 조회뿐이라 I/O 가 없다.
+# 폐기된 토큰은 revoked_tokens 테이블에 쓰고, 각 워커는 TOKEN_REVOCATION_SYNC 초마다 만료되지 않은 jti 를 다시 읽는다.
+# 앱 시작 시(create_app, ASGI lifespan) start_revocation_sync 로 한 번 읽고 동기화 스레드를 띄운다.
+#   CREATE TABLE revoked_tokens (
+#       jti CHAR(32) PRIMARY KEY,
+#       user_id VARCHAR(64) NOT NULL,
+#       expires_at DOUBLE NOT NULL
+#   )
+import hmac
+import time
+import base64
+import hashlib
+import secrets
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from .db import get_conn
+from .http_json import dumps_bytes, loads
+from .metrics import counter, register_gauge
+from ..config.config import SESSION_TOKEN_SECRET, SESSION_TOKEN_PREVIOUS_SECRETS, SESSION_TOKEN_TTL, TOKEN_REVOCATION_SYNC, AUTH_REQUIRED
+
+_VERSION = "v1"
+
+SESSION_TOKENS = counter("dive_session_tokens_total", "Session token issues and verifications by outcome", ("outcome",))
+
+@dataclass(frozen=True)
+class TokenClaims:
+    user_id: str
+    expires_at: int
+    jti: str
+
+def _b64encode(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _keys() -> List[bytes]:
+    # 첫 키로 서명하고, 교체 중에는 이전 키로 서명된 토큰도 받는다
+    return [k.encode("utf-8") for k in [SESSION_TOKEN_SECRET, *SESSION_TOKEN_PREVIOUS_SECRETS] if k]
+
+def _sign(key: bytes, signing_input: bytes) -> bytes:
+    return hmac.new(key, signing_input, hashlib.sha256).digest()
+
+def issue_token(user_id: str, ttl: int = SESSION_TOKEN_TTL) -> Tuple[str, TokenClaims]:
+    """유저의 세션 토큰을 만든다.
+    Raises:
+        RuntimeError: SESSION_TOKEN_SECRET 이 설정되지 않은 경우
+    """
+    if not SESSION_TOKEN_SECRET:
+        raise RuntimeError("SESSION_TOKEN_SECRET is not configured")
+    claims = TokenClaims(user_id, int(time.time()) + ttl, secrets.token_hex(16))
+    payload = _b64encode(dumps_bytes({"sub": claims.user_id, "exp": claims.expires_at, "jti": claims.jti}))
+    signing_input = f"{_VERSION}.{payload}".encode("ascii")
+    SESSION_TOKENS.inc("issued")
+    return f"{_VERSION}.{payload}.{_b64encode(_sign(_keys()[0], signing_input))}", claims
+
+def _verify(token: str) -> TokenClaims:
+    parts = token.split(".")
+    if len(parts) != 3 or parts[0] != _VERSION:
+        raise InvalidToken("malformed")
+    try:
+        signature = _b64decode(parts[2])
+    except ValueError:
+        raise InvalidToken("malformed") from None
+    signing_input = f"{parts[0]}.{parts[1]}".encode("ascii", "replace")
+    # 앞에서 맞는 키를 찾아도 나머지 키까지 비교해 어느 키였는지가 시간에 드러나지 않게 한다
+    matched = False
+    for key in _keys():
+        matched |= hmac.compare_digest(_sign(key, signing_input), signature)
+    if not matched:
+        raise InvalidToken("signature")
+    try:
+        payload = loads(_b64decode(parts[1]))
+        claims = TokenClaims(str(payload["sub"]), int(payload["exp"]), str(payload["jti"]))
+    except (ValueError, KeyError, TypeError):
+        raise InvalidToken("malformed") from None
+    if claims.expires_at <= time.time():
+        raise InvalidToken("expired")
+    _ensure_syncer()
+    if is_revoked(claims.jti):
+        raise InvalidToken("revoked")
+    return claims
+
+def verify_token(token: str) -> TokenClaims:
+    """토큰을 검증하고 담긴 클레임을 돌려준다. I/O 없이 끝나므로 이벤트 루프에서 불러도 된다.
+    Raises:
+        InvalidToken: 형식/서명이 틀렸거나, 만료됐거나, 폐기된 경우
+    """
+    try:
+        claims = _verify(token)
+    except InvalidToken as e:
+        SESSION_TOKENS.inc(e.reason)
+        raise
+    SESSION_TOKENS.inc("valid")
+    return claims
+
+def bearer_token(header: Optional[str]) -> Optional[str]:
+    """Authorization 헤더에서 Bearer 토큰을 꺼낸다. 없으면 None."""
+    if not header:
+        return None
+    scheme, _, token = header.strip().partition(" ")
+    if scheme.lower() != "bearer" or not token.strip():
+        return None
+    return token.strip()
+
+# <---------- Revocation ---------->
+_revoked: Dict[str, float] = {}  # jti -> 토큰 만료 시각. 만료된 토큰은 서명 검증에서 걸러지므로 그때까지만 들고 있는다
+_revoked_lock = threading.Lock()
+_syncer: Optional[threading.Thread] = None
+_syncer_lock = threading.Lock()
+
+_SELECT_REVOKED_SQL = text("SELECT jti, expires_at FROM revoked_tokens WHERE expires_at > :now")
+_INSERT_REVOKED_SQL = text("""
+    INSERT INTO revoked_tokens (jti, user_id, expires_at)
+    VALUES (:jti, :user_id, :expires_at)
+    ON DUPLICATE KEY UPDATE expires_at = VALUES(expires_at)
+""")
+
+def is_revoked(jti: str) -> bool:
+    with _revoked_lock:
+        return jti in _revoked
+
+def revoke_token(claims: TokenClaims) -> None:
+    """토큰을 폐기한다. 이 워커에는 바로, 다른 워커에는 다음 동기화 때 반영된다.
+    Raises:
+        Exception: revoked_tokens 에 쓰지 못한 경우 (이 워커의 폐기 집합에는 이미 들어가 있다)
+    """
+    with _revoked_lock:
+        _revoked[claims.jti] = claims.expires_at
+    with get_conn() as conn:
+        with conn.begin():
+            conn.execute(_INSERT_REVOKED_SQL, {"jti": claims.jti, "user_id": claims.user_id, "expires_at": claims.expires_at})
+    SESSION_TOKENS.inc("revoked_issued")
+
+def sync_revocations() -> int:
+    """revoked_tokens 에서 만료되지 않은 jti 를 다시 읽는다. 읽은 수를 반환한다."""
+    now = time.time()
+    with get_conn() as conn:
+        rows = conn.execute(_SELECT_REVOKED_SQL, {"now": now}).all()
+    fresh = {jti: float(expires_at) for jti, expires_at in rows}
+    with _revoked_lock:
+        # 방금 이 워커에서 폐기했지만 아직 읽히지 않은 것도 남긴다
+        for jti, expires_at in _revoked.items():
+            if expires_at > now:
+                fresh.setdefault(jti, expires_at)
+        _revoked.clear()
+        _revoked.update(fresh)
+        return len(rows)
+
+def _sync_once() -> None:
+    try:
+        sync_revocations()
+    except Exception as e:
+        # DB 장애 동안은 마지막으로 읽은 집합으로 검증한다
+        logger.error(f"Failed to sync revoked session tokens, {e}")
+
+def _sync_loop(load_first: bool) -> None:
+    if load_first:
+        _sync_once()
+    while True:
+        time.sleep(TOKEN_REVOCATION_SYNC)
+        _sync_once()
+
+def _start_syncer_locked(load_first: bool) -> None:
+    global _syncer
+    _syncer = threading.Thread(target=_sync_loop, args=(load_first,), name="token-revocation-sync", daemon=True)
+    _syncer.start()
+
+def validate_session_config() -> None:
+    """AUTH_REQUIRED 인데 SESSION_TOKEN_SECRET 이 없으면 모든 요청이 401 이 되므로 시작하지 않는다.
+    Raises:
+        RuntimeError: AUTH_REQUIRED 이고 SESSION_TOKEN_SECRET 이 비어 있는 경우
+    """
+    if AUTH_REQUIRED and not SESSION_TOKEN_SECRET:
+        raise RuntimeError("AUTH_REQUIRED is set but SESSION_TOKEN_SECRET is not configured")
+
+def start_revocation_sync() -> None:
+    """폐기 집합을 한 번 읽고 동기화 스레드를 시작한다. DB 를 읽으므로 블로킹이다. 이미 실행 중이면 아무것도 하지 않는다."""
+    if _syncer is not None and _syncer.is_alive():
+        return
+    _sync_once()
+    with _syncer_lock:
+        if _syncer is not None and _syncer.is_alive():
+            return
+        _start_syncer_locked(load_first=False)
+
+def _ensure_syncer() -> None:
+    # 시작 시 띄운 스레드는 포크된 워커에 넘어가지 않는다. 그런 워커에서는 검증을 막지 않고
+    # 스레드만 띄워 그 안에서 먼저 읽게 한다 (읽기 전까지는 이 워커에서 폐기한 토큰만 거절된다)
+    if _syncer is not None and _syncer.is_alive():
+        return
+    with _syncer_lock:
+        if _syncer is not None and _syncer.is_alive():
+            return
+        _start_syncer_locked(load_first=True)
+
+def _revoked_count():
+    with _revoked_lock:
+        return [((), len(_revoked))]
+
+register_gauge("dive_session_revoked_tokens", "Revoked session tokens held in memory", (), _revoked_count)
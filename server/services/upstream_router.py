@@ -0,0 +1,318 @@
+# <---------- Logging ---------->
+import logging
+
+logger = logging.getLogger(__name__)
+
+# <---------- Provider health ---------->
+# provider 별 최근 지연 분포와 연속 실패 수. 헤지 지연과 failover 판단에 쓴다.
+import time
+import threading
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from ..config.config import (
+    UPSTREAM_ROUTING, UPSTREAM_FALLBACK,
+    UPSTREAM_HEDGE_QUANTILE, UPSTREAM_HEDGE_MIN_DELAY, UPSTREAM_HEDGE_MAX_DELAY, UPSTREAM_HEDGE_DEFAULT_DELAY,
+    UPSTREAM_FAILURE_THRESHOLD, UPSTREAM_OPEN_SECONDS, UPSTREAM_HEDGE_WORKERS, UPSTREAM_HEDGE_MAX_IN_FLIGHT,
+)
+from .metrics import counter, register_gauge
+from .bulkhead import get_bulkhead, get_async_bulkhead
+
+ROUTE_RESULTS = counter("dive_upstream_route_total", "Which provider answered a routed request", ("primary", "winner", "reason"))
+HEDGE_SKIPPED = counter("dive_upstream_hedge_skipped_total", "Hedges not sent because too many were in flight", ("primary",))
+
+class ProviderHealth:
+    """최근 window 개의 성공 지연과 연속 실패 수를 들고 있는다.
+    Args:
+        window (int): 분위수 계산에 쓸 최근 표본 수
+        min_samples (int): 이보다 표본이 적으면 분위수 대신 기본 지연을 쓴다
+    """
+    def __init__(self, window: int = 200, min_samples: int = 20) -> None:
+        self._samples: Deque[float] = deque(maxlen=window)
+        self._min_samples = min_samples
+        self._failures = 0
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def record_success(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+            self._failures = 0
+            self._open_until = 0.0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            if self._failures >= UPSTREAM_FAILURE_THRESHOLD:
+                self._open_until = time.monotonic() + UPSTREAM_OPEN_SECONDS
+
+    @property
+    def failing(self) -> bool:
+        return self._open_until > time.monotonic()
+
+    def quantile(self, q: float) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < self._min_samples:
+                return None
+            s = sorted(self._samples)
+        return s[min(len(s) - 1, int(q * len(s)))]
+
+_health: Dict[str, ProviderHealth] = {}
+_health_lock = threading.Lock()
+
+def provider_health(name: str) -> ProviderHealth:
+    h = _health.get(name)
+    if h is None:
+        with _health_lock:
+            h = _health.setdefault(name, ProviderHealth())
+    return h
+
+def hedge_delay(name: str) -> float:
+    """관측된 분위수 지연을 [MIN, MAX] 로 자른 값. 표본이 부족하면 기본값."""
+    observed = provider_health(name).quantile(UPSTREAM_HEDGE_QUANTILE)
+    if observed is None:
+        return UPSTREAM_HEDGE_DEFAULT_DELAY
+    return min(UPSTREAM_HEDGE_MAX_DELAY, max(UPSTREAM_HEDGE_MIN_DELAY, observed))
+
+def _plan(model: str, handlers: Dict[str, Tuple[Callable, Callable]]) -> Tuple[str, Optional[str]]:
+    """(먼저 보낼 provider, 보조 provider) 를 정한다. 기본 provider 가 실패 중이면 순서를 바꾼다."""
+    secondary = UPSTREAM_FALLBACK.get(model)
+    if UPSTREAM_ROUTING == "single" or secondary not in handlers:
+        return model, None
+    if provider_health(model).failing and not provider_health(secondary).failing:
+        return secondary, model
+    return model, secondary
+
+# <---------- Hedge budget ---------->
+# 헤지한 요청은 진 쪽 호출이 끝날 때까지 provider 슬롯(동기 경로는 헤지 풀 스레드도)을 하나 더 쥔다.
+# 동기 경로에서는 이미 나간 호출을 끊을 수 없으므로, 두 호출이 모두 끝날 때까지를 한 건으로 세고
+# UPSTREAM_HEDGE_MAX_IN_FLIGHT 를 넘으면 헤지하지 않고 원 요청만 기다린다. 그래서 늘어나는 동시 호출 수가 이 값으로 묶인다.
+_hedges_in_flight = 0
+_hedges_lock = threading.Lock()
+
+def _reserve_hedge(primary: str) -> bool:
+    global _hedges_in_flight
+    with _hedges_lock:
+        if _hedges_in_flight >= UPSTREAM_HEDGE_MAX_IN_FLIGHT:
+            HEDGE_SKIPPED.inc(primary)
+            return False
+        _hedges_in_flight += 1
+        return True
+
+def _hedge_settler(calls: int) -> Callable[[Any], None]:
+    # 경주한 호출들의 done 콜백. 마지막 호출이 끝나면(취소 포함) 헤지 한 건을 돌려준다
+    remaining = [calls]
+
+    def settle(_: Any) -> None:
+        global _hedges_in_flight
+        with _hedges_lock:
+            remaining[0] -= 1
+            if remaining[0] == 0:
+                _hedges_in_flight -= 1
+    return settle
+
+register_gauge("dive_upstream_hedges_in_flight", "Routed requests with both provider calls still running", (), lambda: [((), _hedges_in_flight)])
+
+def _record(primary: str, winner: str, reason: str) -> None:
+    ROUTE_RESULTS.inc(primary, winner, reason)
+    if winner != primary:
+        logger.info(f"Upstream routed {primary} -> {winner} ({reason})")
+
+# <---------- Sync routing ---------->
+from concurrent.futures import Future, ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+def _get_pool() -> ThreadPoolExecutor:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=UPSTREAM_HEDGE_WORKERS, thread_name_prefix="upstream-hedge")
+    return _pool
+
+def _call(
+    name: str,
+    handlers: Dict[str, Tuple[Callable, Callable]],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    wait: Optional[float] = None,
+    on_start: Optional[Callable[[], None]] = None
+) -> Any:
+    # wait 는 bulkhead 대기 허용 시간. 헤지 요청은 0 으로 보내 빈 슬롯이 있을 때만 나가게 한다
+    # on_start 는 슬롯을 얻어 실제로 호출을 시작할 때 부른다. 헤지 지연은 이 시점부터 잰다
+    client_func, send_func = handlers[name]
+    with get_bulkhead(name).slot(wait):
+        if on_start is not None:
+            on_start()
+        started = time.perf_counter()
+        try:
+            result = send_func(client_func(), *args, **kwargs)
+        except Exception:
+            provider_health(name).record_failure()
+            raise
+    provider_health(name).record_success(time.perf_counter() - started)
+    return result
+
+def route_send(model: str, handlers: Dict[str, Tuple[Callable, Callable]], *args: Any, **kwargs: Any) -> Any:
+    """UPSTREAM_ROUTING 정책에 따라 provider 를 호출한다.
+        - single: model 만 호출한다 (기존 동작)
+        - failover: model 이 실패하거나 실패 중이면 보조 provider 로 보낸다
+        - hedge: failover + model 응답이 hedge_delay 안에 오지 않으면 보조 provider 에도 보내고 먼저 온 응답을 쓴다
+    Args:
+        model (str): 요청된 provider 이름 (handlers 의 키)
+        handlers (dict): provider -> (client getter, send 함수)
+    Raises:
+        Overloaded: provider 의 bulkhead 가 요청을 받지 않은 경우 (다른 provider 로도 보내지 못했을 때)
+        Exception: 모든 provider 가 실패한 경우 마지막 예외
+    """
+    primary, secondary = _plan(model, handlers)
+    if secondary is None:
+        result = _call(primary, handlers, args, kwargs)
+        if primary != model:
+            _record(model, primary, "failover")
+        return result
+
+    if UPSTREAM_ROUTING != "hedge" or provider_health(secondary).failing:
+        try:
+            result = _call(primary, handlers, args, kwargs)
+            _record(model, primary, "primary" if primary == model else "failover")
+            return result
+        except Exception as e:
+            logger.warning(f"Upstream {primary} failed, failing over to {secondary}, {e}")
+        result = _call(secondary, handlers, args, kwargs)
+        _record(model, secondary, "failover")
+        return result
+
+    pool = _get_pool()
+    started = threading.Event()
+    first = pool.submit(_call, primary, handlers, args, kwargs, None, started.set)
+    # 슬롯을 얻지 못하고 끝난 경우에도 깨어나도록 한다
+    first.add_done_callback(lambda _: started.set())
+    # 풀이나 bulkhead 대기열에서 기다린 시간은 헤지 지연에 넣지 않는다
+    started.wait()
+    done, _ = wait([first], timeout=hedge_delay(primary))
+    if first not in done and not _reserve_hedge(primary):
+        wait([first])
+        done = {first}
+    if first in done:
+        if first.exception() is None:
+            _record(model, primary, "primary" if primary == model else "failover")
+            return first.result()
+        logger.warning(f"Upstream {primary} failed, failing over to {secondary}, {first.exception()}")
+        result = _call(secondary, handlers, args, kwargs)
+        _record(model, secondary, "failover")
+        return result
+
+    settle = _hedge_settler(2)
+    first.add_done_callback(settle)
+    try:
+        second = pool.submit(_call, secondary, handlers, args, kwargs, 0)
+    except Exception:
+        settle(None)
+        raise
+    second.add_done_callback(settle)
+    racing: Dict[Future, str] = {first: primary, second: secondary}
+    error: Optional[BaseException] = None
+    while racing:
+        done, _ = wait(list(racing), return_when=FIRST_COMPLETED)
+        for f in done:
+            name = racing.pop(f)
+            if f.exception() is None:
+                # 진 쪽은 결과를 버린다. 이미 나간 HTTP 요청은 스레드에서 끝까지 진행되고,
+                # 끝날 때까지 슬롯과 헤지 한 건을 쥐고 있다 (시작 전이면 취소된다)
+                for loser in racing:
+                    loser.cancel()
+                _record(model, name, "hedge" if name == secondary else "primary")
+                return f.result()
+            error = f.exception()
+    raise error
+
+# <---------- Async routing ---------->
+import asyncio
+
+async def _call_async(
+    name: str,
+    handlers: Dict[str, Tuple[Callable, Callable]],
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+    wait: Optional[float] = None,
+    on_start: Optional[Callable[[], None]] = None
+) -> Any:
+    client_func, send_func = handlers[name]
+    async with get_async_bulkhead(name).slot(wait):
+        if on_start is not None:
+            on_start()
+        started = time.perf_counter()
+        try:
+            result = await send_func(client_func(), *args, **kwargs)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            provider_health(name).record_failure()
+            raise
+    provider_health(name).record_success(time.perf_counter() - started)
+    return result
+
+async def route_send_async(model: str, handlers: Dict[str, Tuple[Callable, Callable]], *args: Any, **kwargs: Any) -> Any:
+    """route_send 의 비동기 버전. 헤지에서 진 요청은 task 취소로 실제로 끊는다."""
+    primary, secondary = _plan(model, handlers)
+    if secondary is None:
+        result = await _call_async(primary, handlers, args, kwargs)
+        if primary != model:
+            _record(model, primary, "failover")
+        return result
+
+    if UPSTREAM_ROUTING != "hedge" or provider_health(secondary).failing:
+        try:
+            result = await _call_async(primary, handlers, args, kwargs)
+            _record(model, primary, "primary" if primary == model else "failover")
+            return result
+        except Exception as e:
+            logger.warning(f"Upstream {primary} failed, failing over to {secondary}, {e}")
+        result = await _call_async(secondary, handlers, args, kwargs)
+        _record(model, secondary, "failover")
+        return result
+
+    started = asyncio.Event()
+    first = asyncio.ensure_future(_call_async(primary, handlers, args, kwargs, None, started.set))
+    first.add_done_callback(lambda _: started.set())
+    try:
+        await started.wait()
+        done, _ = await asyncio.wait([first], timeout=hedge_delay(primary))
+        if first not in done and not _reserve_hedge(primary):
+            await asyncio.wait([first])
+            done = {first}
+    except asyncio.CancelledError:
+        first.cancel()
+        raise
+    if first in done:
+        if first.exception() is None:
+            _record(model, primary, "primary" if primary == model else "failover")
+            return first.result()
+        logger.warning(f"Upstream {primary} failed, failing over to {secondary}, {first.exception()}")
+        result = await _call_async(secondary, handlers, args, kwargs)
+        _record(model, secondary, "failover")
+        return result
+
+    second = asyncio.ensure_future(_call_async(secondary, handlers, args, kwargs, 0))
+    settle = _hedge_settler(2)
+    first.add_done_callback(settle)
+    second.add_done_callback(settle)
+    racing: Dict[asyncio.Future, str] = {first: primary, second: secondary}
+    error: Optional[BaseException] = None
+    try:
+        while racing:
+            done, _ = await asyncio.wait(list(racing), return_when=asyncio.FIRST_COMPLETED)
+            for f in done:
+                name = racing.pop(f)
+                if f.exception() is None:
+                    _record(model, name, "hedge" if name == secondary else "primary")
+                    return f.result()
+                error = f.exception()
+        raise error
+    finally:
+        # 진 쪽(또는 요청 자체가 취소된 경우 둘 다) 업스트림 호출을 끊는다
+        for loser in racing:
+            loser.cancel()
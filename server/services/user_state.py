@@ -0,0 +1,90 @@
+# <---------- Def exceptions ---------->
+class UserNotFound(Exception): ...
+class InvalidUserData(Exception): ...
+class DatabaseError(Exception): ...
+
+# <---------- User state ---------->
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+from sqlalchemy import text
+
+# SELECT 절에 그대로 들어가므로 허용된 컬럼만 받는다
+USER_STATE_COLUMNS = frozenset({
+    "credit",
+    "last_evalutaion_req_time",
+    "last_summary_req_time",
+    "last_upload_req_time",
+})
+
+def _build_select(columns: Tuple[str, ...]):
+    unknown = set(columns) - USER_STATE_COLUMNS
+    if unknown:
+        raise ValueError(f"Unknown user state column: {sorted(unknown)}")
+    return text(f"SELECT {', '.join(columns)} FROM users WHERE id = :id")
+
+def _read_row(row: Optional[Dict[str, Any]], columns: Tuple[str, ...]) -> Dict[str, Any]:
+    if row is None:
+        raise UserNotFound("User not found")
+    return {c: row[c] for c in columns}
+
+class _UserStateBase:
+    def __init__(self, user_id: str, columns: Iterable[str]) -> None:
+        self.user_id = user_id
+        self._columns = tuple(dict.fromkeys(columns))
+        self._values: Dict[str, Any] = {}
+
+    def _pending(self, column: str) -> Tuple[str, ...]:
+        # 처음 요청된 컬럼이 선언 목록에 없더라도 아직 안 읽은 선언 컬럼과 함께 한 번에 읽는다
+        missing = tuple(c for c in self._columns if c not in self._values)
+        return missing if column in missing else missing + (column,)
+
+    def _value(self, column: str) -> int:
+        value = self._values[column]
+        if value is None:
+            raise InvalidUserData("Invalid user data")
+        return int(value)
+
+class UserState(_UserStateBase):
+    """요청 하나 동안 쓰이는 유저 상태 로더.
+    첫 get() 에서 선언된 컬럼을 SELECT 한 번으로 모두 읽고, 이후 같은 요청의 flow 들은 캐시만 본다.
+    Args:
+        user_id (str): 유저 ID
+        columns (Iterable[str]): 핸들러가 필요로 하는 컬럼 목록
+        get_conn (Callable): 커넥션 팩토리
+    """
+    def __init__(self, user_id: str, columns: Iterable[str], get_conn: Callable[[], Any]) -> None:
+        super().__init__(user_id, columns)
+        self._get_conn = get_conn
+
+    def get(self, column: str) -> int:
+        """컬럼 값을 반환한다.
+        Raises:
+            UserNotFound: 해당 유저 ID가 존재하지 않는 경우
+            InvalidUserData: 값이 None인 경우
+            DatabaseError: 데이터베이스 접근 도중 오류가 발생한 경우
+        """
+        if column not in self._values:
+            columns = self._pending(column)
+            try:
+                with self._get_conn() as conn:
+                    row = conn.execute(_build_select(columns), {"id": self.user_id}).mappings().first()
+            except Exception as e:
+                raise DatabaseError("Database error") from e
+            self._values.update(_read_row(row, columns))
+        return self._value(column)
+
+class AsyncUserState(_UserStateBase):
+    """UserState 의 비동기 버전. get_conn 은 AsyncConnection 컨텍스트를 돌려줘야 한다."""
+    def __init__(self, user_id: str, columns: Iterable[str], get_conn: Callable[[], Any]) -> None:
+        super().__init__(user_id, columns)
+        self._get_conn = get_conn
+
+    async def get(self, column: str) -> int:
+        if column not in self._values:
+            columns = self._pending(column)
+            try:
+                async with self._get_conn() as conn:
+                    row = (await conn.execute(_build_select(columns), {"id": self.user_id})).mappings().first()
+            except Exception as e:
+                raise DatabaseError("Database error") from e
+            self._values.update(_read_row(row, columns))
+        return self._value(column)
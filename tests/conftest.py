@@ -0,0 +1,54 @@
+# <---------- Test environment ---------->
+# server 모듈은 import 시 설정을 읽고 엔진을 만든다. 그 전에 SQLite 경로와 백그라운드 주기를 정해 둔다.
+# 쓰기 지연 스레드가 테스트 도중 끼어들지 않도록 주기를 길게 잡고, 테스트에서 flush 를 직접 부른다.
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench.local_db import SCHEMA, configure_env, _install_dialect_shims
+
+_TMP = Path(tempfile.mkdtemp(prefix="dive_chat_tests_"))
+configure_env(str(_TMP / "test.db"))
+os.environ["CREDIT_SETTLE_INTERVAL"] = "3600"
+os.environ["NOTE_FLUSH_INTERVAL"] = "3600"
+os.environ["NOTE_SPILL_PATH"] = str(_TMP / "note_spill.jsonl")
+
+import pytest
+from sqlalchemy import text
+
+# <---------- Fixtures ---------->
+@pytest.fixture(scope="session")
+def engine():
+    from server.services.db import engine
+    # MySQL upsert 구문을 SQLite 용으로 바꾸는 shim 을 걸고 스키마만 만든다
+    _install_dialect_shims(engine)
+    with engine.begin() as conn:
+        for ddl in SCHEMA:
+            conn.execute(text(ddl))
+    return engine
+
+@pytest.fixture
+def db(engine):
+    with engine.begin() as conn:
+        conn.execute(text("DELETE FROM users"))
+        conn.execute(text("DELETE FROM user_notes"))
+    return engine
+
+def add_user(engine, user_id: str, credit: int) -> None:
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO users (id, credit) VALUES (:id, :credit)"), {"id": user_id, "credit": credit})
+
+def credit_of(engine, user_id: str) -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT credit FROM users WHERE id = :id"), {"id": user_id}).scalar_one()
+
+def note_of(engine, user_id: str):
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT note FROM user_notes WHERE user_id = :id"), {"id": user_id}).scalar()
+
+def broken_conn():
+    raise ConnectionError("database is down")
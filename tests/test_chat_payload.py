@@ -0,0 +1,20 @@
+import asyncio
+
+import pytest
+
+from server.routes.chat_service import chat_stream_handle, evaluation_handle, _chat_handle
+from server.routes.async_services import _chat_handle_async
+
+@pytest.mark.parametrize("handle, req", [
+    (_chat_handle, {"user": {"user_id": "u1"}}),
+    (chat_stream_handle, {"user": {"user_id": "u1"}}),
+    (evaluation_handle, {"user": "u1"}),
+])
+def test_malformed_payload_is_rejected_with_400(handle, req):
+    ok, status, body = handle(req)
+    assert (ok, status) == (False, 400)
+    assert body["error"] == "Payload system error | Wrong payload"
+
+def test_malformed_payload_is_rejected_with_400_async():
+    ok, status, _ = asyncio.run(_chat_handle_async({"user": {"user_id": "u1"}}))
+    assert (ok, status) == (False, 400)
@@ -0,0 +1,101 @@
+import pytest
+
+from server.services.conversation_store import (
+    EMPTY_HISTORY_HASH, ConversationOwnerMismatch, ConversationStore, PendingTurn, chain_hash, history_hash,
+)
+
+HISTORY = [
+    {"role": "user", "content": "안녕"},
+    {"role": "assistant", "content": "반가워요"},
+]
+
+def turn(user_id="u1", uuid="c1", base_hash=None, history=(), message="hi", character=None) -> PendingTurn:
+    return PendingTurn(user_id, uuid, base_hash, list(history), message, character)
+
+def test_chain_hash_extends_history_hash():
+    assert history_hash([]) == EMPTY_HISTORY_HASH
+    assert chain_hash(history_hash(HISTORY[:1]), HISTORY[1:]) == history_hash(HISTORY)
+
+def test_history_hash_depends_on_role_and_order():
+    swapped = [{"role": "assistant", "content": "안녕"}, {"role": "user", "content": "반가워요"}]
+    assert history_hash(swapped) != history_hash(HISTORY)
+    assert history_hash(HISTORY[::-1]) != history_hash(HISTORY)
+
+def test_commit_hash_matches_client_side_hash():
+    store = ConversationStore()
+    h = store.commit(turn(history=HISTORY, message="다음"), "응답")
+    expected = HISTORY + [{"role": "user", "content": "다음"}, {"role": "assistant", "content": "응답"}]
+    assert h == history_hash(expected)
+    assert store.resolve("u1", "c1", h) == (expected, None)
+
+def test_commit_on_matching_base_appends():
+    store = ConversationStore()
+    h1 = store.commit(turn(message="a", character={"prompt": "p"}), "b")
+    h2 = store.commit(turn(base_hash=h1, message="c", character=None), "d")
+    history, character = store.resolve("u1", "c1", h2)
+    assert [m["content"] for m in history] == ["a", "b", "c", "d"]
+    assert character == {"prompt": "p"}
+
+def test_resolve_with_stale_hash_misses():
+    store = ConversationStore()
+    h1 = store.commit(turn(message="a"), "b")
+    store.commit(turn(base_hash=h1, message="c"), "d")
+    assert store.resolve("u1", "c1", h1) is None
+    assert store.resolve("u1", "missing", h1) is None
+
+def test_commit_on_stale_base_replaces_with_request_history():
+    store = ConversationStore()
+    h1 = store.commit(turn(message="a"), "b")
+    store.commit(turn(base_hash=h1, message="c"), "d")
+    # 동시에 보낸 다른 요청이 h1 을 기준으로 들어온 경우
+    history = [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}]
+    h3 = store.commit(turn(base_hash=h1, history=history, message="x"), "y")
+    got, _ = store.resolve("u1", "c1", h3)
+    assert [m["content"] for m in got] == ["a", "b", "x", "y"]
+
+def test_other_user_cannot_resolve_or_commit():
+    store = ConversationStore()
+    h = store.commit(turn(user_id="owner", message="secret"), "reply")
+    with pytest.raises(ConversationOwnerMismatch):
+        store.resolve("intruder", "c1", h)
+    with pytest.raises(ConversationOwnerMismatch):
+        store.check_owner("intruder", "c1")
+    with pytest.raises(ConversationOwnerMismatch):
+        store.commit(turn(user_id="intruder", message="overwrite"), "x")
+    # 저장본은 그대로다
+    history, _ = store.resolve("owner", "c1", h)
+    assert history[0]["content"] == "secret"
+    store.check_owner("owner", "c1")
+
+def test_uuid_is_released_when_conversation_is_evicted():
+    store = ConversationStore(hot_max=1, cold_max=1)
+    store.commit(turn(user_id="owner", uuid="c1"), "x")
+    store.commit(turn(user_id="owner", uuid="c2"), "x")
+    store.commit(turn(user_id="owner", uuid="c3"), "x")
+    # c1 은 cold 에서도 밀려나 다른 유저가 같은 uuid 를 쓸 수 있다
+    store.check_owner("other", "c1")
+    with pytest.raises(ConversationOwnerMismatch):
+        store.check_owner("other", "c2")
+
+def test_cold_conversation_is_promoted_on_resolve():
+    store = ConversationStore(hot_max=1, cold_max=10)
+    h1 = store.commit(turn(uuid="c1", message="a", character={"prompt": "p"}), "b")
+    store.commit(turn(uuid="c2"), "x")
+    assert store.stats()["hot"] == 1 and store.stats()["cold"] == 1
+    history, character = store.resolve("u1", "c1", h1)
+    assert [m["content"] for m in history] == ["a", "b"]
+    assert character == {"prompt": "p"}
+    assert store.stats()["cold"] == 1  # c1 이 올라오며 c2 가 내려간다
+
+def test_expired_conversation_is_dropped(monkeypatch):
+    store = ConversationStore(ttl=0)
+    h = store.commit(turn(user_id="owner"), "x")
+    assert store.resolve("owner", "c1", h) is None
+    store.check_owner("other", "c1")
+
+def test_max_messages_keeps_full_hash():
+    store = ConversationStore(max_messages=2)
+    h = store.commit(turn(history=HISTORY, message="a"), "b")
+    history, _ = store.resolve("u1", "c1", h)
+    assert [m["content"] for m in history] == ["a", "b"]
+    assert h == history_hash(HISTORY + [{"role": "user", "content": "a"}, {"role": "assistant", "content": "b"}])
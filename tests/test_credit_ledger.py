@@ -0,0 +1,91 @@
+import pytest
+
+from server.services import credit_ledger
+from server.services.credit_ledger import (
+    InsufficientCredit, reserve_credit, settle_credit, release_credit, flush_settlements,
+)
+
+from conftest import add_user, credit_of, broken_conn
+
+@pytest.fixture(autouse=True)
+def clean_pending():
+    credit_ledger._pending.clear()
+    yield
+    credit_ledger._pending.clear()
+
+def test_reserve_deducts_up_front(db):
+    add_user(db, "u1", 100)
+    reservation = reserve_credit("u1", 30)
+    assert reservation.amount == 30
+    assert credit_of(db, "u1") == 70
+
+def test_reserve_rejects_insufficient_balance(db):
+    add_user(db, "u1", 10)
+    with pytest.raises(InsufficientCredit):
+        reserve_credit("u1", 11)
+    assert credit_of(db, "u1") == 10
+
+def test_reserve_rejects_unknown_user(db):
+    with pytest.raises(InsufficientCredit):
+        reserve_credit("nobody", 1)
+
+def test_settle_refunds_difference_on_flush(db):
+    add_user(db, "u1", 100)
+    settle_credit(reserve_credit("u1", 30), 12)
+    # 환불은 flush 전까지 반영되지 않는다
+    assert credit_of(db, "u1") == 70
+    assert flush_settlements() == 1
+    assert credit_of(db, "u1") == 88
+
+def test_double_settle_refunds_once(db):
+    add_user(db, "u1", 100)
+    reservation = reserve_credit("u1", 30)
+    settle_credit(reservation, 10)
+    settle_credit(reservation, 0)
+    release_credit(reservation)
+    flush_settlements()
+    assert credit_of(db, "u1") == 90
+
+def test_release_refunds_whole_reservation(db):
+    add_user(db, "u1", 100)
+    release_credit(reserve_credit("u1", 30))
+    flush_settlements()
+    assert credit_of(db, "u1") == 100
+
+@pytest.mark.parametrize("actual_cost, expected", [(30, 70), (45, 70), (-5, 100)])
+def test_settle_clamps_actual_cost_to_reservation(db, actual_cost, expected):
+    add_user(db, "u1", 100)
+    settle_credit(reserve_credit("u1", 30), actual_cost)
+    flush_settlements()
+    assert credit_of(db, "u1") == expected
+
+def test_refunds_for_same_user_are_merged(db):
+    add_user(db, "u1", 100)
+    first, second = reserve_credit("u1", 20), reserve_credit("u1", 20)
+    settle_credit(first, 5)
+    settle_credit(second, 10)
+    assert credit_ledger._pending == {"u1": 25}
+    assert flush_settlements() == 1
+    assert credit_of(db, "u1") == 85
+
+def test_flush_spans_batches(db, monkeypatch):
+    monkeypatch.setattr(credit_ledger, "CREDIT_SETTLE_BATCH", 2)
+    for i in range(5):
+        add_user(db, f"u{i}", 10)
+        release_credit(reserve_credit(f"u{i}", 10))
+    assert flush_settlements() == 5
+    assert [credit_of(db, f"u{i}") for i in range(5)] == [10] * 5
+
+def test_failed_flush_requeues_refunds(db, monkeypatch):
+    add_user(db, "u1", 100)
+    settle_credit(reserve_credit("u1", 30), 10)
+
+    monkeypatch.setattr(credit_ledger, "get_conn", broken_conn)
+    assert flush_settlements() == 0
+    assert credit_ledger._pending == {"u1": 20}
+
+    # 다시 쌓인 환불과 합쳐서 한 번에 반영된다
+    monkeypatch.undo()
+    settle_credit(reserve_credit("u1", 10), 5)
+    assert flush_settlements() == 1
+    assert credit_of(db, "u1") == 85
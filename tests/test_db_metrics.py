@@ -0,0 +1,20 @@
+from server.services.db import PoolStats
+from server.services.metrics import render_prometheus
+
+def _sample(name: str, engine: str) -> float:
+    prefix = f'{name}{{engine="{engine}"}} '
+    line = next(l for l in render_prometheus().splitlines() if l.startswith(prefix))
+    return float(line[len(prefix):])
+
+def test_pool_failures_are_exported_as_counters():
+    stats = PoolStats("test")
+    assert _sample("dive_db_pool_pre_ping_failures_total", "test") == 0
+    assert _sample("dive_db_pool_timeouts_total", "test") == 0
+
+    stats.incr("pre_ping_failures")
+    stats.incr("timeouts")
+    stats.incr("timeouts")
+    stats.incr("checkouts")
+    assert _sample("dive_db_pool_pre_ping_failures_total", "test") == 1
+    assert _sample("dive_db_pool_timeouts_total", "test") == 2
+    assert stats.snapshot()["timeouts"] == 2
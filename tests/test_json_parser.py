@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from server.services.json_parser import iter_json_objects, parse_chat_response
+
+RESPONSE = json.dumps({
+    "conversation": [{"said": "안녕 {웃음}", "context": "인사"}],
+    "image_selected": "smile",
+    "summary": "요약",
+}, ensure_ascii=False)
+
+def test_unclosed_prose_brace_does_not_hide_later_object():
+    text = f"Use the shape {{ conversation: [...] like this:\n```json\n{RESPONSE}\n```"
+    assert list(iter_json_objects(text)) == [RESPONSE]
+    assert parse_chat_response(text).image_selected == "smile"
+
+def test_prose_example_before_response_is_skipped():
+    text = f"예시 형식은 {{said, context}} 입니다.\n{RESPONSE}\n참고: {{끝}}"
+    assert parse_chat_response(text).summary == "요약"
+
+def test_braces_inside_strings_are_not_counted():
+    assert list(iter_json_objects('x {"a": "}{"} y {"b": 1}')) == ['{"a": "}{"}', '{"b": 1}']
+
+def test_only_outermost_objects_inside_unclosed_brace():
+    assert list(iter_json_objects('{ {"a": {"b": 1}} {"c": 2}')) == ['{"a": {"b": 1}}', '{"c": 2}']
+
+def test_no_valid_object_raises():
+    with pytest.raises(ValueError):
+        parse_chat_response(RESPONSE[: len(RESPONSE) // 2])
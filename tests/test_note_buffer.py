@@ -0,0 +1,97 @@
+from contextlib import contextmanager
+
+import pytest
+
+from server.services import note_buffer
+from server.services.db import get_conn
+from server.services.note_buffer import buffer_note, pending_note, get_user_note, flush_notes
+
+from conftest import note_of, broken_conn
+
+@pytest.fixture(autouse=True)
+def clean_pending():
+    note_buffer._pending.clear()
+    note_buffer._flushing.clear()
+    yield
+    note_buffer._pending.clear()
+    note_buffer._flushing.clear()
+
+def test_buffered_note_is_read_before_flush(db):
+    buffer_note("u1", "first")
+    buffer_note("u1", "second")
+    assert note_of(db, "u1") is None
+    assert get_user_note("u1") == "second"
+
+def test_flush_writes_last_note_per_user(db):
+    buffer_note("u1", "first")
+    buffer_note("u1", "second")
+    buffer_note("u2", "other")
+    assert flush_notes() == 2
+    assert pending_note("u1") is None
+    assert note_of(db, "u1") == "second"
+    assert get_user_note("u2") == "other"
+
+def test_flush_overwrites_existing_note(db):
+    buffer_note("u1", "old")
+    flush_notes()
+    buffer_note("u1", "new")
+    flush_notes()
+    assert note_of(db, "u1") == "new"
+
+def test_failed_flush_requeues_notes(db, monkeypatch):
+    buffer_note("u1", "note")
+    monkeypatch.setattr(note_buffer, "get_conn", broken_conn)
+    assert flush_notes() == 0
+    assert pending_note("u1") == "note"
+    assert note_buffer._flushing == {}
+
+    monkeypatch.undo()
+    assert flush_notes() == 1
+    assert note_of(db, "u1") == "note"
+
+def test_newer_upload_wins_over_requeued_note(db, monkeypatch):
+    buffer_note("u1", "old")
+
+    def upload_then_fail():
+        # flush 가 DB 에 쓰는 사이 같은 유저의 새 업로드가 들어온다
+        assert pending_note("u1") == "old"
+        buffer_note("u1", "new")
+        raise ConnectionError("database is down")
+
+    monkeypatch.setattr(note_buffer, "get_conn", upload_then_fail)
+    flush_notes()
+    assert pending_note("u1") == "new"
+
+    monkeypatch.undo()
+    flush_notes()
+    assert note_of(db, "u1") == "new"
+
+def test_partial_flush_requeues_only_unwritten_batches(db, monkeypatch):
+    calls = {"n": 0}
+
+    @contextmanager
+    def fail_second_batch():
+        with get_conn() as conn:
+            real_execute = conn.execute
+
+            def execute(*args, **kwargs):
+                calls["n"] += 1
+                if calls["n"] == 2:
+                    raise ConnectionError("database is down")
+                return real_execute(*args, **kwargs)
+
+            conn.execute = execute
+            yield conn
+
+    for user_id in ("u1", "u2", "u3"):
+        buffer_note(user_id, f"note-{user_id}")
+    # 버퍼에 넣은 뒤에 줄여야 백그라운드 flush 가 깨어나지 않는다
+    monkeypatch.setattr(note_buffer, "NOTE_FLUSH_SIZE", 1)
+    monkeypatch.setattr(note_buffer, "get_conn", fail_second_batch)
+    assert flush_notes() == 1
+    assert note_of(db, "u1") == "note-u1"
+    assert set(note_buffer._pending) == {"u2", "u3"}
+
+    monkeypatch.undo()
+    assert flush_notes() == 2
+    assert note_of(db, "u3") == "note-u3"
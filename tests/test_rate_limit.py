@@ -0,0 +1,96 @@
+import pytest
+
+from server.services import rate_limit as rl
+from server.services.rate_limit import InProcessBackend, RateLimited
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = Clock()
+    monkeypatch.setattr(rl.time, "monotonic", c.monotonic)
+    return c
+
+@pytest.fixture
+def backend():
+    original = rl._backend
+    b = InProcessBackend()
+    rl.set_backend(b)
+    yield b
+    rl.set_backend(original)
+
+def test_bucket_allows_burst_then_denies(clock):
+    b = InProcessBackend()
+    assert b.acquire("k", 2, 0.5) == (True, 0.0)
+    assert b.acquire("k", 2, 0.5) == (True, 0.0)
+    allowed, retry_after = b.acquire("k", 2, 0.5)
+    assert not allowed
+    assert retry_after == pytest.approx(2.0)
+
+def test_bucket_refills_over_time(clock):
+    b = InProcessBackend()
+    b.acquire("k", 1, 0.1)
+    assert not b.acquire("k", 1, 0.1)[0]
+    clock.now += 5
+    allowed, retry_after = b.acquire("k", 1, 0.1)
+    assert not allowed
+    assert retry_after == pytest.approx(5.0)
+    clock.now += 5
+    assert b.acquire("k", 1, 0.1)[0]
+
+def test_bucket_never_exceeds_capacity(clock):
+    b = InProcessBackend()
+    b.acquire("k", 2, 1.0)
+    clock.now += 3600
+    assert b.acquire("k", 2, 1.0)[0]
+    assert b.acquire("k", 2, 1.0)[0]
+    assert not b.acquire("k", 2, 1.0)[0]
+
+def test_buckets_are_per_key(clock):
+    b = InProcessBackend()
+    assert b.acquire("a", 1, 0.1)[0]
+    assert b.acquire("b", 1, 0.1)[0]
+    assert not b.acquire("a", 1, 0.1)[0]
+
+def test_sweep_drops_only_full_buckets(clock, monkeypatch):
+    monkeypatch.setattr(InProcessBackend, "SWEEP_EVERY", 3)
+    b = InProcessBackend()
+    b.acquire("old", 1, 1.0)
+    clock.now += 10
+    b.acquire("new", 1, 0.01)
+    b.acquire("other", 1, 0.01)
+    assert set(b._buckets) == {"new", "other"}
+
+def test_rate_limit_raises_with_scope(backend, clock, monkeypatch):
+    monkeypatch.setitem(rl.RATE_LIMIT_POLICIES, "upload", (1, 10))
+    rl.rate_limit("upload", "u1")
+    with pytest.raises(RateLimited) as exc:
+        rl.rate_limit("upload", "u1")
+    assert exc.value.scope == "upload"
+    assert exc.value.retry_after == pytest.approx(10.0)
+    # 다른 유저나 다른 scope 는 영향받지 않는다
+    rl.rate_limit("upload", "u2")
+    monkeypatch.setitem(rl.RATE_LIMIT_POLICIES, "summary", (1, 10))
+    rl.rate_limit("summary", "u1")
+
+def test_rate_limit_disabled_when_period_is_zero(backend, monkeypatch):
+    monkeypatch.setitem(rl.RATE_LIMIT_POLICIES, "evaluation", (1, 0))
+    for _ in range(5):
+        rl.rate_limit("evaluation", "u1")
+
+def test_rate_limit_fails_open_on_backend_error(monkeypatch):
+    class Broken:
+        def acquire(self, key, capacity, rate):
+            raise ConnectionError("redis is down")
+
+    original = rl._backend
+    rl.set_backend(Broken())
+    try:
+        rl.rate_limit("upload", "u1")
+    finally:
+        rl.set_backend(original)